@@ -0,0 +1,179 @@
+import heapq
+import math
+from typing import Dict, Any, Optional, Callable
+from compiled_graph import CompiledGraph
+from route_planner import haversine, calculate_walking_time, path_fares
+from pareto_search import walking_step, edge_step
+
+INF = float("inf")
+EARTH_RADIUS = 6371
+
+# Kayan nokta yuvarlamasına karşı sezgiyi çok az küçülten pay
+SPEED_MARGIN = 1 + 1e-9
+
+SEARCH_ALGORITHMS = ("astar", "dijkstra")
+
+def max_speed(graph: CompiledGraph, lats, lons) -> float:
+    """
+    Graf kenarlarının kuş uçuşu en yüksek hızı (km/dakika).
+    Hız verideki süre ve koordinatlardan hesaplanır; böylece haversine / hız hiçbir kenarın
+    süresini aşmaz ve sezgi kabul edilebilir (ve tutarlı) kalır.
+    """
+    speed = 0.0
+    for u in range(graph.node_count):
+        for e in range(graph.offsets[u], graph.offsets[u + 1]):
+            v = graph.targets[e]
+            distance = haversine(lats[u], lons[u], lats[v], lons[v])
+            if distance == 0 or graph.time[e] == INF:
+                continue
+            if graph.time[e] <= 0:
+                return INF
+            speed = max(speed, distance / graph.time[e])
+    return speed * SPEED_MARGIN
+
+def time_heuristic(lats, lons, targets: Dict[int, float], speed: float) -> Optional[Callable[[int], float]]:
+    """
+    Düğümden hedefe kalan sürenin alt sınırı: en yakın hedef durağa kuş uçuşu mesafe / en yüksek hız
+    artı o duraktan varış noktasına yürüme süresi. Hız sınırsızsa sezgi kullanılamaz (None).
+    """
+    if not 0 < speed < INF:
+        return None
+    # haversine ile aynı formül; hedef koordinatları bir kez radyana çevrilir
+    scale = 2 * EARTH_RADIUS / speed
+    points = [(math.radians(lats[node]), math.radians(lons[node]), math.cos(math.radians(lats[node])), egress)
+              for node, egress in targets.items()]
+    cache: Dict[int, float] = {}
+
+    def heuristic(node: int) -> float:
+        value = cache.get(node)
+        if value is None:
+            lat = math.radians(lats[node])
+            lon = math.radians(lons[node])
+            cos_lat = math.cos(lat)
+            value = min(
+                scale * math.asin(math.sqrt(math.sin((t_lat - lat) / 2) ** 2 +
+                                            cos_lat * t_cos * math.sin((t_lon - lon) / 2) ** 2)) + egress
+                for t_lat, t_lon, t_cos, egress in points
+            )
+            cache[node] = value
+        return value
+    return heuristic
+
+def time_search(graph: CompiledGraph, sources: Dict[int, float], targets: Dict[int, float],
+                heuristic: Optional[Callable[[int], float]] = None) -> Dict[str, Any]:
+    """
+    Başlangıç süreleri verilen kaynak düğümlerden, bitiş süreleri verilen hedeflere en kısa süreli yolu bulur.
+    heuristic verilirse A*, verilmezse Dijkstra olarak çalışır; sezgi tutarlı olduğundan sonuçlar aynıdır.
+    Sonuç: toplam süre, (düğüm, gelinen kenar) yolu ve genişletilen düğüm sayısı.
+    """
+    n = graph.node_count
+    offsets = graph.offsets
+    edge_targets = graph.targets
+    times = graph.time
+    h = heuristic or (lambda node: 0)
+
+    best_time = [INF] * n
+    parent_node = [-1] * n
+    parent_edge = [-1] * n
+    closed = [False] * n
+    pq = []
+    for node, start_time in sources.items():
+        if start_time < best_time[node]:
+            best_time[node] = start_time
+            heapq.heappush(pq, (start_time + h(node), node))
+
+    best, best_target, expanded = INF, -1, 0
+    while pq:
+        estimate, u = heapq.heappop(pq)
+        # Kalan en iyi tahmin bulunan sonuçtan kötüyse daha iyi bir yol yoktur
+        if estimate >= best:
+            break
+        if closed[u]:
+            continue
+        closed[u] = True
+        expanded += 1
+
+        # En az bir kenar kullanılmış düğümler hedefte sonuçlandırılır (sadece yürüme rota sayılmaz)
+        if u in targets and parent_node[u] != -1 and best_time[u] + targets[u] < best:
+            best = best_time[u] + targets[u]
+            best_target = u
+
+        for e in range(offsets[u], offsets[u + 1]):
+            v = edge_targets[e]
+            if closed[v]:
+                continue
+            candidate = best_time[u] + times[e]
+            if candidate < best_time[v]:
+                best_time[v] = candidate
+                parent_node[v] = u
+                parent_edge[v] = e
+                heapq.heappush(pq, (candidate + h(v), v))
+
+    if best_target == -1:
+        return {"time": INF, "path": [], "expanded": expanded}
+    path = []
+    node = best_target
+    while node != -1:
+        path.append((node, parent_edge[node]))
+        node = parent_node[node]
+    path.reverse()
+    return {"time": best, "path": path, "expanded": expanded}
+
+def search_speed(network) -> float:
+    """Ağ görüntüsü başına bir kez hesaplanan en yüksek kenar hızı."""
+    if network.max_speed is None:
+        network.max_speed = max_speed(network.graph, network.table.lat, network.table.lon)
+    return network.max_speed
+
+def fastest_path(network, sources: Dict[int, float], targets: Dict[int, float],
+                 search: str = "astar") -> Dict[str, Any]:
+    """Seçilen algoritmayla (astar veya dijkstra) en kısa süreli yol araması."""
+    if search not in SEARCH_ALGORITHMS:
+        raise ValueError(f"Bilinmeyen arama algoritması: {search}")
+    heuristic = None
+    if search == "astar":
+        heuristic = time_heuristic(network.table.lat, network.table.lon, targets, search_speed(network))
+    return time_search(network.graph, sources, targets, heuristic)
+
+def find_fastest_route(start_coord, end_coord, network, search: str = "astar",
+                       max_walk: float = 1.0, passenger_type: str = "Genel") -> Optional[Dict[str, Any]]:
+    """
+    Yürüme mesafesindeki duraklardan hedefe yakın duraklara, yürüme dahil toplam süresi
+    en kısa rotayı bulur. search ile A* veya Dijkstra seçilir; iki algoritma aynı rotayı döndürür.
+    Ücretler diğer stratejilerle aynı şekilde edge_fare ile hesaplanır.
+    """
+    index = network.index_of_type("all")
+    graph = network.graph
+
+    def access_stops(coord):
+        nearby = index.within(coord["lat"], coord["lng"], max_walk)
+        # Yürüme mesafesinde durak yoksa en yakın durağı kullan
+        return nearby or index.nearest(coord["lat"], coord["lng"], 1)
+
+    walk_to = {graph.index_of(index.stops[i]["id"]): dist for i, dist in access_stops(start_coord)}
+    walk_from = {graph.index_of(index.stops[i]["id"]): dist for i, dist in access_stops(end_coord)}
+    sources = {node: calculate_walking_time(dist) for node, dist in walk_to.items()}
+    targets = {node: calculate_walking_time(dist) for node, dist in walk_from.items()}
+
+    result = fastest_path(network, sources, targets, search)
+    path = result["path"]
+    if len(path) < 2:
+        return None
+
+    stops = [network.stops_by_id[graph.stop_ids[node]] for node, _ in path]
+    first, last = stops[0], stops[-1]
+    steps = [walking_step(start_coord, {"lat": first["lat"], "lng": first["lon"]}, walk_to[path[0][0]])]
+    costs = path_fares(network, [(node, edge) for (node, _), (_, edge) in zip(path, path[1:])], passenger_type)
+    for (_, edge), from_stop, to_stop, cost in zip(path[1:], stops, stops[1:], costs):
+        steps.append(edge_step(graph, edge, from_stop, to_stop, cost))
+    steps.append(walking_step({"lat": last["lat"], "lng": last["lon"]}, end_coord, walk_from[path[-1][0]]))
+
+    return {
+        "steps": steps,
+        "total_distance": sum(step["distance"] for step in steps),
+        "total_time": result["time"],
+        "total_cost": sum(step["cost"] for step in steps),
+        "search": search,
+        "expanded": result["expanded"],
+        "stops": stops
+    }
@@ -0,0 +1,77 @@
+from typing import List, Dict, Any, Iterator, Tuple
+from route_planner import find_routes_by_type
+
+# Görünüm başına saklanan konum sorgusu sayısı; dolunca en eski sorgu atılır
+MEMO_SIZE = 4096
+
+def remember(memo: Dict[Tuple, Any], key: Tuple, value: Any) -> None:
+    if len(memo) >= MEMO_SIZE:
+        # Sözlükler ekleme sırasını koruduğundan ilk anahtar en eskisidir
+        del memo[next(iter(memo))]
+    memo[key] = value
+
+class MemoizedIndex:
+    """
+    Aynı koordinat için tekrarlanan en yakın durak / yarıçap sorgularını saklayan indeks sarmalayıcısı.
+    Yalnızca birebir aynı koordinatlar paylaşılır; sorgular MEMO_SIZE ile sınırlıdır.
+    """
+    def __init__(self, index):
+        self.index = index
+        self.stops = index.stops
+        self._nearest: Dict[Tuple, List[Tuple[int, float]]] = {}
+        self._within: Dict[Tuple, List[Tuple[int, float]]] = {}
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def nearest(self, lat: float, lon: float, k: int = 1) -> List[Tuple[int, float]]:
+        key = (lat, lon, k)
+        if key not in self._nearest:
+            remember(self._nearest, key, self.index.nearest(lat, lon, k))
+        return self._nearest[key]
+
+    def within(self, lat: float, lon: float, radius: float) -> List[Tuple[int, float]]:
+        key = (lat, lon, radius)
+        if key not in self._within:
+            remember(self._within, key, self.index.within(lat, lon, radius))
+        return self._within[key]
+
+    def distances(self, lat: float, lon: float, indices: List[int]) -> List[float]:
+        return self.index.distances(lat, lon, indices)
+
+class BatchNetworkView:
+    """
+    Toplu planlama sırasında ağ görüntüsünü saran görünüm.
+    Aynı koordinatların konum sorguları çiftler arasında paylaşılır, diğer her şey görüntüye devredilir.
+    """
+    def __init__(self, network):
+        self.network = network
+        self._indexes = {}
+
+    def index_of_type(self, stop_type: str) -> MemoizedIndex:
+        if stop_type not in self._indexes:
+            self._indexes[stop_type] = MemoizedIndex(self.network.index_of_type(stop_type))
+        return self._indexes[stop_type]
+
+    def __getattr__(self, name):
+        return getattr(self.network, name)
+
+def plan_pair(pair: Dict[str, Any], view: BatchNetworkView, passenger_type: str = "Genel",
+              payment_info: Dict[str, float] = None) -> Dict[str, List]:
+    """Tek bir çiftin rotaları; view aynı toplu isteğin çiftleri arasında paylaşılır."""
+    return find_routes_by_type(pair["start"], pair["end"], view.stops, view.taxi,
+                               pair.get("passengerType", passenger_type),
+                               pair.get("paymentInfo", payment_info), network=view)
+
+def plan_batch(od_pairs: List[Dict[str, Any]], network, passenger_type: str = "Genel",
+               payment_info: Dict[str, float] = None) -> Iterator[Tuple[int, Dict[str, List]]]:
+    """
+    Birden çok başlangıç/bitiş çifti için rotaları hesaplar.
+    Her çift için tam bir rota araması yapılır; çiftler arasında arama paylaşılmaz, yalnızca birebir
+    aynı koordinatların konum sorguları saklanır. Toplu istek bu yüzden hesaplamadan değil, çift
+    başına HTTP isteği yükünden tasarruf sağlar.
+    Sonuçlar hesaplandıkça (çift sırası, rotalar) olarak üretilir.
+    """
+    view = BatchNetworkView(network)
+    for i, pair in enumerate(od_pairs):
+        yield i, plan_pair(pair, view, passenger_type, payment_info)
@@ -0,0 +1,79 @@
+import argparse
+import random
+import time
+from typing import List, Dict, Any
+from network_snapshot import NetworkSnapshot
+from transport_data import CityData
+from synthetic_network import grid_network
+from contraction import ContractionHierarchy
+from route_planner import dijkstra, shortest_path
+
+def compare(network: NetworkSnapshot, queries: int, seed: int = 1) -> Dict[str, Any]:
+    """
+    Ağ için kısayol hiyerarşisini kurar; rastgele durak çiftlerinde dijkstra ve CH sorgularının
+    sürelerini, maliyet farklarını ve farklı yol sayısını toplar.
+    """
+    graph = network.graph
+    started = time.perf_counter()
+    network.contraction = ContractionHierarchy.build(graph)
+    build_time = time.perf_counter() - started
+
+    rnd = random.Random(seed)
+    totals = {"dijkstra": 0.0, "ch": 0.0}
+    mismatches = different_paths = 0
+    for _ in range(queries):
+        start, end = (graph.stop_ids[i] for i in rnd.sample(range(graph.node_count), 2))
+        started = time.perf_counter()
+        distance, path = dijkstra(graph, start, end)
+        totals["dijkstra"] += time.perf_counter() - started
+        started = time.perf_counter()
+        ch_distance, ch_path = shortest_path(network, start, end)
+        totals["ch"] += time.perf_counter() - started
+        # İkisi de yol bulamazsa fark nan olur ve eşleşme sayılır
+        if abs(distance - ch_distance) > 1e-6:
+            mismatches += 1
+        elif path != ch_path:
+            # Aynı maliyetli farklı yollar (eşitlik durumları)
+            different_paths += 1
+
+    return {
+        "network": network.city,
+        "stops": graph.node_count,
+        "edges": graph.edge_count,
+        "shortcuts": network.contraction.shortcut_count,
+        "build": build_time,
+        "dijkstra_ms": totals["dijkstra"] * 1000 / queries,
+        "ch_ms": totals["ch"] * 1000 / queries,
+        "mismatches": mismatches,
+        "different_paths": different_paths
+    }
+
+def report(rows: List[Dict[str, Any]], header: bool = True) -> None:
+    if header:
+        print(f"{'Ağ':<22}{'Durak':>8}{'Kenar':>8}{'Kısayol':>9}{'Kurulum sn':>12}"
+              f"{'Dijkstra ms':>13}{'CH ms':>8}{'Hızlanma':>10}{'Fark':>6}{'Farklı yol':>12}")
+    for row in rows:
+        speedup = row["dijkstra_ms"] / row["ch_ms"] if row["ch_ms"] else 0.0
+        print(f"{row['network']:<22}{row['stops']:>8}{row['edges']:>8}{row['shortcuts']:>9}{row['build']:>12.1f}"
+              f"{row['dijkstra_ms']:>13.2f}{row['ch_ms']:>8.2f}{speedup:>10.1f}{row['mismatches']:>6}"
+              f"{row['different_paths']:>12}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Kısayol hiyerarşisinin kurulum süresini ve sorgu hızlanmasını ölçer")
+    parser.add_argument("--data", default="data.txt", help="Ulaşım verisi dosyası")
+    parser.add_argument("--grids", type=int, nargs="*", default=[90, 160, 290],
+                        help="Sentetik kare ızgara kenar uzunlukları (yaklaşık 10k, 30k ve 100k durak)")
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rows = [compare(NetworkSnapshot.from_file(args.data), args.queries, args.seed)]
+    report(rows)
+    # Büyük ağların kurulumu uzun sürer; her satır hazır olunca yazdırılır
+    for size in args.grids:
+        city_data = CityData.from_dict(grid_network(size, size, seed=args.seed))
+        rows.append(compare(NetworkSnapshot.from_city(f"grid-{size}", city_data), args.queries, args.seed))
+        report(rows[-1:], header=False)
+
+if __name__ == "__main__":
+    main()
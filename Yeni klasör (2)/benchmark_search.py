@@ -0,0 +1,70 @@
+import argparse
+import random
+import time
+from typing import List, Dict, Any
+from network_snapshot import NetworkSnapshot
+from transport_data import CityData
+from synthetic_network import grid_network
+from astar_search import time_search, time_heuristic, search_speed
+
+def compare(network: NetworkSnapshot, queries: int, seed: int = 1) -> Dict[str, Any]:
+    """
+    Rastgele durak çiftlerinde Dijkstra ve A* aramalarını çalıştırır;
+    genişletilen düğüm sayılarını, süreleri ve sonuçların aynı olup olmadığını toplar.
+    """
+    rnd = random.Random(seed)
+    graph = network.graph
+    lats, lons = network.table.lat, network.table.lon
+    speed = search_speed(network)
+    totals = {"dijkstra": [0, 0.0], "astar": [0, 0.0]}
+    mismatches = 0
+    for _ in range(queries):
+        start, end = rnd.sample(range(graph.node_count), 2)
+        sources, targets = {start: 0}, {end: 0}
+        results = {}
+        for name, heuristic in (("dijkstra", None), ("astar", time_heuristic(lats, lons, targets, speed))):
+            started = time.perf_counter()
+            results[name] = time_search(graph, sources, targets, heuristic)
+            totals[name][1] += time.perf_counter() - started
+            totals[name][0] += results[name]["expanded"]
+        # İkisi de yol bulamazsa fark nan olur ve eşleşme sayılır
+        if abs(results["dijkstra"]["time"] - results["astar"]["time"]) > 1e-6:
+            mismatches += 1
+
+    return {
+        "network": network.city,
+        "stops": graph.node_count,
+        "edges": graph.edge_count,
+        "queries": queries,
+        "dijkstra": totals["dijkstra"][0] / queries,
+        "astar": totals["astar"][0] / queries,
+        "dijkstra_ms": totals["dijkstra"][1] * 1000 / queries,
+        "astar_ms": totals["astar"][1] * 1000 / queries,
+        "mismatches": mismatches
+    }
+
+def report(rows: List[Dict[str, Any]]) -> None:
+    print(f"{'Ağ':<22}{'Durak':>8}{'Kenar':>8}{'Dijkstra':>11}{'A*':>9}{'Oran':>7}"
+          f"{'Dijkstra ms':>13}{'A* ms':>9}{'Fark':>6}")
+    for row in rows:
+        ratio = row["astar"] / row["dijkstra"] if row["dijkstra"] else 1.0
+        print(f"{row['network']:<22}{row['stops']:>8}{row['edges']:>8}{row['dijkstra']:>11.1f}{row['astar']:>9.1f}"
+              f"{ratio:>7.2f}{row['dijkstra_ms']:>13.2f}{row['astar_ms']:>9.2f}{row['mismatches']:>6}")
+
+def main():
+    parser = argparse.ArgumentParser(description="A* ve Dijkstra aramalarında genişletilen düğüm sayılarını karşılaştırır")
+    parser.add_argument("--data", default="data.txt", help="Ulaşım verisi dosyası")
+    parser.add_argument("--grids", type=int, nargs="*", default=[20, 50, 100],
+                        help="Sentetik kare ızgara kenar uzunlukları (durak sayısı)")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    networks = [NetworkSnapshot.from_file(args.data)]
+    for size in args.grids:
+        city_data = CityData.from_dict(grid_network(size, size, seed=args.seed))
+        networks.append(NetworkSnapshot.from_city(f"grid-{size}", city_data))
+    report([compare(network, args.queries, args.seed) for network in networks])
+
+if __name__ == "__main__":
+    main()
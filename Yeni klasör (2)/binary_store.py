@@ -0,0 +1,83 @@
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from typing import Dict, Any
+
+# Dosya düzeni: MAGIC | başlık uzunluğu (uint64) | JSON başlık | 8 bayta hizalanmış diziler
+MAGIC = b"TPSBIN01"
+ALIGNMENT = 8
+
+def _align(offset: int) -> int:
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+def write_arrays(path: str, arrays: Dict[str, array], meta: Dict[str, Any]) -> None:
+    """Dizileri tek bir bellek eşlemeli (mmap) okunabilir dosyaya yazar."""
+    specs = []
+    offset = 0
+    for name, values in arrays.items():
+        offset = _align(offset)
+        specs.append({
+            "name": name,
+            "typecode": values.typecode,
+            "offset": offset,
+            "length": len(values)
+        })
+        offset += len(values) * values.itemsize
+
+    header = json.dumps({"meta": meta, "byteorder": sys.byteorder, "arrays": specs}).encode("utf-8")
+    data_start = _align(len(MAGIC) + 8 + len(header))
+
+    # Yarım yazılmış dosya okunmasın diye önce geçici dosyaya yazılır
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as file:
+        file.write(MAGIC)
+        file.write(struct.pack("<Q", len(header)))
+        file.write(header)
+        for spec, values in zip(specs, arrays.values()):
+            file.write(b"\0" * (data_start + spec["offset"] - file.tell()))
+            values.tofile(file)
+    os.replace(tmp_path, path)
+
+class ArrayFile:
+    """write_arrays ile yazılmış dosyayı kopyalamadan, salt okunur mmap üzerinden açar."""
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self._mmap[:len(MAGIC)] != MAGIC:
+            self._mmap.close()
+            raise ValueError(f"Geçersiz ikili dosya: {path}")
+
+        header_length = struct.unpack_from("<Q", self._mmap, len(MAGIC))[0]
+        header_start = len(MAGIC) + 8
+        header = json.loads(self._mmap[header_start:header_start + header_length].decode("utf-8"))
+        if header["byteorder"] != sys.byteorder:
+            self._mmap.close()
+            raise ValueError(f"Bayt sırası uyumsuz: {path}")
+
+        self.meta: Dict[str, Any] = header["meta"]
+        data_start = _align(header_start + header_length)
+        self._buffer = memoryview(self._mmap)
+        self.arrays: Dict[str, memoryview] = {}
+        for spec in header["arrays"]:
+            start = data_start + spec["offset"]
+            itemsize = array(spec["typecode"]).itemsize
+            view = self._buffer[start:start + spec["length"] * itemsize]
+            self.arrays[spec["name"]] = view.cast(spec["typecode"])
+
+    def __getitem__(self, name: str) -> memoryview:
+        return self.arrays[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.arrays
+
+    def close(self) -> None:
+        for view in self.arrays.values():
+            view.release()
+        self.arrays = {}
+        self._buffer.release()
+        self._mmap.close()
@@ -0,0 +1,205 @@
+from array import array
+from typing import List, Dict, Any, Optional, Tuple
+from spatial_index import SpatialIndex
+from transport_data import StopTable, StopList
+
+# Kenar tipleri, graf içinde küçük tamsayı kodları olarak tutulur
+EDGE_TYPES = ["direct", "transfer", "walk"]
+EDGE_DIRECT = 0
+EDGE_TRANSFER = 1
+EDGE_WALK = 2
+
+# Transfer kenarları için varsayılan mesafe (km)
+TRANSFER_DISTANCE = 0.1
+
+# Yürüyerek aktarma kenarları bu yarıçaptaki (km) durak çiftleri için oluşturulur
+WALK_RADIUS = 1.0
+# Her durak yarıçaptaki en yakın bu kadar durağa bağlanır; yoğun bölgelerde kenar sayısını sınırlar
+WALK_NEIGHBOURS = 4
+# calculate_walking_time ile aynı yürüme hızı (dakika/km)
+WALK_MINUTES_PER_KM = 12
+
+def edge_weight(distance: float, time: float, cost: float, edge_type: int) -> float:
+    """Dijkstra'nın kullandığı karma kenar ağırlığını hesaplar."""
+    # Mesafe ve süreye daha fazla, ücrete daha az ağırlık ver
+    weight = (distance * 2) + (time / 5) + (cost / 2)
+    # Transfer ve aktarma yürüyüşü için ek maliyet
+    if edge_type != EDGE_DIRECT:
+        weight += 1
+    return weight
+
+class CompiledGraph:
+    """
+    Durak kimliklerini ardışık tamsayılara çeviren, kenarları CSR düzeninde tutan graf.
+    Düğüm u'nun kenarları offsets[u] ile offsets[u + 1] arasındaki indekslerdedir.
+    """
+    def __init__(self, stop_ids: List[str], offsets: array, targets: array,
+                 distance: array, time: array, cost: array, mode: array,
+                 edge_type: array, modes: List[str], index=None, weight=None):
+        self.stop_ids = stop_ids
+        # index ve weight ikili görüntü dosyasından hazır gelebilir
+        self.index = index if index is not None else {stop_id: i for i, stop_id in enumerate(stop_ids)}
+        self.offsets = offsets
+        self.targets = targets
+        self.distance = distance
+        self.time = time
+        self.cost = cost
+        self.mode = mode
+        self.edge_type = edge_type
+        self.modes = modes
+        self.weight = weight if weight is not None else array("d", (
+            edge_weight(distance[e], time[e], cost[e], edge_type[e]) for e in range(len(targets))
+        ))
+
+    @property
+    def node_count(self) -> int:
+        return len(self.stop_ids)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.targets)
+
+    def index_of(self, stop_id: str) -> Optional[int]:
+        return self.index.get(stop_id)
+
+    def mode_code(self, mode: str) -> Optional[int]:
+        return self.modes.index(mode) if mode in self.modes else None
+
+    def edge_info(self, e: int) -> Dict[str, Any]:
+        """Tek bir kenarı eski sözlük biçiminde döndürür."""
+        return {
+            "target": self.stop_ids[self.targets[e]],
+            "type": EDGE_TYPES[self.edge_type[e]],
+            "cost": self.cost[e],
+            "time": self.time[e],
+            "distance": self.distance[e],
+            "mode": self.modes[self.mode[e]]
+        }
+
+    @classmethod
+    def from_stops(cls, stops: List[Dict[str, Any]]) -> "CompiledGraph":
+        """Ham durak listesinden sıkıştırılmış grafı oluşturur."""
+        stop_ids = [stop["id"] for stop in stops]
+        index = {stop_id: i for i, stop_id in enumerate(stop_ids)}
+        modes: List[str] = []
+        mode_codes: Dict[str, int] = {}
+
+        def mode_code(mode: str) -> int:
+            if mode not in mode_codes:
+                mode_codes[mode] = len(modes)
+                modes.append(mode)
+            return mode_codes[mode]
+
+        offsets = array("i", [0])
+        targets = array("i")
+        distance = array("d")
+        time = array("d")
+        cost = array("d")
+        mode = array("b")
+        edge_type = array("b")
+
+        for stop in stops:
+            # Direkt bağlantılar
+            for edge in stop.get("nextStops", []):
+                target = index.get(edge["stopId"])
+                if target is None:
+                    continue
+                targets.append(target)
+                distance.append(edge["mesafe"])
+                time.append(edge["sure"])
+                cost.append(edge["ucret"])
+                mode.append(mode_code(stop["type"]))
+                edge_type.append(EDGE_DIRECT)
+
+            # Transfer bağlantıları
+            transfer = stop.get("transfer")
+            if transfer:
+                target = index.get(transfer["transferStopId"])
+                if target is not None:
+                    targets.append(target)
+                    distance.append(TRANSFER_DISTANCE)
+                    time.append(transfer["transferSure"])
+                    cost.append(transfer["transferUcret"])
+                    mode.append(mode_code("transfer"))
+                    edge_type.append(EDGE_TRANSFER)
+
+            offsets.append(len(targets))
+
+        return cls(stop_ids, offsets, targets, distance, time, cost, mode, edge_type, modes)
+
+    @classmethod
+    def from_table(cls, table: StopTable, walk_radius: float = 0.0) -> "CompiledGraph":
+        """
+        Sütun düzenindeki durak tablosundan, durak kayıtlarını oluşturmadan grafı kurar.
+        walk_radius verilirse yarıçaptaki yakın durak çiftleri arasına yürüme kenarları eklenir (bkz. footpath_neighbors).
+        """
+        index = table.index
+        modes: List[str] = []
+        mode_codes: Dict[str, int] = {}
+
+        def mode_code(mode: str) -> int:
+            if mode not in mode_codes:
+                mode_codes[mode] = len(modes)
+                modes.append(mode)
+            return mode_codes[mode]
+
+        offsets = array("i", [0])
+        targets = array("i")
+        distance = array("d")
+        time = array("d")
+        cost = array("d")
+        mode = array("b")
+        edge_type = array("b")
+        footpaths = footpath_neighbors(table, walk_radius) if walk_radius > 0 else None
+
+        for i in range(len(table)):
+            for e in range(table.next_offsets[i], table.next_offsets[i + 1]):
+                target = index.get(table.next_ids[e])
+                if target is None:
+                    continue
+                targets.append(target)
+                distance.append(table.next_distance[e])
+                time.append(table.next_time[e])
+                cost.append(table.next_cost[e])
+                mode.append(mode_code(table.types[i]))
+                edge_type.append(EDGE_DIRECT)
+
+            transfer_id = table.transfer_ids[i]
+            if transfer_id is not None:
+                target = index.get(transfer_id)
+                if target is not None:
+                    targets.append(target)
+                    distance.append(TRANSFER_DISTANCE)
+                    time.append(table.transfer_time[i])
+                    cost.append(table.transfer_cost[i])
+                    mode.append(mode_code("transfer"))
+                    edge_type.append(EDGE_TRANSFER)
+
+            # Yürüyerek aktarmalar (yakından uzağa)
+            for j, walk_distance in footpaths[i] if footpaths is not None else ():
+                targets.append(j)
+                distance.append(walk_distance)
+                time.append(walk_distance * WALK_MINUTES_PER_KM)
+                cost.append(0)
+                mode.append(mode_code("walk"))
+                edge_type.append(EDGE_WALK)
+
+            offsets.append(len(targets))
+
+        return cls(list(table.ids), offsets, targets, distance, time, cost, mode, edge_type, modes)
+
+def footpath_neighbors(table: StopTable, walk_radius: float) -> List[List[Tuple[int, float]]]:
+    """
+    Her durak için yürüme kenarı kurulan duraklar (sıra, mesafe), yakından uzağa.
+    Bir çift, duraklardan biri diğerini yarıçaptaki en yakın WALK_NEIGHBOURS durağı arasında
+    buluyorsa bağlanır; kenarlar iki yönlüdür. Duraklar konum indeksiyle bulunur.
+    """
+    index = SpatialIndex(StopList(table))
+    neighbors: List[Dict[int, float]] = [{} for _ in range(len(table))]
+    for i in range(len(table)):
+        nearby = [(j, walk_distance) for j, walk_distance in index.within(table.lat[i], table.lon[i], walk_radius)
+                  if j != i]
+        for j, walk_distance in nearby[:WALK_NEIGHBOURS]:
+            neighbors[i].setdefault(j, walk_distance)
+            neighbors[j].setdefault(i, walk_distance)
+    return [sorted(pairs.items(), key=lambda item: (item[1], item[0])) for pairs in neighbors]
@@ -0,0 +1,276 @@
+import heapq
+from array import array
+from typing import List, Dict, Any, Tuple
+from compiled_graph import CompiledGraph
+
+INF = float("inf")
+
+# Tanık (witness) aramasında yerleştirilecek en fazla düğüm; küçük değer ön işlemeyi hızlandırır,
+# gereksiz kısayolları artırır ama sonuçların doğruluğunu etkilemez
+WITNESS_SETTLE_LIMIT = 500
+# Daraltma sırasını belirlerken kullanılan, daha kısa tanık araması
+ESTIMATE_SETTLE_LIMIT = 30
+
+# ch.<ad> olarak ağ görüntüsü dosyasına yazılan diziler ve tür kodları
+CH_ARRAYS = {
+    "rank": "i", "up_offsets": "i", "up_edges": "i", "down_offsets": "i", "down_edges": "i",
+    "source": "i", "target": "i", "weight": "d", "original": "i", "first": "i", "second": "i"
+}
+
+class ContractionHierarchy:
+    """
+    Durak grafı üzerinde kısayol hiyerarşisi (contraction hierarchy).
+    Düğümler önem sırasına göre daraltılır; daraltılan düğümün yerine geçen kısayollar eklenir.
+    Kenar x (source[x] -> target[x]) ya grafın original[x] kenarıdır ya da first[x] ve second[x]
+    kenarlarının birleşimi olan kısayoldur. Sorgu, başlangıçtan yukarı (up) ve hedeften geriye
+    doğru yukarı (down) kenarlarda iki yönlü Dijkstra'dır; dijkstra ile aynı karma ağırlığı kullanır.
+    """
+    def __init__(self, graph: CompiledGraph, rank, up_offsets, up_edges, down_offsets, down_edges,
+                 source, target, weight, original, first, second):
+        self.graph = graph
+        self.rank = rank
+        self.up_offsets = up_offsets
+        self.up_edges = up_edges
+        self.down_offsets = down_offsets
+        self.down_edges = down_edges
+        self.source = source
+        self.target = target
+        self.weight = weight
+        self.original = original
+        self.first = first
+        self.second = second
+
+    @property
+    def shortcut_count(self) -> int:
+        return sum(1 for x in range(len(self.original)) if self.original[x] == -1)
+
+    def arrays(self) -> Dict[str, array]:
+        """Ağ görüntüsü dosyasına yazılacak diziler."""
+        return {name: getattr(self, name) for name in CH_ARRAYS}
+
+    @classmethod
+    def from_arrays(cls, graph: CompiledGraph, arrays: Dict[str, Any]) -> "ContractionHierarchy":
+        return cls(graph, **{name: arrays[name] for name in CH_ARRAYS})
+
+    @classmethod
+    def build(cls, graph: CompiledGraph, settle_limit: int = WITNESS_SETTLE_LIMIT) -> "ContractionHierarchy":
+        """Grafı kenar farkı sezgisiyle seçilen sırayla daraltarak hiyerarşiyi oluşturur."""
+        n = graph.node_count
+        source: List[int] = []
+        target: List[int] = []
+        weight: List[float] = []
+        original: List[int] = []
+        first: List[int] = []
+        second: List[int] = []
+        # Daraltılmamış düğümler arasındaki kenarlar: komşu -> (ağırlık, kenar); paralel kenarlardan en hafifi tutulur
+        out_edges: List[Dict[int, Tuple[float, int]]] = [{} for _ in range(n)]
+        in_edges: List[Dict[int, Tuple[float, int]]] = [{} for _ in range(n)]
+
+        def add_edge(u: int, v: int, w: float, orig: int, a: int = -1, b: int = -1) -> None:
+            current = out_edges[u].get(v)
+            if current is not None and current[0] <= w:
+                return
+            x = len(source)
+            source.append(u)
+            target.append(v)
+            weight.append(w)
+            original.append(orig)
+            first.append(a)
+            second.append(b)
+            out_edges[u][v] = (w, x)
+            in_edges[v][u] = (w, x)
+
+        for u in range(n):
+            for e in range(graph.offsets[u], graph.offsets[u + 1]):
+                v = graph.targets[e]
+                if v != u and graph.weight[e] < INF:
+                    add_edge(u, v, graph.weight[e], e)
+
+        contracted = [False] * n
+        deleted_neighbors = [0] * n
+        level = [0] * n
+
+        def witness_distances(u: int, skip: int, limit: float, targets: set, settle_limit: int) -> Dict[int, float]:
+            """skip düğümünden geçmeden u'dan sınırlı Dijkstra; tüm hedefler yerleşince veya limit aşılınca durur."""
+            distances = {u: 0.0}
+            pq = [(0.0, u)]
+            remaining = len(targets)
+            settled = 0
+            while pq and settled < settle_limit:
+                d, x = heapq.heappop(pq)
+                if d > distances[x]:
+                    continue
+                settled += 1
+                if x in targets:
+                    remaining -= 1
+                    if remaining == 0:
+                        break
+                for y, (w, _) in out_edges[x].items():
+                    candidate = d + w
+                    # limit'i aşan düğümler tanık olamaz, sıraya eklenmez
+                    if candidate <= limit and y != skip and candidate < distances.get(y, INF):
+                        distances[y] = candidate
+                        heapq.heappush(pq, (candidate, y))
+            return distances
+
+        def shortcuts(v: int, settle_limit: int) -> List[Tuple[int, int, float, int, int]]:
+            """v daraltılırsa gereken kısayollar: (u, w, ağırlık, u->v kenarı, v->w kenarı)."""
+            needed = []
+            outgoing = list(out_edges[v].items())
+            if not outgoing:
+                return needed
+            for u, (w_in, x_in) in in_edges[v].items():
+                targets = {w for w, _ in outgoing if w != u}
+                if not targets:
+                    continue
+                limit = w_in + max(w_out for w, (w_out, _) in outgoing if w != u)
+                distances = witness_distances(u, v, limit, targets, settle_limit)
+                for w, (w_out, x_out) in outgoing:
+                    if w == u:
+                        continue
+                    via = w_in + w_out
+                    if distances.get(w, INF) > via:
+                        needed.append((u, w, via, x_in, x_out))
+            return needed
+
+        def priority(v: int) -> int:
+            # Kenar farkı + daraltılmış komşu sayısı + seviye (daraltmaların ağa dengeli yayılması için);
+            # tahmin için kısa tanık aramaları yeterlidir
+            added = len(shortcuts(v, ESTIMATE_SETTLE_LIMIT))
+            return 2 * added - len(in_edges[v]) - len(out_edges[v]) + deleted_neighbors[v] + level[v]
+
+        priorities = [priority(v) for v in range(n)]
+        stale = [False] * n
+        queue = [(p, v) for v, p in enumerate(priorities)]
+        heapq.heapify(queue)
+        rank = array("i", [0]) * n
+        order = 0
+        while queue:
+            p, v = heapq.heappop(queue)
+            # Öncelik güncellendiğinde eski kayıt sırada kalır, atlanır
+            if contracted[v] or p != priorities[v]:
+                continue
+            if stale[v]:
+                # Öncelik arttıysa ve artık en küçük değilse sıraya geri konur
+                stale[v] = False
+                priorities[v] = priority(v)
+                if queue and priorities[v] > queue[0][0]:
+                    heapq.heappush(queue, (priorities[v], v))
+                    continue
+
+            for u, w, via, x_in, x_out in shortcuts(v, settle_limit):
+                add_edge(u, w, via, -1, x_in, x_out)
+            contracted[v] = True
+            rank[v] = order
+            order += 1
+            neighbors = set(in_edges[v]) | set(out_edges[v])
+            for u in in_edges[v]:
+                del out_edges[u][v]
+            for w in out_edges[v]:
+                del in_edges[w][v]
+            out_edges[v] = {}
+            in_edges[v] = {}
+            # Komşuların kenar farkı değişti; öncelikleri sıradan çıktıklarında yeniden hesaplanır
+            for u in neighbors:
+                deleted_neighbors[u] += 1
+                level[u] = max(level[u], level[v] + 1)
+                stale[u] = True
+
+        # Kenar x, kaynağı daha önce daraltıldıysa kaynağın yukarı, değilse hedefin aşağı listesine girer
+        up: List[List[int]] = [[] for _ in range(n)]
+        down: List[List[int]] = [[] for _ in range(n)]
+        for x in range(len(source)):
+            if rank[source[x]] < rank[target[x]]:
+                up[source[x]].append(x)
+            else:
+                down[target[x]].append(x)
+
+        def csr(lists: List[List[int]]) -> Tuple[array, array]:
+            offsets = array("i", [0])
+            edges = array("i")
+            for items in lists:
+                edges.extend(items)
+                offsets.append(len(edges))
+            return offsets, edges
+
+        up_offsets, up_edges = csr(up)
+        down_offsets, down_edges = csr(down)
+        return cls(graph, rank, up_offsets, up_edges, down_offsets, down_edges,
+                   array("i", source), array("i", target), array("d", weight),
+                   array("i", original), array("i", first), array("i", second))
+
+    def query(self, start: int, end: int) -> Tuple[float, List[int]]:
+        """İki yönlü CH sorgusu; toplam ağırlık ve yolu oluşturan graf kenarlarını döndürür."""
+        if start == end:
+            return 0.0, []
+        weight = self.weight
+        # İleri arama yukarı kenarlarda hedefe, geri arama aşağı kenarlarda kaynağa doğru ilerler.
+        # Ters yöndeki kenarlar düğümün daha üst bir düğümden daha kısa yoldan erişildiğini gösterirse
+        # düğüm genişletilmez (stall-on-demand); sonuç değişmez, arama alanı küçülür.
+        forward = (self.up_offsets, self.up_edges, self.target, self.down_offsets, self.down_edges, self.source,
+                   {start: 0.0}, {start: -1}, [(0.0, start)])
+        backward = (self.down_offsets, self.down_edges, self.source, self.up_offsets, self.up_edges, self.target,
+                    {end: 0.0}, {end: -1}, [(0.0, end)])
+        best, meeting = INF, -1
+
+        while True:
+            # İki sıranın en küçüğü bulunan yoldan kötüyse durulur
+            top_forward = forward[8][0][0] if forward[8] else INF
+            top_backward = backward[8][0][0] if backward[8] else INF
+            if min(top_forward, top_backward) >= best:
+                break
+            side, other = (forward, backward) if top_forward <= top_backward else (backward, forward)
+            offsets, edges, ends, stall_offsets, stall_edges, stall_ends, distances, parents, pq = side
+            d, u = heapq.heappop(pq)
+            if d > distances[u]:
+                continue
+            other_distance = other[6].get(u)
+            if other_distance is not None and d + other_distance < best:
+                best, meeting = d + other_distance, u
+            stalled = False
+            for i in range(stall_offsets[u], stall_offsets[u + 1]):
+                x = stall_edges[i]
+                if distances.get(stall_ends[x], INF) + weight[x] < d:
+                    stalled = True
+                    break
+            if stalled:
+                continue
+            for i in range(offsets[u], offsets[u + 1]):
+                x = edges[i]
+                v = ends[x]
+                candidate = d + weight[x]
+                if candidate < distances.get(v, INF):
+                    distances[v] = candidate
+                    parents[v] = x
+                    heapq.heappush(pq, (candidate, v))
+
+        if meeting == -1:
+            return INF, []
+
+        path: List[int] = []
+        forward_edge, backward_edge = forward[7], backward[7]
+        node = meeting
+        while forward_edge[node] != -1:
+            x = forward_edge[node]
+            path.append(x)
+            node = self.source[x]
+        path.reverse()
+        node = meeting
+        while backward_edge[node] != -1:
+            x = backward_edge[node]
+            path.append(x)
+            node = self.target[x]
+        return best, self.unpack(path)
+
+    def unpack(self, path: List[int]) -> List[int]:
+        """Kısayolları özyinelemesiz açarak grafın kenar dizisine çevirir."""
+        edges = []
+        stack = list(reversed(path))
+        while stack:
+            x = stack.pop()
+            if self.original[x] != -1:
+                edges.append(self.original[x])
+            else:
+                stack.append(self.second[x])
+                stack.append(self.first[x])
+        return edges
@@ -1,11 +1,42 @@
 from abc import ABC, abstractmethod
 import math
 
+try:
+    import numpy as np
+except ImportError:  # NumPy yoksa toplu hesaplamalar tek tek yapılır
+    np = None
+
+EARTH_RADIUS = 6371  # Dünya'nın yarıçapı (km)
+
+def as_coordinate_array(values):
+    """Koordinat dizisini toplu mesafe hesabına uygun biçime çevirir."""
+    if np is not None:
+        return np.asarray(values, dtype=np.float64)
+    return list(values)
+
 class DistanceCalculator(ABC):
     @abstractmethod
     def calculate_distance(self, lat1: float, lon1: float, lat2: float, lon2: float) -> float:
         pass
 
+    def calculate_distances(self, lat: float, lon: float, lats, lons):
+        """Tek bir noktadan birçok noktaya olan mesafeleri bir vektör olarak döndürür."""
+        if np is None:
+            return [self.calculate_distance(lat, lon, lat2, lon2) for lat2, lon2 in zip(lats, lons)]
+        return self._calculate_vectorized(np.float64(lat), np.float64(lon),
+                                          as_coordinate_array(lats), as_coordinate_array(lons))
+
+    def distance_matrix(self, lats1, lons1, lats2, lons2):
+        """İki nokta kümesi arasındaki tüm mesafeleri len(lats1) x len(lats2) matris olarak döndürür."""
+        if np is None:
+            return [self.calculate_distances(lat, lon, lats2, lons2) for lat, lon in zip(lats1, lons1)]
+        return self._calculate_vectorized(as_coordinate_array(lats1)[:, None], as_coordinate_array(lons1)[:, None],
+                                          as_coordinate_array(lats2)[None, :], as_coordinate_array(lons2)[None, :])
+
+    def _calculate_vectorized(self, lat1, lon1, lat2, lon2):
+        """NumPy yayınlama (broadcast) kurallarıyla çalışan gerçekleme; alt sınıflar hızlandırır."""
+        return np.vectorize(self.calculate_distance, otypes=[np.float64])(lat1, lon1, lat2, lon2)
+
 class HaversineCalculator(DistanceCalculator):
     def calculate_distance(self, lat1: float, lon1: float, lat2: float, lon2: float) -> float:
         """Haversine formülü ile iki nokta arasındaki mesafeyi hesaplar."""
@@ -21,14 +52,31 @@ class HaversineCalculator(DistanceCalculator):
         
         return R * c
 
+    def _calculate_vectorized(self, lat1, lon1, lat2, lon2):
+        lat1, lon1, lat2, lon2 = np.radians(lat1), np.radians(lon1), np.radians(lat2), np.radians(lon2)
+
+        dlat = lat2 - lat1
+        dlon = lon2 - lon1
+
+        a = np.sin(dlat/2)**2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon/2)**2
+        c = 2 * np.arcsin(np.sqrt(a))
+
+        return EARTH_RADIUS * c
+
 class EuclideanCalculator(DistanceCalculator):
     def calculate_distance(self, lat1: float, lon1: float, lat2: float, lon2: float) -> float:
         return math.sqrt((lat2 - lat1)**2 + (lon2 - lon1)**2) * 111  # Yaklaşık km cinsinden
 
+    def _calculate_vectorized(self, lat1, lon1, lat2, lon2):
+        return np.sqrt((lat2 - lat1)**2 + (lon2 - lon1)**2) * 111
+
 class ManhattanCalculator(DistanceCalculator):
     def calculate_distance(self, lat1: float, lon1: float, lat2: float, lon2: float) -> float:
         return (abs(lat2 - lat1) + abs(lon2 - lon1)) * 111  # Yaklaşık km cinsinden
 
+    def _calculate_vectorized(self, lat1, lon1, lat2, lon2):
+        return (np.abs(lat2 - lat1) + np.abs(lon2 - lon1)) * 111
+
 class DistanceCalculatorFactory:
     @staticmethod
     def create_calculator(calculator_type: str) -> DistanceCalculator:
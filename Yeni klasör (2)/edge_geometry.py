@@ -0,0 +1,113 @@
+import bisect
+import math
+from typing import List, Dict, Any, Optional, Sequence, Tuple
+from polyline import to_e5, encode_points, decode_points, point_count, douglas_peucker
+
+# Bağlantı şekillerinin sadeleştirilerek saklandığı yakınlaştırma düzeyleri (Leaflet zoom)
+GEOMETRY_ZOOMS = (10, 13, 16)
+# Haritanın açılış yakınlaştırması (bkz. templates/index.html)
+DEFAULT_ZOOM = 12
+# 256 piksellik karolarda zoom 0'da ekvatordaki bir pikselin karşılığı (km)
+KM_PER_PIXEL = 156.543
+# Duraklar arasında olsa da bağlantı şekli kullanılmayan, düz çizilen adımlar
+STRAIGHT_MODES = ("Yürüme", "Taksi", "Aktarma")
+
+def pixel_tolerance(zoom: int, lat: float) -> float:
+    """Verilen yakınlaştırmada bir pikselin yerdeki karşılığı (km); sadeleştirme toleransıdır."""
+    return KM_PER_PIXEL * math.cos(math.radians(lat)) / 2 ** zoom
+
+def geometry_level(zoom: Optional[float]) -> int:
+    """İstenen yakınlaştırmada bir pikselden büyük sapma göstermeyen en kaba düzey."""
+    i = bisect.bisect_left(GEOMETRY_ZOOMS, DEFAULT_ZOOM if zoom is None else zoom)
+    return GEOMETRY_ZOOMS[min(i, len(GEOMETRY_ZOOMS) - 1)]
+
+class EdgeGeometry:
+    """
+    Durak tablosundaki bağlantıların (next_ids sırasıyla) her düzey için sadeleştirilmiş şekilleri.
+    Kayıt, bağlantının başladığı durağa göre fark olarak kodlanmış ara noktalar ve bitiş durağıdır;
+    rota geometrisi bu parçalar art arda eklenerek, yeniden sadeleştirme yapılmadan oluşturulur.
+    Şekli olmayan bağlantıların kaydı None'dır ve iki durak arasında düz çizgi olarak çizilir.
+    """
+    def __init__(self, levels: Dict[int, Sequence[Optional[str]]]):
+        self.levels = levels
+
+    @classmethod
+    def build(cls, table) -> "EdgeGeometry":
+        count = len(table.next_ids)
+        levels: Dict[int, List[Optional[str]]] = {zoom: [None] * count for zoom in GEOMETRY_ZOOMS}
+        for e, shape in enumerate(table.next_shapes):
+            v = table.index.get(table.next_ids[e]) if shape is not None else None
+            if v is None:
+                continue
+            # Bağlantının başladığı durak: next_offsets[u] <= e < next_offsets[u + 1]
+            u = bisect.bisect_right(table.next_offsets, e) - 1
+            start = (table.lat[u], table.lon[u])
+            previous = (to_e5(start[0]), to_e5(start[1]))
+            points = [start] + decode_points(shape) + [(table.lat[v], table.lon[v])]
+            for zoom, chunks in levels.items():
+                simplified = douglas_peucker(points, pixel_tolerance(zoom, start[0]))
+                chunks[e] = encode_points(simplified[1:], previous)
+        return cls(levels)
+
+    def chunk(self, zoom: int, entry: int) -> Optional[str]:
+        return self.levels[zoom][entry]
+
+def next_entry(table, u: int, stop_id: str) -> Optional[int]:
+    for e in range(table.next_offsets[u], table.next_offsets[u + 1]):
+        if table.next_ids[e] == stop_id:
+            return e
+    return None
+
+def route_geometry(route: Dict[str, Any], network=None,
+                   zoom: Optional[float] = None) -> Tuple[str, List[Tuple[int, int]]]:
+    """
+    Rotanın tüm geometrisini tek bir Google polyline metni olarak oluşturur.
+    Durakları art arda bağlayan araç adımları için bağlantıların önceden sadeleştirilmiş şekilleri
+    eklenir; yürüme, taksi ve aktarma adımları düz çizgidir. Her adım için çözülmüş noktalardaki
+    (ilk, son) nokta indeksleri de döner.
+    """
+    steps = route["steps"]
+    stops = route.get("stops") or []
+    table = network.table if network is not None else None
+    geometry = network.geometry if network is not None else None
+    level = geometry_level(zoom)
+
+    def at(stop, point) -> bool:
+        return stop["lat"] == point["lat"] and stop["lon"] == point["lng"]
+
+    first = steps[0]["from"]
+    chunks = [encode_points([(first["lat"], first["lng"])])]
+    previous = (to_e5(first["lat"]), to_e5(first["lng"]))
+    count = 1
+    ranges = []
+    k = -1
+    for step in steps:
+        begin = count - 1
+        target = step["to"]
+        j = next((j for j in range(k + 1, len(stops)) if at(stops[j], target)), None)
+        if (table is not None and j is not None and k >= 0 and step["mode"] not in STRAIGHT_MODES
+                and at(stops[k], step["from"])):
+            # Adımın geçtiği ardışık durak çiftleri; bağlantı yoksa (aktarma, yürüme) düz çizgi
+            for a, b in zip(stops[k:j], stops[k + 1:j + 1]):
+                entry = next_entry(table, table.index[a["id"]], b["id"])
+                chunk = geometry.chunk(level, entry) if entry is not None else None
+                if chunk is None:
+                    chunk = encode_points([(b["lat"], b["lon"])], previous)
+                chunks.append(chunk)
+                count += point_count(chunk)
+                previous = (to_e5(b["lat"]), to_e5(b["lon"]))
+        else:
+            chunk = encode_points([(target["lat"], target["lng"])], previous)
+            chunks.append(chunk)
+            count += 1
+            previous = (to_e5(target["lat"]), to_e5(target["lng"]))
+        if j is not None:
+            k = j
+        ranges.append((begin, count - 1))
+    return "".join(chunks), ranges
+
+def with_geometry(route: Dict[str, Any], network=None, zoom: Optional[float] = None) -> Dict[str, Any]:
+    """Rotanın polyline geometrisini ve adımların nokta aralıklarını ekleyen kopyası (önbellekteki rota değişmez)."""
+    polyline, ranges = route_geometry(route, network, zoom)
+    steps = [{**step, "polyline_range": list(points)} for step, points in zip(route["steps"], ranges)]
+    return {**route, "steps": steps, "polyline": polyline}
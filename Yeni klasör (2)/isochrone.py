@@ -0,0 +1,209 @@
+import heapq
+import math
+from typing import List, Dict, Any, Optional, Tuple, Callable
+from compiled_graph import CompiledGraph, EDGE_DIRECT
+from route_planner import haversine, calculate_walking_time, edge_fare
+
+INF = float("inf")
+KM_PER_DEGREE = 6371 * math.pi / 180
+# calculate_walking_time ile aynı yürüme hızı (dakika/km)
+WALKING_MINUTES_PER_KM = 12
+
+# Izgara çok küçük hücrelerle istenirse yanıt ve hesaplama gereksiz büyür
+MIN_CELL_SIZE = 0.05
+MAX_CELLS = 250000
+
+def bounded_search(graph: CompiledGraph, sources: Dict[int, Tuple[float, float]],
+                   max_time: float = INF, max_cost: Optional[float] = None,
+                   max_labels: int = 8,
+                   fare: Optional[Callable[[int, int, bool], float]] = None) -> Dict[int, Tuple[float, float]]:
+    """
+    Kaynaklardan bütçe içinde erişilebilen tüm düğümleri tek geçişte bulan bire-çok arama.
+    sources düğüm -> (başlangıç süresi, başlangıç ücreti) eşlemesidir.
+    Ücret bütçesi yoksa yalnızca süreye göre (Dijkstra), varsa süre/ücret etiketleriyle çalışır;
+    pahalı ama hızlı bir yol bütçeyi aşarsa daha ucuz ve yavaş yol elenmez.
+    Kenar ücretleri fare(düğüm, kenar, aktarmadan_sonra) ile hesaplanır; verilmezse grafın ücretleri kullanılır.
+    Sonuç: düğüm -> (bütçe içindeki en kısa süre, o yolun ücreti).
+    """
+    use_cost = max_cost is not None
+    cost_limit = max_cost if use_cost else INF
+    n = graph.node_count
+    offsets = graph.offsets
+    targets = graph.targets
+    times = graph.time
+    costs = graph.cost
+    edge_types = graph.edge_type
+    # Aktarma indirimi sıradaki yolculuğun ücretini değiştirdiğinden ücret bütçesinde
+    # durum (düğüm, indirim hakkı) çiftidir: düğüm * 2 + hak
+    split_states = use_cost and fare is not None
+
+    # Etiketler süre sırasıyla yerleştiğinden, durumda daha önce yerleşen daha ucuz etiket
+    # yenisini baskılar; durum başına yerleşen en düşük ücret yeterlidir
+    settled_cost = [INF] * (2 * n)
+    settled_labels = [0] * (2 * n)
+    reached: Dict[int, Tuple[float, float]] = {}
+    pq = []
+    for node, (time, cost) in sources.items():
+        if time <= max_time and cost <= cost_limit:
+            heapq.heappush(pq, (time, cost, node, 0))
+
+    while pq:
+        time, cost, u, after = heapq.heappop(pq)
+        state = 2 * u + (after if split_states else 0)
+        key = cost if use_cost else 0
+        if key >= settled_cost[state] or settled_labels[state] >= max_labels:
+            continue
+        settled_cost[state] = key
+        settled_labels[state] += 1
+        if u not in reached:
+            reached[u] = (time, cost)
+
+        for e in range(offsets[u], offsets[u + 1]):
+            v = targets[e]
+            next_time = time + times[e]
+            next_cost = cost + (costs[e] if fare is None else fare(u, e, after == 1))
+            next_after = 1 if fare is not None and edge_types[e] != EDGE_DIRECT else 0
+            # Kapatılmış aktarmaların süresi sonsuzdur (bkz. network_updates.py)
+            if next_time > max_time or next_cost > cost_limit:
+                continue
+            if (next_cost if use_cost else 0) < settled_cost[2 * v + (next_after if split_states else 0)]:
+                heapq.heappush(pq, (next_time, next_cost, v, next_after))
+    return reached
+
+class IsochroneGrid:
+    """
+    Başlangıç noktasına hizalı düzenli ızgara; her hücrede en erken varış süresi (dakika) tutulur.
+    Hücre (satır, sütun) merkezi, başlangıçtan satır * cell_size km kuzeyde ve sütun * cell_size km doğudadır.
+    """
+    def __init__(self, lat: float, lon: float, cell_size: float):
+        self.lat = lat
+        self.lon = lon
+        self.cell_size = cell_size
+        self.lat_step = cell_size / KM_PER_DEGREE
+        self.lon_step = cell_size / (KM_PER_DEGREE * math.cos(math.radians(lat)))
+        self.cells: Dict[Tuple[int, int], float] = {}
+
+    def stamp_range(self, lat: float, lon: float, radius: float) -> Tuple[int, int, int, int]:
+        """stamp'in tarayacağı (ilk satır, son satır, ilk sütun, son sütun) aralığı."""
+        row0 = round((lat - self.lat) / self.lat_step)
+        col0 = round((lon - self.lon) / self.lon_step)
+        reach = math.ceil(radius / self.cell_size) + 1
+        return row0 - reach, row0 + reach, col0 - reach, col0 + reach
+
+    def span(self, stamps: List[Tuple[float, float, float]]) -> int:
+        """(enlem, boylam, yarıçap) damgalarının kaplayacağı sınır kutusundaki hücre sayısı (üst sınır)."""
+        ranges = [self.stamp_range(lat, lon, radius) for lat, lon, radius in stamps]
+        rows = max(r[1] for r in ranges) - min(r[0] for r in ranges) + 1
+        cols = max(r[3] for r in ranges) - min(r[2] for r in ranges) + 1
+        return rows * cols
+
+    def stamp(self, lat: float, lon: float, arrival: float, radius: float) -> None:
+        """Noktadan radius (km) içinde yürüyerek ulaşılan hücrelerin varış süresini günceller."""
+        first_row, last_row, first_col, last_col = self.stamp_range(lat, lon, radius)
+        cells = self.cells
+        for row in range(first_row, last_row + 1):
+            cell_lat = self.lat + row * self.lat_step
+            for col in range(first_col, last_col + 1):
+                cell_lon = self.lon + col * self.lon_step
+                distance = haversine(lat, lon, cell_lat, cell_lon)
+                if distance > radius:
+                    continue
+                time = arrival + calculate_walking_time(distance)
+                if time < cells.get((row, col), INF):
+                    cells[(row, col)] = time
+
+    def features(self, band: float) -> List[Dict[str, Any]]:
+        """
+        Hücreleri band dakikalık dilimlere ayırıp aynı satırda yan yana ve aynı dilimdeki
+        hücreleri tek dikdörtgende birleştirerek GeoJSON poligonlarına çevirir.
+        """
+        features = []
+        rows: Dict[int, List[Tuple[int, float]]] = {}
+        for (row, col), time in self.cells.items():
+            rows.setdefault(row, []).append((col, time))
+
+        for row in sorted(rows):
+            run = None
+            for col, time in sorted(rows[row]) + [(None, None)]:
+                upper = max(band, math.ceil(time / band) * band) if time is not None else None
+                if run and col == run[1] + 1 and upper == run[2]:
+                    run[1] = col
+                    run[3] = min(run[3], time)
+                    continue
+                if run:
+                    features.append(self._rectangle(row, *run))
+                run = [col, col, upper, time] if col is not None else None
+        return features
+
+    def _rectangle(self, row: int, first: int, last: int, upper: float, earliest: float) -> Dict[str, Any]:
+        south = self.lat + (row - 0.5) * self.lat_step
+        north = self.lat + (row + 0.5) * self.lat_step
+        west = self.lon + (first - 0.5) * self.lon_step
+        east = self.lon + (last + 0.5) * self.lon_step
+        ring = [[round(x, 6), round(y, 6)] for x, y in
+                ((west, south), (east, south), (east, north), (west, north), (west, south))]
+        return {
+            "type": "Feature",
+            "geometry": {"type": "Polygon", "coordinates": [ring]},
+            "properties": {"kind": "cell", "band": upper, "time": earliest}
+        }
+
+def find_isochrone(origin, network, max_time: Optional[float] = None, max_cost: Optional[float] = None,
+                   max_walk: float = 1.0, cell_size: float = 0.25, band: float = 10,
+                   passenger_type: str = "Genel") -> Dict[str, Any]:
+    """
+    Başlangıç noktasından süre ve/veya ücret bütçesiyle erişilebilen durakları ve yürüyerek
+    ulaşılabilen alanı tek bir aramayla hesaplar. Ücretler rota stratejileriyle aynı şekilde
+    edge_fare ile hesaplanır. Sonuç GeoJSON FeatureCollection'dır:
+    erişilen duraklar nokta, eş-süre ızgarası band dakikalık dilimlerde poligon olarak döner.
+    """
+    if max_time is None and max_cost is None:
+        raise ValueError("En az bir bütçe (süre veya ücret) gerekli")
+    if cell_size < MIN_CELL_SIZE or band <= 0:
+        raise ValueError("Geçersiz ızgara hücresi veya dilim boyutu")
+    time_limit = INF if max_time is None else max_time
+    # Süre bütçesi yoksa yürüme yalnızca max_walk ile sınırlıdır
+    walk_radius = min(max_walk, time_limit / WALKING_MINUTES_PER_KM)
+
+    lat, lon = origin["lat"], origin["lng"]
+    graph = network.graph
+    table = network.table
+    index = network.index_of_type("all")
+    sources = {}
+    for i, dist in index.within(lat, lon, walk_radius):
+        sources[graph.index_of(index.stops[i]["id"])] = (calculate_walking_time(dist), 0)
+
+    fares = {}
+
+    def fare(node, e, after_transfer):
+        key = (e, after_transfer)
+        if key not in fares:
+            fares[key] = edge_fare(network, node, e, passenger_type, after_transfer)
+        return fares[key]
+
+    reached = bounded_search(graph, sources, time_limit, max_cost, fare=fare)
+
+    grid = IsochroneGrid(lat, lon, cell_size)
+    ordered = sorted(reached.items(), key=lambda item: item[1])
+    stamps = [(lat, lon, walk_radius)] + [
+        (table.lat[node], table.lon[node], min(max_walk, (time_limit - time) / WALKING_MINUTES_PER_KM))
+        for node, (time, _) in ordered]
+    # Izgara boyutu hücreler damgalanmadan önce, damgaların sınır kutusuyla denetlenir
+    if grid.span(stamps) > MAX_CELLS:
+        raise ValueError("Eş-süre ızgarası çok büyük, hücre boyutunu artırın")
+
+    grid.stamp(lat, lon, 0, walk_radius)
+    features = []
+    for (node, (time, cost)), (stop_lat, stop_lon, radius) in zip(ordered, stamps[1:]):
+        grid.stamp(stop_lat, stop_lon, time, radius)
+        features.append({
+            "type": "Feature",
+            "geometry": {"type": "Point", "coordinates": [stop_lon, stop_lat]},
+            "properties": {"kind": "stop", "id": table.ids[node], "name": table.names[node],
+                           "type": table.types[node], "time": time, "cost": cost}
+        })
+
+    return {
+        "type": "FeatureCollection",
+        "features": features + grid.features(band)
+    }
@@ -1,12 +1,52 @@
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Response, render_template, request, jsonify
+from flask.json.provider import DefaultJSONProvider
+import atexit
+import hmac
 import json
-from route_planner import plan_route, find_routes_by_type
+import math
+import os
+import signal
+import sys
+from route_planner import plan_route, find_routes_by_type, find_earliest_arrival_route, affordable_routes, is_affordable
+from network_snapshot import NetworkStore
+from compiled_graph import WALK_RADIUS
+from pareto_search import find_pareto_routes
+from astar_search import find_fastest_route, SEARCH_ALGORITHMS
+from batch_planner import BatchNetworkView, plan_pair
+from isochrone import find_isochrone
+from edge_geometry import with_geometry
+from vector_tiles import TileCache, TILE_MIMETYPE, valid_tile
+from route_cache import RouteCache
+from stops_payload import stops_payload
+from planner_pool import PlannerPool, PoolBusy, PlanningTimeout
+from transport_data import StopView, NetworkDataError, json_default, is_time
+from datetime import datetime
+
+class NetworkJSONProvider(DefaultJSONProvider):
+    """Rotalardaki durak görünümlerini JSON'a çevirebilen sağlayıcı."""
+    @staticmethod
+    def default(o):
+        if isinstance(o, StopView):
+            return dict(o)
+        return DefaultJSONProvider.default(o)
 
 app = Flask(__name__)
+app.json = NetworkJSONProvider(app)
 
-def load_data():
-    with open("data.txt", "r", encoding="utf-8") as file:
-        return json.load(file)
+# Ağ verisi başlangıçta bir kez yüklenir, dosya değişirse yeniden yüklenir.
+# Büyük ağlarda CONTRACTION_HIERARCHY=1 ile kısayol hiyerarşisi kurulur ve görüntüyle saklanır.
+# WALK_TRANSFER_RADIUS (km) duraklar arası yürüme aktarmalarının en uzun mesafesidir.
+network_store = NetworkStore("data.txt", contraction=os.environ.get("CONTRACTION_HIERARCHY", "0") == "1",
+                             walk_radius=float(os.environ.get("WALK_TRANSFER_RADIUS", WALK_RADIUS)))
+network_store.get()
+route_cache = RouteCache()
+# Vektör karoları ağ sürümü başına veri dosyasının yanında saklanır (bkz. vector_tiles.py)
+tile_cache = TileCache(network_store.file_path)
+# Ağ güncellemeleri yalnızca UPDATE_TOKEN tanımlıysa ve istek bu belirteci taşıyorsa kabul edilir
+update_token = os.environ.get("UPDATE_TOKEN")
+planner_pool = PlannerPool(workers=int(os.environ.get("PLANNER_WORKERS", 4)),
+                           queue_size=int(os.environ.get("PLANNER_QUEUE", 16)),
+                           timeout=float(os.environ.get("PLANNER_TIMEOUT", 10)))
 
 @app.route("/")
 def index():
@@ -14,51 +54,323 @@ def index():
 
 @app.route("/get_stops", methods=["GET"])
 def get_stops():
-    # Her istek için veriyi yeniden yükle
-    data = load_data()
-    return jsonify(data["duraklar"])
+    network = network_store.get()
+    # ?view=slim yalnızca harita için gereken alanları döndürür
+    payload = stops_payload(network, request.args.get("view", "full"))
+    if payload is None:
+        return jsonify({'error': 'Bilinmeyen görünüm'}), 400
+
+    encoding = payload.negotiate(request.accept_encodings)
+    if any(request.if_none_match.contains(etag) for etag in payload.etags.values()):
+        response = Response(status=304)
+    else:
+        response = Response(payload.encodings[encoding], mimetype="application/json")
+        if encoding != "identity":
+            response.headers["Content-Encoding"] = encoding
+    response.set_etag(payload.etags[encoding])
+    response.headers["Vary"] = "Accept-Encoding"
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Network-Version"] = network.version
+    return response
+
+@app.route("/tiles/<int:z>/<int:x>/<int:y>", methods=["GET"])
+def tiles(z, x, y):
+    """Durakların (düşük yakınlaştırmada kümelenmiş) ve hat bağlantılarının vektör karosu (MVT)."""
+    if not valid_tile(z, x, y):
+        return jsonify({'error': 'Geçersiz karo'}), 404
+
+    network = network_store.get()
+    etag = f"{network.version}-{z}-{x}-{y}"
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        try:
+            data = planner_pool.run(tile_cache.get, network, z, x, y)
+        except PoolBusy:
+            response = jsonify({'error': 'Sunucu yoğun, lütfen tekrar deneyin'})
+            response.headers["Retry-After"] = "1"
+            return response, 429
+        except PlanningTimeout:
+            return jsonify({'error': 'Karo üretimi zaman aşımına uğradı'}), 504
+        response = Response(data, mimetype=TILE_MIMETYPE)
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Network-Version"] = network.version
+    return response
+
+def select_best_routes(routes):
+    """Her rota tipi için en iyi rotayı seçer."""
+    best_routes = []
+    for route_type, route_list in routes.items():
+        if route_list:
+            if isinstance(route_list, list):
+                # En iyi rotayı ekle
+                best_routes.append({**route_list[0], 'type': route_type})
+            else:
+                best_routes.append({**route_list, 'type': route_type})
+    return best_routes
+
+def plan_coordinates(request_data, network):
+    """İsteğin stratejisine göre rotaları hesaplar; planlama havuzunda çalışır."""
+    start_coord = request_data['start']
+    end_coord = request_data['end']
+    passenger_type = request_data.get('passengerType', 'Genel')
+    # Ödeme bilgisi verilmezse bakiye sınırı yoktur; verilirse tüm stratejiler is_affordable ile elenir
+    payment_info = request_data.get('paymentInfo')
+    
+    taxi_info = network.taxi  # Taksi bilgilerini data.txt'den al
+
+    # Pareto stratejisi: tek aramada süre/ücret/aktarma dengesi olan tüm rotalar
+    if request_data.get('strategy') == 'pareto':
+        return [
+            {**route, 'type': 'pareto'}
+            for route in find_pareto_routes(start_coord, end_coord, network, passenger_type=passenger_type)
+            if is_affordable(route, payment_info)
+        ]
+
+    # Sefer planına göre en erken varış (RAPTOR), kalkış saati verilmezse şimdiki saat
+    if request_data.get('strategy') == 'earliest':
+        departure_time = request_data.get('departureTime') or datetime.now().strftime("%H:%M")
+        route = find_earliest_arrival_route(start_coord, end_coord, network, departure_time,
+                                            passenger_type=passenger_type)
+        return [{**route, 'type': 'earliest'}] if route and is_affordable(route, payment_info) else []
+
+    # En kısa süreli rota; search ile A* (varsayılan) veya Dijkstra seçilir
+    if request_data.get('strategy') == 'fastest':
+        route = find_fastest_route(start_coord, end_coord, network, request_data.get('search', 'astar'),
+                                   passenger_type=passenger_type)
+        return [{**route, 'type': 'fastest'}] if route and is_affordable(route, payment_info) else []
+
+    # Önbellekteki rotalar bakiyeden bağımsızdır; isteğin bakiyesi sonradan uygulanır
+    routes = route_cache.find_routes(
+        network, start_coord, end_coord, passenger_type,
+        lambda start, end, passenger: find_routes_by_type(
+            start, end, network.stops, taxi_info, passenger, None, network=network, max_routes=None))
+    return select_best_routes(affordable_routes(routes, payment_info))
 
 @app.route("/process_coordinates", methods=["POST"])
 def process_coordinates():
     try:
-        # Her istek için veriyi yeniden yükle
-        data = load_data()
+        network = network_store.get()
         
         request_data = request.get_json()
         
         if not request_data or 'start' not in request_data or 'end' not in request_data:
             return jsonify({'error': 'Başlangıç ve bitiş koordinatları gerekli'}), 400
-            
-        start_coord = request_data['start']
-        end_coord = request_data['end']
-        passenger_type = request_data.get('passengerType', 'Genel')
-        payment_info = request_data.get('paymentInfo', {})
-        
-        taxi_info = data["taxi"]  # Taksi bilgilerini data.txt'den al
-        
-        routes = find_routes_by_type(start_coord, end_coord, data["duraklar"], taxi_info, passenger_type, payment_info)
-        
-        # Her rota tipi için en iyi rotayı seç
-        best_routes = []
-        for route_type, route_list in routes.items():
-            if route_list:
-                if isinstance(route_list, list):
-                    # En iyi rotayı ekle
-                    route = route_list[0]
-                    route['type'] = route_type
-                    best_routes.append(route)
-                else:
-                    route_list['type'] = route_type
-                    best_routes.append(route_list)
+
+        if request_data.get('search', 'astar') not in SEARCH_ALGORITHMS:
+            return jsonify({'error': 'Bilinmeyen arama algoritması'}), 400
+
+        # Rota geometrisi haritanın yakınlaştırmasına göre sadeleştirilmiş olarak döner
+        zoom = request_data.get('zoom')
+        if zoom is not None and (not isinstance(zoom, (int, float)) or isinstance(zoom, bool) or not 0 <= zoom <= 22):
+            return jsonify({'error': 'Geçersiz yakınlaştırma düzeyi'}), 400
+
+        # En erken varış stratejisinin kalkış saati "SS:DD" biçimindedir (gece yarısından sonrası için 47:59'a kadar)
+        departure_time = request_data.get('departureTime')
+        if departure_time and not is_time(departure_time):
+            return jsonify({'error': 'Kalkış saati SS:DD biçiminde olmalı (saat 0-47, dakika 0-59)'}), 400
+
+        if not valid_payment_info(request_data.get('paymentInfo')):
+            return jsonify({'error': 'paymentInfo sayısal bakiyeler içeren bir nesne olmalı'}), 400
+
+        try:
+            best_routes = planner_pool.run(plan_coordinates, request_data, network)
+        except PoolBusy:
+            response = jsonify({'error': 'Sunucu yoğun, lütfen tekrar deneyin'})
+            response.headers["Retry-After"] = "1"
+            return response, 429
+        except PlanningTimeout:
+            return jsonify({'error': 'Rota hesaplaması zaman aşımına uğradı'}), 504
         
-        return jsonify({
+        response = jsonify({
             'message': 'Rotalar hesaplandı!',
-            'routes': best_routes
+            'routes': [with_geometry(route, network, zoom) for route in best_routes],
+            'networkVersion': network.version
         })
+        response.headers["X-Network-Version"] = network.version
+        return response
         
     except Exception as e:
         print(f"Hata: {str(e)}")
         return jsonify({'error': 'Rota hesaplanırken bir hata oluştu'}), 500
 
+def is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+def valid_coordinate(coord):
+    return isinstance(coord, dict) and all(is_number(coord.get(key)) for key in ('lat', 'lng'))
+
+def valid_payment_info(payment_info):
+    """Bakiye bilgisi verilmeyebilir (sınırsız); verilirse bakiyeler negatif olmayan sayılardır."""
+    return payment_info is None or isinstance(payment_info, dict) and all(
+        is_number(payment_info[key]) and payment_info[key] >= 0
+        for key in ('kentkart', 'cash', 'creditCard') if key in payment_info)
+
+@app.route("/plan_batch", methods=["POST"])
+def plan_batch_route():
+    request_data = request.get_json()
+    if not request_data or not isinstance(request_data.get('pairs'), list):
+        return jsonify({'error': 'Başlangıç/bitiş çiftleri (pairs) gerekli'}), 400
+
+    # Akış başladıktan sonra hata kodu dönülemeyeceğinden tüm çiftler önceden doğrulanır
+    pairs = request_data['pairs']
+    for i, pair in enumerate(pairs):
+        if not isinstance(pair, dict) or not valid_coordinate(pair.get('start')) or not valid_coordinate(pair.get('end')):
+            return jsonify({'error': f'pairs[{i}] için başlangıç ve bitiş koordinatları (lat, lng) gerekli'}), 400
+        if not valid_payment_info(pair.get('paymentInfo')):
+            return jsonify({'error': f'pairs[{i}].paymentInfo sayısal bakiyeler içeren bir nesne olmalı'}), 400
+
+    network = network_store.get()
+    passenger_type = request_data.get('passengerType', 'Genel')
+    # Bakiye bilgisi verilmezse od_matrix.py'de olduğu gibi bakiye sınırı uygulanmaz
+    payment_info = request_data.get('paymentInfo')
+    if not valid_payment_info(payment_info):
+        return jsonify({'error': 'paymentInfo sayısal bakiyeler içeren bir nesne olmalı'}), 400
+
+    # Her çift planlama havuzunda ayrı bir iş olarak hesaplanır; havuz doluysa veya ilk çift
+    # zaman aşımına uğrarsa akış başlamadan 429/504 döner, sonraki çiftlerde hata satırı gönderilir
+    view = BatchNetworkView(network)
+
+    def plan(i):
+        return planner_pool.run(plan_pair, pairs[i], view, passenger_type, payment_info)
+
+    def result_line(i, routes):
+        return json.dumps({
+            'index': i,
+            'routes': select_best_routes(routes),
+            'networkVersion': network.version
+        }, ensure_ascii=False, default=json_default) + "\n"
+
+    def error_line(i, message):
+        return json.dumps({'index': i, 'error': message}, ensure_ascii=False) + "\n"
+
+    first = None
+    if pairs:
+        try:
+            first = plan(0)
+        except PoolBusy:
+            response = jsonify({'error': 'Sunucu yoğun, lütfen tekrar deneyin'})
+            response.headers["Retry-After"] = "1"
+            return response, 429
+        except PlanningTimeout:
+            return jsonify({'error': 'Rota hesaplaması zaman aşımına uğradı'}), 504
+        except Exception as e:
+            print(f"Hata: {str(e)}")
+            return jsonify({'error': 'Rota hesaplanırken bir hata oluştu'}), 500
+
+    def generate():
+        # Her çiftin sonucu hesaplanır hesaplanmaz ayrı bir JSON satırı olarak gönderilir
+        for i in range(len(pairs)):
+            try:
+                yield result_line(i, first if i == 0 else plan(i))
+            except PoolBusy:
+                yield error_line(i, 'Sunucu yoğun, lütfen tekrar deneyin')
+            except PlanningTimeout:
+                yield error_line(i, 'Rota hesaplaması zaman aşımına uğradı')
+            except Exception as e:
+                # Durum kodu gönderildiğinden hata, akışı sessizce kesmek yerine satır olarak bildirilir
+                print(f"Hata: {str(e)}")
+                yield error_line(i, 'Rota hesaplanırken bir hata oluştu')
+
+    response = Response(generate(), mimetype="application/x-ndjson")
+    response.headers["X-Network-Version"] = network.version
+    return response
+
+@app.route("/isochrone", methods=["POST"])
+def isochrone():
+    """Başlangıç noktasından süre ve/veya ücret bütçesiyle erişilebilen alanı GeoJSON olarak döndürür."""
+    request_data = request.get_json()
+    if not request_data or not valid_coordinate(request_data.get('start')):
+        return jsonify({'error': 'Başlangıç koordinatı (lat, lng) gerekli'}), 400
+
+    # Bütçeler verilmeyebilir; verilen tüm değerler pozitif sayı olmalıdır
+    params = {'maxTime': None, 'maxCost': None, 'maxWalk': 1.0, 'cellSize': 0.25, 'band': 10}
+    for key in params:
+        value = request_data.get(key, params[key])
+        if value is not None and not (is_number(value) and value > 0):
+            return jsonify({'error': f'{key} pozitif bir sayı olmalı'}), 400
+        params[key] = value
+
+    network = network_store.get()
+    try:
+        result = planner_pool.run(
+            find_isochrone, request_data['start'], network, params['maxTime'], params['maxCost'],
+            params['maxWalk'], params['cellSize'], params['band'], request_data.get('passengerType', 'Genel'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except PoolBusy:
+        response = jsonify({'error': 'Sunucu yoğun, lütfen tekrar deneyin'})
+        response.headers["Retry-After"] = "1"
+        return response, 429
+    except PlanningTimeout:
+        return jsonify({'error': 'Erişilebilirlik hesaplaması zaman aşımına uğradı'}), 504
+
+    response = jsonify(result)
+    response.headers["X-Network-Version"] = network.version
+    return response
+
+@app.route("/update_network", methods=["POST"])
+def update_network():
+    """
+    Durak, bağlantı ve aktarma güncellemelerini veri dosyasını yeniden yüklemeden uygular.
+    İstek "Authorization: Bearer <UPDATE_TOKEN>" başlığını taşımalıdır; belirteç tanımlı değilse uç kapalıdır.
+    """
+    if not update_token:
+        return jsonify({'error': 'Ağ güncellemeleri kapalı'}), 404
+    if not hmac.compare_digest(request.headers.get("Authorization", "").encode(), f"Bearer {update_token}".encode()):
+        return jsonify({'error': 'Yetkisiz istek'}), 401
+
+    request_data = request.get_json()
+    if not request_data or not isinstance(request_data.get('operations'), list):
+        return jsonify({'error': 'Güncelleme işlemleri (operations) gerekli'}), 400
+
+    try:
+        update = network_store.apply_updates(request_data['operations'])
+    except NetworkDataError as e:
+        return jsonify({'error': 'Güncelleme uygulanamadı',
+                        'details': [f"{location}: {message}" for location, message in e.errors]}), 400
+
+    # Yalnızca güncellemeden etkilenen rotalar önbellekten silinir
+    kept = route_cache.carry_over(update.previous_version, update.snapshot.version,
+                                  update.affected_stops, update.improves)
+    response = jsonify({
+        'message': 'Ağ güncellendi',
+        'networkVersion': update.snapshot.version,
+        'affectedStops': sorted(update.affected_stops),
+        'cachedRoutesKept': kept
+    })
+    response.headers["X-Network-Version"] = update.snapshot.version
+    return response
+
+@app.route("/cache_stats", methods=["GET"])
+def cache_stats():
+    return jsonify(route_cache.stats())
+
+def shutdown(*_):
+    """Yeni planlama isteklerini reddeder ve çalışan hesaplamaların bitmesini bekler."""
+    print("Sunucu kapatılıyor, çalışan hesaplamalar bekleniyor...")
+    planner_pool.shutdown(wait=True)
+
+def serve(host="0.0.0.0", port=5000):
+    """
+    Üretim modu: hata ayıklayıcı ve yeniden yükleyici olmadan çok iş parçacıklı sunucu.
+    waitress kuruluysa onu, değilse Flask'ın iş parçacıklı sunucusunu kullanır.
+    """
+    atexit.register(shutdown)
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        from waitress import serve as waitress_serve
+    except ImportError:
+        waitress_serve = None
+
+    if waitress_serve is not None:
+        waitress_serve(app, host=host, port=port, threads=planner_pool.workers + planner_pool.queue_size)
+    else:
+        app.run(host=host, port=port, debug=False, use_reloader=False, threaded=True)
+
 if __name__ == "__main__":
-    app.run(debug=True)
\ No newline at end of file
+    if "--production" in sys.argv:
+        serve(port=int(os.environ.get("PORT", 5000)))
+    else:
+        app.run(debug=True)
\ No newline at end of file
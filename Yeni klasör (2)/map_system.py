@@ -1,15 +1,15 @@
 from typing import List
 import folium
 from folium.plugins import MarkerCluster
-from transport_data import Stop, NextStop, Transfer
+from transport_data import StopView
 
 class MapSystem:
     def __init__(self):
         self.stops = {}
         self.routes = []
 
-    def add_stop(self, stop: Stop):
-        self.stops[stop.id] = stop
+    def add_stop(self, stop: StopView):
+        self.stops[stop["id"]] = stop
 
     def add_route(self, start_stop_id: str, end_stop_id: str, distance: float, duration: int, cost: float):
         self.routes.append({
@@ -30,18 +30,18 @@ class MapVisualizer:
         # Durakları ve aralarındaki bağlantıları ekle
         for stop_id, stop in map_system.stops.items():
             folium.Marker(
-                location=[stop.lat, stop.lon],
-                popup=f"{stop.name} (ID: {stop.id}, Tip: {stop.type})",
-                icon=folium.Icon(color='blue' if stop.type == 'bus' else 'green')
+                location=[stop["lat"], stop["lon"]],
+                popup=f"{stop['name']} (ID: {stop['id']}, Tip: {stop['type']})",
+                icon=folium.Icon(color='blue' if stop['type'] == 'bus' else 'green')
             ).add_to(transport_map)
 
             # Her durak için sonraki durak bağlantısını çiz
-            for next_stop in stop.nextStops:
-                next_stop_obj = map_system.stops.get(next_stop.stopId)
+            for next_stop in stop["nextStops"]:
+                next_stop_obj = map_system.stops.get(next_stop["stopId"])
                 if next_stop_obj:
                     folium.PolyLine(
-                        locations=[[stop.lat, stop.lon], [next_stop_obj.lat, next_stop_obj.lon]],
-                        color='blue' if stop.type == 'bus' else 'green',
+                        locations=[[stop["lat"], stop["lon"]], [next_stop_obj["lat"], next_stop_obj["lon"]]],
+                        color='blue' if stop['type'] == 'bus' else 'green',
                         weight=2.5,
                         opacity=1
                     ).add_to(transport_map)
@@ -0,0 +1,274 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from array import array
+from typing import List, Dict, Any, Optional, Tuple
+from compiled_graph import CompiledGraph, WALK_RADIUS
+from spatial_index import SpatialIndex
+from transport_data import CityData, Line, StopTable, StopList, StopsById, NetworkDataError, load_city
+from binary_store import ArrayFile
+from snapshot_file import SNAPSHOT_FORMAT, snapshot_path, write_snapshot, read_snapshot
+from raptor import RaptorEngine
+from contraction import ContractionHierarchy
+from edge_geometry import EdgeGeometry
+from network_updates import NetworkUpdate, apply_updates
+
+EMPTY_INDEX = SpatialIndex([])
+
+class NetworkSnapshot:
+    """
+    Belirli bir veri dosyası sürümünden bir kez oluşturulan, değiştirilmeyen ağ görüntüsü.
+    Duraklar StopTable'da tutulur; stops listesi tabloya bakan görünümlerdir.
+    graph, stops_by_type ve spatial_index verilmezse duraklardan hesaplanır (bkz. snapshot_file.py).
+    Graf, walk_radius (km) içindeki yakın durak çiftleri arasında yürüyerek aktarma kenarları içerir.
+    """
+    def __init__(self, version: str, city: str, taxi: Dict[str, float], stops,
+                 lines: Optional[List[Any]] = None, graph: Optional[CompiledGraph] = None,
+                 stops_by_type: Optional[Dict[str, StopList]] = None,
+                 spatial_index: Optional[Dict[str, SpatialIndex]] = None, store: Optional[ArrayFile] = None,
+                 contraction: Optional[ContractionHierarchy] = None, walk_radius: float = WALK_RADIUS,
+                 geometry: Optional[EdgeGeometry] = None):
+        self.version = version
+        self.city = city
+        self.taxi = taxi
+        self.table = stops if isinstance(stops, StopTable) else StopTable.from_records(stops)
+        self.stops = StopList(self.table)
+        self.stops_by_id = StopsById(self.table)
+        self.walk_radius = walk_radius
+        self.graph = graph or CompiledGraph.from_table(self.table, walk_radius)
+        # İkili görüntü dosyasından açıldıysa mmap bu nesneyle birlikte yaşar
+        self.store = store
+        # İsteğe bağlı kısayol hiyerarşisi; görüntü dosyasıyla birlikte saklanır (bkz. contraction.py)
+        self.contraction = contraction
+        # Bağlantıların sadeleştirilmiş şekilleri; görüntü dosyasında yoksa ilk kullanımda kurulur
+        self._geometry = geometry
+
+        # Durak tipine göre listeler ve her biri için ayrı konum indeksi
+        if stops_by_type is None:
+            positions: Dict[str, array] = {}
+            for i, stop_type in enumerate(self.table.types):
+                positions.setdefault(stop_type, array("i")).append(i)
+            stops_by_type = {"all": self.stops}
+            stops_by_type.update({t: StopList(self.table, p) for t, p in positions.items()})
+        self.stops_by_type = stops_by_type
+        self.spatial_index = spatial_index or {
+            stop_type: SpatialIndex(type_stops) for stop_type, type_stops in self.stops_by_type.items()
+        }
+
+        # Görünüm başına serileştirilmiş /get_stops gövdeleri (bkz. stops_payload.py)
+        self.payloads: Dict[str, Any] = {}
+        # A* sezgisinin kullandığı en yüksek kenar hızı (bkz. astar_search.py)
+        self.max_speed: Optional[float] = None
+        # Çok kaynaklı rota aramasının kenar uzunlukları (bkz. route_planner.hop_lengths)
+        self.hop_lengths: Optional[Tuple[array, float, float]] = None
+        # Vektör karoları için izdüşürülmüş duraklar ve bağlantılar (bkz. vector_tiles.py)
+        self.tiles = None
+        # Artımlı güncellemelerle geçici olarak kapatılan durak kimlikleri (bkz. network_updates.py)
+        self.closed_stops = set()
+
+        self.lines = [line if isinstance(line, Line) else Line(**line) for line in lines or []]
+        self._raptor: Optional[RaptorEngine] = None
+
+    @property
+    def raptor(self) -> Optional[RaptorEngine]:
+        """Sefer planı tanımlıysa zamana bağlı (RAPTOR) arama motoru; ilk kullanımda kurulur."""
+        if self._raptor is None and self.lines:
+            self._raptor = RaptorEngine(self.graph, self.lines)
+        return self._raptor
+
+    @property
+    def geometry(self) -> EdgeGeometry:
+        """Rota geometrisinin parçaları (bkz. edge_geometry.py); yalnızca şekli olan bağlantılar işlenir."""
+        if self._geometry is None:
+            self._geometry = EdgeGeometry.build(self.table)
+        return self._geometry
+
+    def derive(self, version: str, table: StopTable, graph: CompiledGraph) -> "NetworkSnapshot":
+        """
+        Tip listelerini ve konum indekslerini paylaşan, verilen tablo ve grafa bakan yeni görüntü.
+        Önbellekler (hat yolları, tablo, serileştirilmiş gövdeler) boş başlar; kısayol hiyerarşisi
+        eski grafa ait olduğundan aktarılmaz, bağlantı şekilleri yeni tablodan yeniden kurulur.
+        """
+        stops_by_type = {"all": StopList(table)}
+        stops_by_type.update({stop_type: StopList(table, stops.positions)
+                              for stop_type, stops in self.stops_by_type.items() if stop_type != "all"})
+        spatial_index = {stop_type: index.with_stops(stops_by_type[stop_type])
+                         for stop_type, index in self.spatial_index.items()}
+        snapshot = NetworkSnapshot(version, self.city, self.taxi, table, self.lines, graph,
+                                   stops_by_type, spatial_index, self.store, walk_radius=self.walk_radius)
+        snapshot.closed_stops = set(self.closed_stops)
+        return snapshot
+
+    def stops_of_type(self, stop_type: str) -> List[Dict[str, Any]]:
+        return self.stops_by_type.get(stop_type, [])
+
+    def index_of_type(self, stop_type: str) -> SpatialIndex:
+        return self.spatial_index.get(stop_type, EMPTY_INDEX)
+
+    @classmethod
+    def from_bytes(cls, raw: bytes, walk_radius: float = WALK_RADIUS) -> "NetworkSnapshot":
+        """Ham dosya içeriğinden yeni bir ağ görüntüsü oluşturur."""
+        return cls.from_city(content_version(raw), CityData.from_dict(json.loads(raw.decode("utf-8"))), walk_radius)
+
+    @classmethod
+    def open_binary(cls, path: str) -> "NetworkSnapshot":
+        """write_snapshot ile yazılmış dosyayı mmap ile açar; JSON ayrıştırması yapılmaz."""
+        store = ArrayFile(path)
+        try:
+            if store.meta.get("format") != SNAPSHOT_FORMAT:
+                raise ValueError(f"Desteklenmeyen görüntü biçimi: {path}")
+            return cls(store=store, **read_snapshot(store))
+        except (KeyError, ValueError):
+            store.close()
+            raise
+
+    @classmethod
+    def load(cls, file_path: str, version: Optional[str] = None, contraction: bool = False,
+             walk_radius: float = WALK_RADIUS) -> "NetworkSnapshot":
+        """
+        Veri dosyasının bu sürümü ve yürüme yarıçapı için ikili görüntü varsa onu açar.
+        Yoksa JSON'u yükleyip görüntüyü sonraki başlatmalar ve işçi süreçler için yazar.
+        contraction istenip görüntüde kısayol hiyerarşisi yoksa hiyerarşi kurulur ve görüntü yeniden yazılır.
+        """
+        version = version or file_version(file_path)
+        path = snapshot_path(file_path, version)
+        snapshot = None
+        if os.path.exists(path):
+            try:
+                snapshot = cls.open_binary(path)
+                if snapshot.version != version or snapshot.walk_radius != walk_radius:
+                    snapshot = None
+                elif not contraction or snapshot.contraction is not None:
+                    return snapshot
+            except (OSError, KeyError, ValueError) as e:
+                print(f"Ağ görüntüsü dosyası okunamadı, yeniden oluşturuluyor: {e}")
+
+        if snapshot is None:
+            snapshot = cls.from_file(file_path, version, walk_radius)
+        if contraction:
+            started = time.perf_counter()
+            snapshot.contraction = ContractionHierarchy.build(snapshot.graph)
+            print(f"Kısayol hiyerarşisi kuruldu: {snapshot.contraction.shortcut_count} kısayol, "
+                  f"{time.perf_counter() - started:.1f} sn")
+        write_snapshot(path, snapshot)
+        print(f"Ağ görüntüsü dosyası yazıldı: {path}")
+        return snapshot
+
+    @classmethod
+    def from_file(cls, file_path: str, version: Optional[str] = None,
+                  walk_radius: float = WALK_RADIUS) -> "NetworkSnapshot":
+        """Veri dosyasını akış halinde, doğrulayarak yükler ve yükleme özetini yazdırır."""
+        city_data, report = load_city(file_path)
+        print(f"Ağ verisi okundu: {report}")
+        return cls.from_city(version or file_version(file_path), city_data, walk_radius)
+
+    @classmethod
+    def from_city(cls, version: str, city_data: CityData, walk_radius: float = WALK_RADIUS) -> "NetworkSnapshot":
+        """Yükleyicinin oluşturduğu şehir verisinden ağ görüntüsü oluşturur."""
+        return cls(version, city_data.city, city_data.taxi, city_data.stops, city_data.hatlar,
+                   walk_radius=walk_radius)
+
+def content_version(raw: bytes) -> str:
+    """Dosya içeriğinden kısa bir sürüm özeti üretir."""
+    return hashlib.sha256(raw).hexdigest()[:12]
+
+def file_version(file_path: str, chunk_size: int = 1 << 20) -> str:
+    """content_version ile aynı özeti dosyayı belleğe almadan parça parça hesaplar."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        for chunk in iter(lambda: file.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()[:12]
+
+class NetworkStore:
+    """
+    Süreç genelinde tek bir ağ görüntüsü tutar.
+    Dosya yalnızca değiştirilme zamanı ve içerik özeti değiştiğinde yeniden yüklenir.
+    Artımlı güncellemeler bellekte tutulur: içeriği değişmeyen dosyaya dokunulması onları korur,
+    içeriği değişen dosya ise yeni kaynak kabul edilir ve uygulanmış güncellemeler bırakılır.
+    """
+    def __init__(self, file_path: str, check_interval: float = 1.0, contraction: bool = False,
+                 walk_radius: float = WALK_RADIUS):
+        self.file_path = file_path
+        self.check_interval = check_interval
+        self.contraction = contraction
+        self.walk_radius = walk_radius
+        self._lock = threading.Lock()
+        self._snapshot: Optional[NetworkSnapshot] = None
+        self._mtime: Optional[float] = None
+        self._last_check = 0.0
+        # Yüklenen dosya içeriğinin sürümü ve üzerine uygulanmış güncelleme sayısı
+        self._file_version: Optional[str] = None
+        self._updates = 0
+
+    def get(self) -> NetworkSnapshot:
+        """Güncel ağ görüntüsünü döndürür, gerekirse dosyayı yeniden yükler."""
+        snapshot = self._snapshot
+        now = time.monotonic()
+        if snapshot is not None and now - self._last_check < self.check_interval:
+            return snapshot
+
+        mtime = os.stat(self.file_path).st_mtime
+        if snapshot is not None and mtime == self._mtime:
+            self._last_check = now
+            return snapshot
+
+        with self._lock:
+            # Başka bir istek bu sırada yüklemeyi bitirmiş olabilir
+            if self._snapshot is not None and self._mtime == mtime:
+                return self._snapshot
+
+            # Sadece zaman damgası değiştiyse mevcut görüntüyü (uygulanmış güncellemeleriyle) koru
+            version = file_version(self.file_path)
+            if self._snapshot is None or self._file_version != version:
+                try:
+                    new_snapshot = NetworkSnapshot.load(self.file_path, version, self.contraction,
+                                                        self.walk_radius)
+                except NetworkDataError as e:
+                    # İlk yüklemede hata yukarı iletilir, sonrakilerde eski görüntü kullanılmaya devam eder
+                    if self._snapshot is None:
+                        raise
+                    print(f"Ağ verisi yüklenemedi, önceki sürüm kullanılıyor: {e}")
+                    self._mtime = mtime
+                    self._last_check = now
+                    return self._snapshot
+                if self._updates:
+                    print(f"Veri dosyası değişti, uygulanmış {self._updates} güncelleme bırakıldı")
+                # Referans ataması atomiktir, devam eden istekler eski görüntüyü kullanmaya devam eder
+                self._snapshot = new_snapshot
+                self._file_version = version
+                self._updates = 0
+                print(f"Ağ görüntüsü yüklendi: {new_snapshot.city} (sürüm {new_snapshot.version})")
+
+            self._mtime = mtime
+            self._last_check = now
+            return self._snapshot
+
+    def apply_updates(self, operations: List[Dict[str, Any]]) -> NetworkUpdate:
+        """
+        Durak/bağlantı/aktarma güncellemelerini veri dosyasını yeniden okumadan güncel görüntünün
+        kopyasına uygular ve sonucu atomik olarak yayınlar. Geçersiz güncellemede NetworkDataError
+        fırlatılır ve görüntü değişmez. Yeni sürüm, önceki sürüm ve işlemlerin içerik özetidir;
+        aynı dosya içeriğine aynı güncellemeler aynı sürümü verir.
+        """
+        self.get()
+        with self._lock:
+            current = self._snapshot
+            digest = content_version(json.dumps([current.version, operations], sort_keys=True).encode("utf-8"))
+            update = apply_updates(current, operations, f"{self._file_version}-u{digest}")
+            self._updates += 1
+            self._snapshot = update.snapshot
+        print(f"Ağ güncellendi: {len(operations)} işlem (sürüm {update.snapshot.version})")
+
+        if self.contraction:
+            # Kısayol hiyerarşisi arka planda yeniden hesaplanır;
+            # hazır olana kadar aramalar doğrudan graf üzerinde yapılır
+            snapshot = update.snapshot
+            threading.Thread(target=self._precompute, args=(snapshot,), daemon=True).start()
+        return update
+
+    def _precompute(self, snapshot: NetworkSnapshot) -> None:
+        if self._snapshot is snapshot:
+            snapshot.contraction = ContractionHierarchy.build(snapshot.graph)
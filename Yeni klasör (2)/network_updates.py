@@ -0,0 +1,577 @@
+import copy
+from array import array
+from bisect import bisect_left
+from collections.abc import Mapping
+from typing import List, Dict, Any, Optional, Set, Tuple
+from compiled_graph import (EDGE_DIRECT, EDGE_TRANSFER, EDGE_WALK, TRANSFER_DISTANCE, WALK_MINUTES_PER_KM,
+                            WALK_NEIGHBOURS, edge_weight)
+from spatial_index import SpatialIndex
+from polyline import encode_points
+from transport_data import CityLoader, Line, NetworkDataError, StopList, StopTable, is_shape, parse_time
+
+INF = float("inf")
+
+OPERATIONS = ("add_stop", "modify_stop", "remove_stop", "close_stop", "open_stop",
+              "add_edge", "modify_edge", "remove_edge", "set_transfer", "modify_transfer", "remove_transfer")
+
+# İşlem alanı -> durak tablosu sütunu
+EDGE_FIELDS = {"mesafe": "next_distance", "sure": "next_time", "ucret": "next_cost"}
+TRANSFER_FIELDS = {"transferSure": "transfer_time", "transferUcret": "transfer_cost"}
+# İşlem alanı -> graf dizisi
+GRAPH_FIELDS = {"mesafe": "distance", "sure": "time", "ucret": "cost",
+                "transferSure": "time", "transferUcret": "cost"}
+EDGE_ARRAYS = ("targets", "distance", "time", "cost", "mode", "edge_type", "weight")
+
+class NetworkUpdate:
+    """
+    Uygulanmış bir güncelleme: yeni görüntü ve önbellekleri hedefli boşaltmak için özet.
+    improves, güncellemenin yeni veya daha iyi bir rota oluşturabildiğini gösterir
+    (eklenen bağlantı, kısalan süre, açılan durak); bu durumda etkilenen rotalar önceden bilinemez.
+    """
+    def __init__(self, previous_version: str, snapshot, affected_stops: Set[str], improves: bool):
+        self.previous_version = previous_version
+        self.snapshot = snapshot
+        self.affected_stops = affected_stops
+        self.improves = improves
+
+def operation_error(k: int, message: str) -> NetworkDataError:
+    return NetworkDataError([(f"işlemler[{k}]", message)])
+
+def shifted_time(value: str, minutes: int) -> str:
+    """"SS:DD" saatini verilen dakika kadar kaydırır; gece yarısını geçen saatler 24'ten büyük yazılır."""
+    total = parse_time(value) + minutes
+    return f"{total // 60:02d}:{total % 60:02d}"
+
+def writable_copy(values) -> Any:
+    """Sütunun (mmap görünümleri dahil) düzenlenebilir bir kopyası."""
+    if isinstance(values, Mapping):
+        return dict(values)
+    if isinstance(values, (array, memoryview, bytearray)):
+        view = memoryview(values)
+        return array(view.format, view.tobytes())
+    return list(values)
+
+class SnapshotPatch:
+    """
+    Ağ görüntüsünün kopyası üzerinde artımlı güncellemeler.
+    Durak tablosunun sütunları, CSR graf dizileri ve konum indeksi hücreleri ilk yazmada
+    kopyalanıp yerinde düzenlenir; eski görüntüyü kullanan istekler etkilenmez ve
+    değişmeyen yapılar iki görüntü arasında paylaşılır.
+    """
+    def __init__(self, network, version: str):
+        self.version = version
+        self.affected_stops: Set[str] = set()
+        self.improves = False
+        self._start(network)
+
+    def _start(self, network) -> None:
+        self.graph = copy.copy(network.graph)
+        self.table = StopTable.from_columns({field: getattr(network.table, field) for field in StopTable.__slots__})
+        self.snapshot = network.derive(self.version, self.table, self.graph)
+        self._copied = set()
+
+    def column(self, owner, name: str) -> Any:
+        key = (id(owner), name)
+        if key not in self._copied:
+            setattr(owner, name, writable_copy(getattr(owner, name)))
+            self._copied.add(key)
+        return getattr(owner, name)
+
+    def stop_index(self, k: int, stop_id: Any) -> int:
+        i = self.table.index.get(stop_id) if isinstance(stop_id, str) else None
+        if i is None:
+            raise operation_error(k, f"bilinmeyen durak: {stop_id!r}")
+        return i
+
+    def values_of(self, k: int, operation: Dict[str, Any], fields, required: bool = False) -> Dict[str, float]:
+        values = {field: operation[field] for field in fields if field in operation}
+        for field, value in values.items():
+            if not isinstance(value, (int, float)) or isinstance(value, bool) or value < 0:
+                raise operation_error(k, f"{field} negatif olmayan bir sayı olmalı, {value!r} bulundu")
+        missing = [field for field in fields if field not in values]
+        if (required and missing) or not values:
+            raise operation_error(k, f"eksik alanlar: {', '.join(missing)}")
+        return values
+
+    def shape_of(self, k: int, operation: Dict[str, Any]) -> Optional[str]:
+        """İşlemin isteğe bağlı bağlantı şekli, tablodaki gibi kodlanmış olarak (yoksa None)."""
+        shape = operation.get("sekil")
+        if shape is not None and not is_shape(shape):
+            raise operation_error(k, "sekil [enlem, boylam] noktalarından oluşan liste olmalı")
+        return encode_points(shape) if shape else None
+
+    def is_closed(self, *nodes: int) -> bool:
+        return any(self.table.ids[node] in self.snapshot.closed_stops for node in nodes)
+
+    # --- Graf düzenleme ---
+
+    def graph_edge(self, u: int, v: int, edge_type: int) -> Optional[int]:
+        graph = self.graph
+        for e in range(graph.offsets[u], graph.offsets[u + 1]):
+            if graph.targets[e] == v and graph.edge_type[e] == edge_type:
+                return e
+        return None
+
+    def mode_code(self, mode: str) -> int:
+        code = self.graph.mode_code(mode)
+        if code is None:
+            self.column(self.graph, "modes").append(mode)
+            code = len(self.graph.modes) - 1
+        return code
+
+    def set_edge(self, e: int, values: Dict[str, float]) -> None:
+        """Graf kenarının değerlerini ve Dijkstra ağırlığını günceller."""
+        graph = self.graph
+        for field, value in values.items():
+            self.column(graph, GRAPH_FIELDS[field])[e] = value
+        self.column(graph, "weight")[e] = edge_weight(graph.distance[e], graph.time[e], graph.cost[e],
+                                                      graph.edge_type[e])
+
+    def shift_offsets(self, owner, name: str, u: int, delta: int) -> None:
+        offsets = self.column(owner, name)
+        for j in range(u + 1, len(offsets)):
+            offsets[j] += delta
+
+    def insert_edge(self, u: int, e: int, v: int, distance: float, time: float, cost: float,
+                    mode: int, edge_type: int) -> None:
+        values = (v, distance, time, cost, mode, edge_type, edge_weight(distance, time, cost, edge_type))
+        for name, value in zip(EDGE_ARRAYS, values):
+            self.column(self.graph, name).insert(e, value)
+        self.shift_offsets(self.graph, "offsets", u, 1)
+
+    def delete_edge(self, u: int, e: int) -> None:
+        for name in EDGE_ARRAYS:
+            del self.column(self.graph, name)[e]
+        self.shift_offsets(self.graph, "offsets", u, -1)
+
+    def transfer_values(self, u: int, v: int) -> Dict[str, float]:
+        """Aktarma kenarının güncel değerleri; uçlardan biri kapalıysa kenar kullanılamaz."""
+        if self.is_closed(u, v):
+            return {"transferSure": INF, "transferUcret": INF}
+        return {"transferSure": self.table.transfer_time[u], "transferUcret": self.table.transfer_cost[u]}
+
+    def walk_values(self, u: int, v: int, distance: float) -> Dict[str, float]:
+        """Yürüme kenarının güncel değerleri; uçlardan biri kapalıysa kenar kullanılamaz."""
+        if self.is_closed(u, v):
+            return {"sure": INF, "ucret": INF}
+        return {"sure": distance * WALK_MINUTES_PER_KM, "ucret": 0}
+
+    # --- Durak işlemleri ---
+
+    def add_stop(self, k: int, operation: Dict[str, Any]) -> None:
+        """Durak tablonun, grafın ve tip listesinin sonuna eklenir; konum indeksine yerleştirilir."""
+        stop = operation.get("stop")
+        loader = CityLoader()
+        loader.add_stop(stop)
+        if loader.errors:
+            raise NetworkDataError([(f"işlemler[{k}]", message) for _, message in loader.errors])
+        if stop["id"] in self.table.index:
+            raise operation_error(k, f"durak zaten var: {stop['id']!r}")
+        targets = [self.stop_index(k, next_stop["stopId"]) for next_stop in stop.get("nextStops") or []]
+        if stop.get("transfer"):
+            transfer_target = self.stop_index(k, stop["transfer"]["transferStopId"])
+
+        table = self.table
+        for field in StopTable.__slots__:
+            self.column(table, field)
+        table.append(stop)
+        u = len(table) - 1
+
+        graph = self.graph
+        self.column(graph, "stop_ids").append(table.ids[u])
+        self.column(graph, "index")[table.ids[u]] = u
+        self.column(graph, "offsets").append(graph.offsets[-1])
+        for v, next_stop in zip(targets, stop.get("nextStops") or []):
+            self.insert_edge(u, graph.offsets[u + 1], v, next_stop["mesafe"], next_stop["sure"],
+                             next_stop["ucret"], self.mode_code(table.types[u]), EDGE_DIRECT)
+        if stop.get("transfer"):
+            values = self.transfer_values(u, transfer_target)
+            self.insert_edge(u, graph.offsets[u + 1], transfer_target, TRANSFER_DISTANCE, values["transferSure"],
+                             values["transferUcret"], self.mode_code("transfer"), EDGE_TRANSFER)
+
+        snapshot = self.snapshot
+        stop_type = table.types[u]
+        if stop_type in snapshot.stops_by_type:
+            stops = snapshot.stops_by_type[stop_type]
+            positions = writable_copy(stops.positions)
+            positions.append(u)
+            snapshot.stops_by_type[stop_type] = StopList(table, positions)
+            index = snapshot.spatial_index[stop_type]
+            snapshot.spatial_index[stop_type] = index.with_stops(snapshot.stops_by_type[stop_type]).appended(
+                table.lat[u], table.lon[u])
+        else:
+            snapshot.stops_by_type[stop_type] = StopList(table, array("i", [u]))
+            snapshot.spatial_index[stop_type] = SpatialIndex(snapshot.stops_by_type[stop_type])
+        snapshot.spatial_index["all"] = snapshot.spatial_index["all"].appended(table.lat[u], table.lon[u])
+        self.refresh_footpaths(u, [(table.lat[u], table.lon[u])])
+        self.affected_stops.add(table.ids[u])
+        self.improves = True
+
+    def modify_stop(self, k: int, operation: Dict[str, Any]) -> None:
+        """Ad, son durak bilgisi ve konum değiştirilebilir; konum değişirse durak hücresine taşınır."""
+        table = self.table
+        u = self.stop_index(k, operation.get("stop"))
+        if "name" in operation:
+            if not isinstance(operation["name"], str):
+                raise operation_error(k, f"name metin olmalı, {operation['name']!r} bulundu")
+            self.column(table, "names")[u] = operation["name"]
+        if "sonDurak" in operation:
+            self.column(table, "terminal")[u] = 1 if operation["sonDurak"] else 0
+        if "lat" in operation or "lon" in operation:
+            lat = operation.get("lat", table.lat[u])
+            lon = operation.get("lon", table.lon[u])
+            if any(not isinstance(value, (int, float)) or isinstance(value, bool) for value in (lat, lon)):
+                raise operation_error(k, "lat ve lon sayı olmalı")
+            old_point = (table.lat[u], table.lon[u])
+            self.column(table, "lat")[u] = lat
+            self.column(table, "lon")[u] = lon
+            member = not self.is_closed(u)
+            self.update_spatial(u, lambda index, i: index.moved(i, lat, lon, member))
+            # Yürüme kenarları yeni konuma göre yeniden oluşturulur
+            for _, v in self.walk_edges(u):
+                self.affected_stops.add(table.ids[v])
+            self.disconnect_footpaths(u)
+            self.refresh_footpaths(u, [old_point, (lat, lon)])
+        self.affected_stops.add(table.ids[u])
+        self.improves = True
+
+    def remove_stop(self, k: int, operation: Dict[str, Any]) -> None:
+        """
+        Kaldırma durak sıralarını değiştirdiğinden tablo, graf ve indeksler bellekteki kayıtlardan
+        yeniden kurulur (veri dosyası okunmaz). Duraktan geçen hatlar durakta ikiye bölünür.
+        """
+        stop_id = self.table.ids[self.stop_index(k, operation.get("stop"))]
+        lines = self.split_lines(lambda a, b: stop_id in (a, b), removed_stop=stop_id)
+        records = [dict(stop) for stop in self.snapshot.stops if stop["id"] != stop_id]
+        for record in records:
+            record["nextStops"] = [edge for edge in record["nextStops"] if edge["stopId"] != stop_id]
+            if record["transfer"] and record["transfer"]["transferStopId"] == stop_id:
+                record["transfer"] = None
+                self.affected_stops.add(record["id"])
+
+        loader = CityLoader()
+        loader.header = {"city": self.snapshot.city, "taxi": self.snapshot.taxi}
+        for record in records:
+            loader.add_stop(record)
+        for line in lines:
+            loader.add_line({field: getattr(line, field) for field in Line.__slots__})
+        closed = self.snapshot.closed_stops - {stop_id}
+        network = type(self.snapshot).from_city(self.version, loader.finish(), self.snapshot.walk_radius)
+
+        self._start(network)
+        for closed_id in sorted(closed):
+            self.close_stop(k, {"stop": closed_id})
+        self.affected_stops.add(stop_id)
+
+    def close_stop(self, k: int, operation: Dict[str, Any]) -> None:
+        """
+        Durak en yakın durak sorgularından çıkarılır ve aktarmaları kapatılır.
+        Hat bağlantıları korunur; araçlar duraktan durmadan geçer.
+        """
+        u = self.stop_index(k, operation.get("stop"))
+        stop_id = self.table.ids[u]
+        if stop_id in self.snapshot.closed_stops:
+            return
+        self.snapshot.closed_stops.add(stop_id)
+        self.update_spatial(u, lambda index, i: index.without(i))
+        for e in self.transfer_edges(u):
+            self.set_edge(e, {"transferSure": INF, "transferUcret": INF})
+        for e, _ in self.walk_edges(u):
+            self.set_edge(e, {"sure": INF, "ucret": INF})
+        self.affected_stops.add(stop_id)
+
+    def open_stop(self, k: int, operation: Dict[str, Any]) -> None:
+        u = self.stop_index(k, operation.get("stop"))
+        stop_id = self.table.ids[u]
+        if stop_id not in self.snapshot.closed_stops:
+            return
+        self.snapshot.closed_stops.discard(stop_id)
+        self.update_spatial(u, lambda index, i: index.with_member(i))
+        for e in self.transfer_edges(u):
+            source = bisect_left(self.graph.offsets, e + 1) - 1
+            self.set_edge(e, self.transfer_values(source, self.graph.targets[e]))
+        for e, v in self.walk_edges(u):
+            self.set_edge(e, self.walk_values(u, v, self.graph.distance[e]))
+        self.affected_stops.add(stop_id)
+        self.improves = True
+
+    def transfer_edges(self, u: int) -> List[int]:
+        """Durağa giren ve duraktan çıkan aktarma kenarları."""
+        table = self.table
+        stop_id = table.ids[u]
+        edges = []
+        if table.transfer_ids[u] is not None:
+            edges.append(self.graph_edge(u, table.index[table.transfer_ids[u]], EDGE_TRANSFER))
+        for w, transfer_id in enumerate(table.transfer_ids):
+            if transfer_id == stop_id:
+                edges.append(self.graph_edge(w, u, EDGE_TRANSFER))
+        return [e for e in edges if e is not None]
+
+    def walk_edges(self, u: int) -> List[Tuple[int, int]]:
+        """Duraktan çıkan ve durağa giren yürüme kenarları, diğer uçtaki durakla birlikte."""
+        graph = self.graph
+        edges = []
+        for e in range(graph.offsets[u], graph.offsets[u + 1]):
+            if graph.edge_type[e] == EDGE_WALK:
+                v = graph.targets[e]
+                edges.append((e, v))
+                back = self.graph_edge(v, u, EDGE_WALK)
+                if back is not None:
+                    edges.append((back, v))
+        return edges
+
+    def walk_candidates(self, u: int) -> List[Tuple[int, float]]:
+        """Durağın yürüme yarıçapındaki diğer duraklar (sıra, mesafe), yakından uzağa."""
+        table = self.table
+        index = self.snapshot.spatial_index["all"]
+        radius = self.snapshot.walk_radius
+        # Kapalı duraklar konum indeksinde yoktur ama kenarları açılınca kullanılmak üzere tutulur
+        closed = [table.index[stop_id] for stop_id in sorted(self.snapshot.closed_stops)]
+        nearby = index.within(table.lat[u], table.lon[u], radius)
+        nearby += [(j, distance) for j, distance in zip(closed, index.distances(table.lat[u], table.lon[u], closed))
+                   if distance <= radius]
+        return sorted(((j, distance) for j, distance in nearby if j != u), key=lambda item: (item[1], item[0]))
+
+    def insert_walk_edge(self, u: int, v: int, distance: float) -> None:
+        """Yürüme kenarını, ağ görüntüsü kurulurken olduğu gibi yakından uzağa sırasındaki yerine ekler."""
+        graph = self.graph
+        e = graph.offsets[u + 1]
+        while (e > graph.offsets[u] and graph.edge_type[e - 1] == EDGE_WALK
+               and (graph.distance[e - 1], graph.targets[e - 1]) > (distance, v)):
+            e -= 1
+        values = self.walk_values(u, v, distance)
+        self.insert_edge(u, e, v, distance, values["sure"], values["ucret"], self.mode_code("walk"), EDGE_WALK)
+
+    def refresh_footpaths(self, u: int, points: List[Tuple[float, float]]) -> None:
+        """
+        Durağın ve verilen konumların (durağın eski ve yeni yeri) yarıçapındaki durakların yürüme
+        kenarlarını footpath_neighbors kuralına göre yeniden kurar. En yakın durak kümesi yalnızca
+        bu duraklar için değişebilir; diğer çiftler olduğu gibi kalır.
+        """
+        radius = self.snapshot.walk_radius
+        if not radius:
+            return
+        table = self.table
+        graph = self.graph
+        index = self.snapshot.spatial_index["all"]
+        closed = [table.index[stop_id] for stop_id in sorted(self.snapshot.closed_stops)]
+        region = {u}
+        for lat, lon in points:
+            region.update(j for j, _ in index.within(lat, lon, radius))
+            region.update(j for j, distance in zip(closed, index.distances(lat, lon, closed)) if distance <= radius)
+
+        candidates: Dict[int, List[Tuple[int, float]]] = {}
+        nearest: Dict[int, Set[int]] = {}
+
+        def nearest_of(a: int) -> Set[int]:
+            if a not in nearest:
+                candidates[a] = self.walk_candidates(a)
+                nearest[a] = {b for b, _ in candidates[a][:WALK_NEIGHBOURS]}
+            return nearest[a]
+
+        for a in sorted(region):
+            nearest_of(a)
+            wanted = {b: distance for b, distance in candidates[a] if b in nearest[a] or a in nearest_of(b)}
+            current = {graph.targets[e] for e in range(graph.offsets[a], graph.offsets[a + 1])
+                       if graph.edge_type[e] == EDGE_WALK}
+            for b in sorted(current - wanted.keys()):
+                for x, y in ((a, b), (b, a)):
+                    e = self.graph_edge(x, y, EDGE_WALK)
+                    if e is not None:
+                        self.delete_edge(x, e)
+                self.affected_stops.update((table.ids[a], table.ids[b]))
+            for b in sorted(wanted.keys() - current):
+                for x, y in ((a, b), (b, a)):
+                    if self.graph_edge(x, y, EDGE_WALK) is None:
+                        self.insert_walk_edge(x, y, wanted[b])
+                self.affected_stops.update((table.ids[a], table.ids[b]))
+
+    def disconnect_footpaths(self, u: int) -> None:
+        """Durağın iki yöndeki yürüme kenarlarını siler; sondan başlandığından önceki sıralar değişmez."""
+        graph = self.graph
+        for e, v in sorted(self.walk_edges(u), reverse=True):
+            self.delete_edge(u if graph.offsets[u] <= e < graph.offsets[u + 1] else v, e)
+
+    def update_spatial(self, u: int, edit) -> None:
+        """Durağın bulunduğu tip listelerinin konum indekslerini edit ile değiştirir."""
+        snapshot = self.snapshot
+        for stop_type, stops in snapshot.stops_by_type.items():
+            if stops.positions is None:
+                i = u
+            else:
+                i = bisect_left(stops.positions, u)
+                if i == len(stops.positions) or stops.positions[i] != u:
+                    continue
+            snapshot.spatial_index[stop_type] = edit(snapshot.spatial_index[stop_type], i)
+
+    # --- Bağlantı işlemleri ---
+
+    def next_entry(self, u: int, v: int) -> Optional[int]:
+        table = self.table
+        return next((n for n in range(table.next_offsets[u], table.next_offsets[u + 1])
+                     if table.next_ids[n] == table.ids[v]), None)
+
+    def add_edge(self, k: int, operation: Dict[str, Any]) -> None:
+        table = self.table
+        u = self.stop_index(k, operation.get("from"))
+        v = self.stop_index(k, operation.get("to"))
+        values = self.values_of(k, operation, EDGE_FIELDS, required=True)
+        shape = self.shape_of(k, operation)
+        if self.next_entry(u, v) is not None:
+            raise operation_error(k, f"{table.ids[u]!r} -> {table.ids[v]!r} bağlantısı zaten var")
+
+        # Direkt bağlantılar grafta durağın aktarma kenarından önce, tablodaki sırayla durur
+        entry = table.next_offsets[u + 1]
+        e = self.graph.offsets[u] + entry - table.next_offsets[u]
+        self.column(table, "next_ids").insert(entry, table.ids[v])
+        self.column(table, "next_shapes").insert(entry, shape)
+        for field, value in values.items():
+            self.column(table, EDGE_FIELDS[field]).insert(entry, value)
+        self.shift_offsets(table, "next_offsets", u, 1)
+        self.insert_edge(u, e, v, values["mesafe"], values["sure"], values["ucret"],
+                         self.mode_code(table.types[u]), EDGE_DIRECT)
+        self.affected_stops.update((table.ids[u], table.ids[v]))
+        self.improves = True
+
+    def modify_edge(self, k: int, operation: Dict[str, Any]) -> None:
+        table = self.table
+        u = self.stop_index(k, operation.get("from"))
+        v = self.stop_index(k, operation.get("to"))
+        # Yalnızca şekli değiştiren işlemde sayısal alan gerekmez
+        values = {}
+        if "sekil" not in operation or any(field in operation for field in EDGE_FIELDS):
+            values = self.values_of(k, operation, EDGE_FIELDS)
+        shape = self.shape_of(k, operation)
+        entry = self.next_entry(u, v)
+        e = self.graph_edge(u, v, EDGE_DIRECT)
+        if entry is None or e is None:
+            raise operation_error(k, f"{table.ids[u]!r} -> {table.ids[v]!r} bağlantısı yok")
+
+        if "sekil" in operation:
+            self.column(table, "next_shapes")[entry] = shape
+        for field, value in values.items():
+            column = self.column(table, EDGE_FIELDS[field])
+            self.improves |= value < column[entry]
+            column[entry] = value
+        self.set_edge(e, values)
+        self.affected_stops.update((table.ids[u], table.ids[v]))
+
+    def remove_edge(self, k: int, operation: Dict[str, Any]) -> None:
+        table = self.table
+        u = self.stop_index(k, operation.get("from"))
+        v = self.stop_index(k, operation.get("to"))
+        entry = self.next_entry(u, v)
+        e = self.graph_edge(u, v, EDGE_DIRECT)
+        if entry is None or e is None:
+            raise operation_error(k, f"{table.ids[u]!r} -> {table.ids[v]!r} bağlantısı yok")
+
+        self.snapshot.lines = self.split_lines(lambda a, b: (a, b) == (table.ids[u], table.ids[v]))
+        for name in ("next_ids", "next_shapes", *EDGE_FIELDS.values()):
+            del self.column(table, name)[entry]
+        self.shift_offsets(table, "next_offsets", u, -1)
+        self.delete_edge(u, e)
+        self.affected_stops.update((table.ids[u], table.ids[v]))
+
+    def split_lines(self, broken, removed_stop: Optional[str] = None) -> List[Line]:
+        """
+        Sefer planındaki hatları broken(a, b) ile kopan ardışık durak çiftlerinde parçalara böler;
+        iki duraktan kısa parçalar ve kaldırılan durak atılır. Parçaların kalkış saatleri, parçanın
+        ilk durağına (grafın güncellenmemiş hali üzerinden) varış süresi kadar kaydırılır.
+        Değişmeyen hatlar aynı nesne olarak kalır.
+        """
+        graph = self.graph
+        lines = []
+        for line in self.snapshot.lines:
+            pieces: List[Tuple[float, List[str]]] = [(0.0, [line.stops[0]])] if line.stops else []
+            elapsed = 0.0
+            for a, b in zip(line.stops, line.stops[1:]):
+                u, v = graph.index_of(a), graph.index_of(b)
+                e = self.graph_edge(u, v, EDGE_DIRECT) if u is not None and v is not None else None
+                elapsed += graph.time[e] if e is not None else 0
+                if broken(a, b):
+                    pieces.append((elapsed, []))
+                pieces[-1][1].append(b)
+            if len(pieces) <= 1:
+                lines.append(line)
+                continue
+            pieces = [(start, [stop for stop in stops if stop != removed_stop]) for start, stops in pieces]
+            for n, (start, stops) in enumerate(piece for piece in pieces if len(piece[1]) >= 2):
+                shift = int(round(start))
+                lines.append(Line(
+                    id=line.id if n == 0 else f"{line.id}.{n + 1}", name=line.name, type=line.type, stops=stops,
+                    headway=line.headway,
+                    serviceStart=shifted_time(line.serviceStart or "06:00", shift) if line.headway else line.serviceStart,
+                    serviceEnd=shifted_time(line.serviceEnd or "24:00", shift) if line.headway else line.serviceEnd,
+                    departures=[shifted_time(departure, shift) for departure in line.departures or []] or None))
+        return lines
+
+    # --- Aktarma işlemleri ---
+
+    def set_transfer(self, k: int, operation: Dict[str, Any]) -> None:
+        """Durağın aktarmasını ekler veya başka bir durağa yönlendirir."""
+        table = self.table
+        u = self.stop_index(k, operation.get("stop"))
+        v = self.stop_index(k, operation.get("transferStopId"))
+        values = self.values_of(k, operation, TRANSFER_FIELDS, required=True)
+        if u == v:
+            raise operation_error(k, "durak kendisine aktarma yapamaz")
+
+        if table.transfer_ids[u] is not None:
+            self.affected_stops.add(table.transfer_ids[u])
+            e = self.graph_edge(u, table.index[table.transfer_ids[u]], EDGE_TRANSFER)
+        else:
+            e = None
+        self.column(table, "transfer_ids")[u] = table.ids[v]
+        for field, value in values.items():
+            self.column(table, TRANSFER_FIELDS[field])[u] = value
+
+        if e is None:
+            # Ağ görüntüsü kurulurken olduğu gibi aktarma kenarı yürüme kenarlarından önce gelir
+            graph = self.graph
+            e = graph.offsets[u + 1]
+            while e > graph.offsets[u] and graph.edge_type[e - 1] == EDGE_WALK:
+                e -= 1
+            self.insert_edge(u, e, v, TRANSFER_DISTANCE, 0, 0, self.mode_code("transfer"), EDGE_TRANSFER)
+        else:
+            self.column(self.graph, "targets")[e] = v
+        self.set_edge(e, self.transfer_values(u, v))
+        self.affected_stops.update((table.ids[u], table.ids[v]))
+        self.improves = True
+
+    def modify_transfer(self, k: int, operation: Dict[str, Any]) -> None:
+        table = self.table
+        u = self.stop_index(k, operation.get("stop"))
+        if table.transfer_ids[u] is None:
+            raise operation_error(k, f"{table.ids[u]!r} durağında aktarma yok")
+        values = self.values_of(k, operation, TRANSFER_FIELDS)
+        for field, value in values.items():
+            column = self.column(table, TRANSFER_FIELDS[field])
+            self.improves |= value < column[u]
+            column[u] = value
+        v = table.index[table.transfer_ids[u]]
+        self.set_edge(self.graph_edge(u, v, EDGE_TRANSFER), self.transfer_values(u, v))
+        self.affected_stops.update((table.ids[u], table.ids[v]))
+
+    def remove_transfer(self, k: int, operation: Dict[str, Any]) -> None:
+        table = self.table
+        u = self.stop_index(k, operation.get("stop"))
+        if table.transfer_ids[u] is None:
+            raise operation_error(k, f"{table.ids[u]!r} durağında aktarma yok")
+        v = table.index[table.transfer_ids[u]]
+        self.delete_edge(u, self.graph_edge(u, v, EDGE_TRANSFER))
+        self.column(table, "transfer_ids")[u] = None
+        for column in TRANSFER_FIELDS.values():
+            self.column(table, column)[u] = 0
+        self.affected_stops.update((table.ids[u], table.ids[v]))
+
+def apply_updates(network, operations: List[Dict[str, Any]], version: str) -> NetworkUpdate:
+    """
+    Güncellemeleri sırayla ağ görüntüsünün kopyasına uygular; verilen görüntü değiştirilmez.
+    Herhangi bir işlem geçersizse NetworkDataError fırlatılır ve hiçbir değişiklik yayınlanmaz.
+    """
+    patch = SnapshotPatch(network, version)
+    for k, operation in enumerate(operations):
+        if not isinstance(operation, dict) or operation.get("op") not in OPERATIONS:
+            raise operation_error(k, f"bilinmeyen işlem: {operation.get('op') if isinstance(operation, dict) else operation!r}")
+        getattr(patch, operation["op"])(k, operation)
+    return NetworkUpdate(network.version, patch.snapshot, patch.affected_stops, patch.improves)
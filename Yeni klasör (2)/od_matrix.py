@@ -0,0 +1,182 @@
+import argparse
+import json
+import multiprocessing
+import os
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import List, Dict, Any, Optional, Tuple
+from binary_store import ArrayFile, write_arrays
+from network_snapshot import NetworkSnapshot, file_version
+from batch_planner import plan_batch
+
+MATRIX_FORMAT = 1
+ROUTE_TYPES = ["bus_only", "tram_only", "mixed", "taxi_mixed", "taxi_only", "walking"]
+FIELDS = ["time", "cost", "distance"]
+
+# İşçi süreçlerin paylaştığı ağ görüntüsü ve ızgara.
+# fork ile başlatılan işçiler bunları ana süreçten kopyalamadan devralır.
+_network: Optional[NetworkSnapshot] = None
+_points: List[Dict[str, float]] = []
+
+def grid_points(bbox: List[float], rows: int, cols: int) -> List[Dict[str, float]]:
+    """Sınır kutusunu (güney, batı, kuzey, doğu) rows x cols noktalık ızgaraya böler."""
+    south, west, north, east = bbox
+    points = []
+    for r in range(rows):
+        lat = south + (north - south) * (r / (rows - 1) if rows > 1 else 0.5)
+        for c in range(cols):
+            lon = west + (east - west) * (c / (cols - 1) if cols > 1 else 0.5)
+            points.append({"lat": lat, "lng": lon})
+    return points
+
+def _init_worker(data_path: str, points: List[Dict[str, float]]) -> None:
+    """fork dışındaki başlatma yöntemlerinde her işçi ağ görüntüsü dosyasını mmap ile açar."""
+    global _network, _points
+    if _network is None:
+        _network = NetworkSnapshot.load(data_path)
+        _points = points
+
+def chunk_path(out_dir: str, chunk: int) -> str:
+    return os.path.join(out_dir, f"chunk_{chunk:05d}.bin")
+
+def compute_chunk(out_dir: str, chunk: int, start: int, end: int, run: Dict[str, Any]) -> Tuple[int, int]:
+    """[start, end) aralığındaki başlangıç/bitiş çiftlerini hesaplayıp sütunlu parça dosyasına yazar."""
+    n = len(_points)
+    pairs = []
+    origins = array("i")
+    destinations = array("i")
+    for p in range(start, end):
+        origin, destination = divmod(p, n)
+        if origin == destination:
+            continue
+        origins.append(origin)
+        destinations.append(destination)
+        pairs.append({"start": _points[origin], "end": _points[destination]})
+
+    nan = float("nan")
+    columns = {f"{route_type}.{field}": array("f", [nan]) * len(pairs)
+               for route_type in ROUTE_TYPES for field in FIELDS}
+    for i, routes in plan_batch(pairs, _network, run["passengerType"], run["paymentInfo"]):
+        for route_type in ROUTE_TYPES:
+            if routes.get(route_type):
+                best = routes[route_type][0]
+                for field in FIELDS:
+                    columns[f"{route_type}.{field}"][i] = best[f"total_{field}"]
+
+    arrays = {"origin": origins, "destination": destinations}
+    arrays.update(columns)
+    write_arrays(chunk_path(out_dir, chunk), arrays, dict(run, chunk=chunk, start=start, end=end))
+    return chunk, len(pairs)
+
+def chunk_done(out_dir: str, chunk: int, run: Dict[str, Any]) -> bool:
+    """Parça dosyası aynı çalıştırmaya aitse ve okunabiliyorsa yeniden hesaplanmaz."""
+    path = chunk_path(out_dir, chunk)
+    if not os.path.exists(path):
+        return False
+    try:
+        store = ArrayFile(path)
+    except (OSError, ValueError):
+        return False
+    done = all(store.meta.get(key) == value for key, value in run.items())
+    store.close()
+    return done
+
+def write_manifest(out_dir: str, run: Dict[str, Any], points: List[Dict[str, float]], chunks: int) -> None:
+    """Çalıştırma parametrelerini kaydeder; farklı parametrelerle aynı klasöre devam edilmesini engeller."""
+    path = os.path.join(out_dir, "manifest.json")
+    manifest = {"run": run, "points": points, "chunks": chunks}
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as file:
+            existing = json.load(file)
+        if existing["run"] != run:
+            raise ValueError(f"{out_dir} başka parametrelerle oluşturulmuş bir matris içeriyor")
+        return
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(manifest, file, ensure_ascii=False, indent=2)
+
+def build_od_matrix(data_path: str, bbox: List[float], rows: int, cols: int, out_dir: str,
+                    workers: Optional[int] = None, chunk_size: int = 500,
+                    passenger_type: str = "Genel", payment_info: Optional[Dict[str, float]] = None) -> None:
+    """
+    Izgaradaki tüm başlangıç/bitiş çiftleri için rota tipi başına süre/ücret/mesafe matrisini
+    süreç havuzunda parça parça hesaplar. Tamamlanmış parçalar tekrar çalıştırmada atlanır.
+    payment_info verilmezse bakiye sınırı uygulanmaz; verilirse eksik bakiyeler 0 sayılır.
+    """
+    global _network, _points
+    version = file_version(data_path)
+    _network = NetworkSnapshot.load(data_path, version)
+    _points = grid_points(bbox, rows, cols)
+
+    run = {
+        "format": MATRIX_FORMAT,
+        "version": version,
+        "bbox": list(bbox),
+        "rows": rows,
+        "cols": cols,
+        "chunkSize": chunk_size,
+        "passengerType": passenger_type,
+        "paymentInfo": payment_info
+    }
+    total_pairs = len(_points) ** 2
+    chunks = (total_pairs + chunk_size - 1) // chunk_size
+    os.makedirs(out_dir, exist_ok=True)
+    write_manifest(out_dir, run, _points, chunks)
+
+    pending = [c for c in range(chunks) if not chunk_done(out_dir, c, run)]
+    print(f"{len(_points)} nokta, {chunks} parça ({chunks - len(pending)} parça önceden tamamlanmış)")
+    if not pending:
+        return
+
+    # fork varsa işçiler yüklenmiş ağı devralır, yoksa her işçi veriyi bir kez kendisi yükler
+    method = "fork" if "fork" in multiprocessing.get_all_start_methods() else None
+    context = multiprocessing.get_context(method)
+    started = time.time()
+    done_pairs = 0
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                             initializer=_init_worker, initargs=(data_path, _points)) as executor:
+        futures = [executor.submit(compute_chunk, out_dir, c, c * chunk_size,
+                                   min((c + 1) * chunk_size, total_pairs), run)
+                   for c in pending]
+        for completed, future in enumerate(as_completed(futures), 1):
+            _, pair_count = future.result()
+            done_pairs += pair_count
+            elapsed = time.time() - started
+            print(f"[{completed}/{len(pending)}] {done_pairs} çift, "
+                  f"{done_pairs / elapsed if elapsed else 0:.1f} çift/sn")
+
+def read_od_matrix(out_dir: str) -> Dict[str, array]:
+    """Parça dosyalarını birleştirerek sütunları tek dizilere toplar."""
+    with open(os.path.join(out_dir, "manifest.json"), "r", encoding="utf-8") as file:
+        manifest = json.load(file)
+    columns: Dict[str, array] = {}
+    for chunk in range(manifest["chunks"]):
+        store = ArrayFile(chunk_path(out_dir, chunk))
+        for name, view in store.arrays.items():
+            columns.setdefault(name, array(view.format)).extend(view)
+        store.close()
+    return columns
+
+def main():
+    parser = argparse.ArgumentParser(description="Izgara üzerinde başlangıç/bitiş süre ve ücret matrisi üretir")
+    parser.add_argument("--data", default="data.txt", help="Ulaşım verisi dosyası")
+    parser.add_argument("--bbox", type=float, nargs=4, required=True, metavar=("GUNEY", "BATI", "KUZEY", "DOGU"))
+    parser.add_argument("--rows", type=int, default=10)
+    parser.add_argument("--cols", type=int, default=10)
+    parser.add_argument("--out", required=True, help="Parça dosyalarının yazılacağı klasör")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--passenger-type", default="Genel")
+    parser.add_argument("--kentkart", type=float, help="KentKart bakiyesi (TL)")
+    parser.add_argument("--cash", type=float, help="Nakit (TL)")
+    parser.add_argument("--credit-card", type=float, help="Kredi kartı limiti (TL)")
+    args = parser.parse_args()
+
+    # Hiçbir bakiye verilmezse sınır yoktur; biri verilirse verilmeyenler 0 sayılır
+    balances = {"kentkart": args.kentkart, "cash": args.cash, "creditCard": args.credit_card}
+    payment_info = {key: value for key, value in balances.items() if value is not None} or None
+    build_od_matrix(args.data, args.bbox, args.rows, args.cols, args.out,
+                    args.workers, args.chunk_size, args.passenger_type, payment_info)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+import heapq
+from typing import List, Dict, Any, Tuple, Callable, Optional
+from compiled_graph import CompiledGraph, EDGE_DIRECT
+from route_planner import calculate_walking_time, edge_fare, path_fares
+
+# Etiket alanları: (süre, ücret, aktarma, düğüm, önceki etiket, kenar, aktarma indirimi hakkı)
+TIME, COST, TRANSFERS, NODE, PARENT, EDGE, AFTER_TRANSFER = range(7)
+INF = float("inf")
+
+# Graf modlarının ön yüzdeki adım adları ve açıklamaları
+STEP_MODES = {
+    "bus": ("Bus", "otobüs yolculuğu"),
+    "tram": ("Tram", "tramvay yolculuğu"),
+    "transfer": ("Aktarma", "aktarma"),
+    "walk": ("Yürüme", "aktarma yürüyüşü")
+}
+
+def dominates(a: Tuple, b: Tuple) -> bool:
+    """
+    a etiketi süre, ücret ve aktarma sayısının hepsinde b'den kötü değilse ve b'nin sıradaki
+    yolculukta aktarma indirimi hakkı a'da da varsa True döner.
+    """
+    return (a[TIME] <= b[TIME] and a[COST] <= b[COST] and a[TRANSFERS] <= b[TRANSFERS]
+            and a[AFTER_TRANSFER] >= b[AFTER_TRANSFER])
+
+def pareto_search(graph: CompiledGraph, sources: Dict[int, Tuple[float, float]],
+                  targets: Dict[int, Tuple[float, float]], max_labels: int = 8,
+                  max_transfers: int = 3,
+                  fare: Optional[Callable[[int, int, bool], float]] = None) -> List[Dict[str, Any]]:
+    """
+    Çok ölçütlü etiket yerleştirme (label-setting) araması.
+    sources ve targets düğüm -> (ek süre, ek ücret) eşlemesidir (erişim ve varış bacakları).
+    Tek geçişte süre/ücret/aktarma sayısı için Pareto cephesini döndürür.
+    Kenar ücretleri fare(düğüm, kenar, aktarmadan_sonra) ile hesaplanır; verilmezse grafın ücretleri kullanılır.
+    """
+    labels: List[Tuple] = []
+    alive: List[bool] = []
+    bags: Dict[int, List[int]] = {}
+    results: List[Tuple] = []
+    pq = []
+
+    def insert(label: Tuple) -> None:
+        bag = bags.setdefault(label[NODE], [])
+        for other in bag:
+            if dominates(labels[other], label):
+                return
+        # Yeni etiketin baskıladığı etiketleri çıkar
+        kept = []
+        for other in bag:
+            if dominates(label, labels[other]):
+                alive[other] = False
+            else:
+                kept.append(other)
+        if len(kept) >= max_labels:
+            bags[label[NODE]] = kept
+            return
+        labels.append(label)
+        alive.append(True)
+        kept.append(len(labels) - 1)
+        bags[label[NODE]] = kept
+        heapq.heappush(pq, (label[TIME], label[COST], label[TRANSFERS], len(labels) - 1))
+
+    for node, (time, cost) in sources.items():
+        insert((time, cost, 0, node, -1, -1, False))
+
+    offsets = graph.offsets
+    while pq:
+        _, _, _, label_id = heapq.heappop(pq)
+        if not alive[label_id]:
+            continue
+        label = labels[label_id]
+
+        # Hedefe ulaşmış sonuçlardan biri bu etiketi zaten baskılıyorsa genişletme
+        if any(dominates(result, label) for result in results):
+            continue
+
+        node = label[NODE]
+        # En az bir kenar kullanılmış etiketler hedefte sonuçlandırılır (sadece yürüme rota sayılmaz)
+        if node in targets and label[PARENT] != -1:
+            egress_time, egress_cost = targets[node]
+            # Ücretler negatif olmadığından sonuçlar indirim hakkından bağımsız olarak baskılar
+            result = (label[TIME] + egress_time, label[COST] + egress_cost, label[TRANSFERS], node, label_id, -1, True)
+            if not any(dominates(other, result) for other in results):
+                results = [other for other in results if not dominates(result, other)]
+                results.append(result)
+
+        for e in range(offsets[node], offsets[node + 1]):
+            # Yürüyerek aktarmalar da aktarma sayılır
+            direct = graph.edge_type[e] == EDGE_DIRECT
+            transfers = label[TRANSFERS] + (0 if direct else 1)
+            # Kapatılmış aktarmaların süresi sonsuzdur (bkz. network_updates.py)
+            if transfers > max_transfers or graph.time[e] == INF:
+                continue
+            cost = graph.cost[e] if fare is None else fare(node, e, label[AFTER_TRANSFER])
+            insert((label[TIME] + graph.time[e], label[COST] + cost, transfers, graph.targets[e], label_id, e,
+                    not direct))
+
+    front = []
+    for result in sorted(results):
+        path = []
+        label_id = result[PARENT]
+        while label_id != -1:
+            label = labels[label_id]
+            path.append((label[NODE], label[EDGE]))
+            label_id = label[PARENT]
+        path.reverse()
+        front.append({
+            "time": result[TIME],
+            "cost": result[COST],
+            "transfers": result[TRANSFERS],
+            "path": path
+        })
+    return front
+
+def find_pareto_routes(start_coord, end_coord, network, max_walk=1.0, max_labels=8, max_transfers=3,
+                       passenger_type="Genel"):
+    """
+    Yürüme mesafesindeki tüm duraklardan başlayıp hedefe yakın tüm duraklarda biten
+    tek bir Pareto aramasıyla rota alternatiflerini oluşturur. Ücretler diğer stratejilerle aynı
+    şekilde edge_fare ile hesaplanır.
+    """
+    index = network.index_of_type("all")
+
+    def access_stops(coord):
+        nearby = index.within(coord["lat"], coord["lng"], max_walk)
+        # Yürüme mesafesinde durak yoksa en yakın durağı kullan
+        return nearby or index.nearest(coord["lat"], coord["lng"], 1)
+
+    graph = network.graph
+    sources = {}
+    walk_to = {}
+    for i, dist in access_stops(start_coord):
+        node = graph.index_of(index.stops[i]["id"])
+        sources[node] = (calculate_walking_time(dist), 0)
+        walk_to[node] = dist
+    targets = {}
+    walk_from = {}
+    for i, dist in access_stops(end_coord):
+        node = graph.index_of(index.stops[i]["id"])
+        targets[node] = (calculate_walking_time(dist), 0)
+        walk_from[node] = dist
+
+    fares = {}
+
+    def fare(node, e, after_transfer):
+        key = (e, after_transfer)
+        if key not in fares:
+            fares[key] = edge_fare(network, node, e, passenger_type, after_transfer)
+        return fares[key]
+
+    routes = []
+    for option in pareto_search(graph, sources, targets, max_labels, max_transfers, fare):
+        path = option["path"]
+        stops = [network.stops_by_id[graph.stop_ids[node]] for node, _ in path]
+        first, last = stops[0], stops[-1]
+
+        steps = [walking_step(start_coord, {"lat": first["lat"], "lng": first["lon"]},
+                              walk_to[path[0][0]])]
+        costs = path_fares(network, [(node, edge) for (node, _), (_, edge) in zip(path, path[1:])], passenger_type)
+        for (_, edge), from_stop, to_stop, cost in zip(path[1:], stops, stops[1:], costs):
+            steps.append(edge_step(graph, edge, from_stop, to_stop, cost))
+        steps.append(walking_step({"lat": last["lat"], "lng": last["lon"]}, end_coord,
+                                  walk_from[path[-1][0]]))
+
+        routes.append({
+            "steps": steps,
+            "total_distance": sum(step["distance"] for step in steps),
+            "total_time": option["time"],
+            "total_cost": option["cost"],
+            "transfers": option["transfers"],
+            "stops": stops
+        })
+    return routes
+
+def walking_step(from_coord, to_coord, distance):
+    walk_time = calculate_walking_time(distance)
+    return {
+        "mode": "Yürüme",
+        "from": {"lat": from_coord["lat"], "lng": from_coord["lng"]},
+        "to": {"lat": to_coord["lat"], "lng": to_coord["lng"]},
+        "distance": distance,
+        "time": walk_time,
+        "cost": 0,
+        "info": f"{distance:.2f} km yürüyüş ({walk_time} dakika)"
+    }
+
+def edge_step(graph, edge, from_stop, to_stop, cost):
+    """Graf kenarını ön yüzün beklediği adım biçimine çevirir; cost adımın ücretidir (bkz. path_fares)."""
+    mode = graph.modes[graph.mode[edge]]
+    step_mode, label = STEP_MODES.get(mode, (mode, "yolculuk"))
+    distance = graph.distance[edge]
+    time = graph.time[edge]
+    return {
+        "mode": step_mode,
+        "from": {"lat": from_stop["lat"], "lng": from_stop["lon"]},
+        "to": {"lat": to_stop["lat"], "lng": to_stop["lon"]},
+        "distance": distance,
+        "time": time,
+        "cost": cost,
+        "info": f"{distance:.2f} km {label} ({time:g} dakika)"
+    }
@@ -0,0 +1,44 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from typing import Any, Callable
+
+class PoolBusy(Exception):
+    """Havuz ve bekleme kuyruğu dolu olduğunda fırlatılır."""
+
+class PlanningTimeout(Exception):
+    """Rota hesaplaması istek süresini aştığında fırlatılır."""
+
+class PlannerPool:
+    """
+    Rota hesaplamalarını sınırlı bir işçi havuzunda çalıştırır.
+    Çalışan + bekleyen iş sayısı workers + queue_size ile sınırlıdır; aşılırsa iş hemen reddedilir.
+    """
+    def __init__(self, workers: int = 4, queue_size: int = 16, timeout: float = 10.0):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="planner")
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+        self._closing = False
+
+    def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """fn'i havuzda çalıştırıp sonucunu bekler; havuz doluysa PoolBusy, süre aşılırsa PlanningTimeout."""
+        if self._closing or not self._slots.acquire(blocking=False):
+            raise PoolBusy()
+        try:
+            future = self._executor.submit(fn, *args, **kwargs)
+        except RuntimeError:
+            self._slots.release()
+            raise PoolBusy()
+        # Yer, zaman aşımında değil iş gerçekten bitince boşalır; böylece takılan işler de sınırı doldurur
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            future.cancel()
+            raise PlanningTimeout()
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Yeni işleri reddeder, kuyruktaki işleri iptal eder ve çalışanların bitmesini bekler."""
+        self._closing = True
+        self._executor.shutdown(wait=wait, cancel_futures=True)
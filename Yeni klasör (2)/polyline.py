@@ -0,0 +1,90 @@
+import math
+from typing import List, Tuple, Sequence
+
+# Google polyline algoritmasının hassasiyeti (5 ondalık basamak, yaklaşık 1 m)
+PRECISION = 1e5
+KM_PER_DEGREE = 6371 * math.pi / 180
+
+Point = Tuple[float, float]
+
+def to_e5(value: float) -> int:
+    return int(round(value * PRECISION))
+
+def encode_value(value: int) -> str:
+    """İşaretli tam sayıyı 5 bitlik parçalar halinde karakterlere çevirir."""
+    value = ~(value << 1) if value < 0 else value << 1
+    chars = []
+    while value >= 0x20:
+        chars.append(chr((0x20 | (value & 0x1f)) + 63))
+        value >>= 5
+    chars.append(chr(value + 63))
+    return "".join(chars)
+
+def encode_points(points: Sequence[Point], previous: Tuple[int, int] = (0, 0)) -> str:
+    """
+    (enlem, boylam) noktalarını Google polyline biçiminde kodlar.
+    previous verilirse ilk nokta o noktaya (1e5 ölçekli) göre fark olarak yazılır;
+    böylece aynı noktada biten ve başlayan parçalar art arda eklenebilir.
+    """
+    prev_lat, prev_lon = previous
+    chars = []
+    for lat, lon in points:
+        lat, lon = to_e5(lat), to_e5(lon)
+        chars.append(encode_value(lat - prev_lat))
+        chars.append(encode_value(lon - prev_lon))
+        prev_lat, prev_lon = lat, lon
+    return "".join(chars)
+
+def decode_points(encoded: str, previous: Tuple[int, int] = (0, 0)) -> List[Point]:
+    """encode_points ile kodlanmış metni noktalara çevirir."""
+    lat, lon = previous
+    values = []
+    value = shift = 0
+    for char in encoded:
+        chunk = ord(char) - 63
+        value |= (chunk & 0x1f) << shift
+        shift += 5
+        if chunk < 0x20:
+            values.append(~(value >> 1) if value & 1 else value >> 1)
+            value = shift = 0
+    points = []
+    for i in range(0, len(values) - 1, 2):
+        lat += values[i]
+        lon += values[i + 1]
+        points.append((lat / PRECISION, lon / PRECISION))
+    return points
+
+def point_count(encoded: str) -> int:
+    """Kodlanmış metindeki nokta sayısı; her değerin son karakteri '_' karakterinden küçüktür."""
+    return sum(1 for char in encoded if char < "_") // 2
+
+def douglas_peucker(points: Sequence[Point], tolerance: float) -> List[Point]:
+    """
+    Douglas-Peucker sadeleştirmesi (yığınla, özyinelemesiz). tolerance km cinsindendir;
+    uzaklıklar ilk noktanın enlemine göre düzleme izdüşürülerek hesaplanır. Uç noktalar her zaman kalır.
+    """
+    if len(points) < 3:
+        return list(points)
+    x_scale = KM_PER_DEGREE * math.cos(math.radians(points[0][0]))
+    xs = [lon * x_scale for _, lon in points]
+    ys = [lat * KM_PER_DEGREE for lat, _ in points]
+    keep = [False] * len(points)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        dx, dy = xs[last] - xs[first], ys[last] - ys[first]
+        length = math.hypot(dx, dy)
+        farthest, max_distance = -1, tolerance
+        for i in range(first + 1, last):
+            if length == 0:
+                distance = math.hypot(xs[i] - xs[first], ys[i] - ys[first])
+            else:
+                distance = abs(dy * (xs[i] - xs[first]) - dx * (ys[i] - ys[first])) / length
+            if distance > max_distance:
+                farthest, max_distance = i, distance
+        if farthest != -1:
+            keep[farthest] = True
+            stack.append((first, farthest))
+            stack.append((farthest, last))
+    return [point for point, kept in zip(points, keep) if kept]
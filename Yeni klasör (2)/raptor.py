@@ -0,0 +1,179 @@
+from bisect import bisect_left
+from typing import List, Dict, Any, Optional, Tuple
+from compiled_graph import CompiledGraph, EDGE_DIRECT
+from transport_data import Line
+
+INF = float("inf")
+
+class TransitRoute:
+    """Bir hattın derlenmiş hali: durak düğümleri, ilk duraktan birikimli süreler ve kalkışlar."""
+    def __init__(self, line: Line, stops: List[int], offsets: List[float], edges: List[int], departures: List[int]):
+        self.line = line
+        self.stops = stops
+        self.offsets = offsets
+        self.edges = edges
+        self.departures = departures
+
+    def earliest_trip(self, position: int, time: float) -> Optional[int]:
+        """Verilen duraktan time anında veya sonra geçen ilk seferin ilk duraktan kalkışını döndürür."""
+        i = bisect_left(self.departures, time - self.offsets[position])
+        return self.departures[i] if i < len(self.departures) else None
+
+class RaptorEngine:
+    """
+    Tur tabanlı (RAPTOR) en erken varış motoru.
+    Her tur bir araç bacağı daha ekler; transfer bağlantıları yürüme adımı olarak uygulanır.
+    """
+    def __init__(self, graph: CompiledGraph, lines: List[Line]):
+        self.graph = graph
+        self.routes: List[TransitRoute] = []
+        self.routes_by_stop: List[List[Tuple[int, int]]] = [[] for _ in range(graph.node_count)]
+        self.footpaths: List[List[Tuple[int, float, int]]] = [[] for _ in range(graph.node_count)]
+
+        for line in lines:
+            self.add_line(line)
+
+        for u in range(graph.node_count):
+            for e in range(graph.offsets[u], graph.offsets[u + 1]):
+                # Aktarmalar ve yürüyerek aktarmalar yürüme adımıdır
+                if graph.edge_type[e] != EDGE_DIRECT:
+                    self.footpaths[u].append((graph.targets[e], graph.time[e], e))
+
+    def add_line(self, line: Line) -> None:
+        nodes = []
+        for stop_id in line.stops:
+            node = self.graph.index_of(stop_id)
+            if node is None:
+                raise ValueError(f"{line.id} hattında bilinmeyen durak: {stop_id}")
+            nodes.append(node)
+
+        # Duraklar arası süreler hattın direkt bağlantılarından alınır
+        offsets = [0.0]
+        edges = []
+        for u, v in zip(nodes, nodes[1:]):
+            edge = next((e for e in range(self.graph.offsets[u], self.graph.offsets[u + 1])
+                         if self.graph.targets[e] == v and self.graph.edge_type[e] == EDGE_DIRECT), None)
+            if edge is None:
+                raise ValueError(f"{line.id} hattında bağlantı yok: {self.graph.stop_ids[u]} -> {self.graph.stop_ids[v]}")
+            edges.append(edge)
+            offsets.append(offsets[-1] + self.graph.time[edge])
+
+        route_index = len(self.routes)
+        self.routes.append(TransitRoute(line, nodes, offsets, edges, line.departure_minutes()))
+        for position, node in enumerate(nodes):
+            self.routes_by_stop[node].append((route_index, position))
+
+    def earliest_arrival(self, sources: Dict[int, float], targets: Dict[int, float],
+                         max_rounds: int = 4) -> Optional[Dict[str, Any]]:
+        """
+        sources: düğüm -> durağa varış anı (dakika), targets: düğüm -> durak sonrası yürüme süresi.
+        En erken varışlı yolculuğu bacaklarıyla döndürür; ulaşılamıyorsa None.
+        """
+        n = self.graph.node_count
+        best = [INF] * n
+        arrivals = [[INF] * n]
+        labels: List[Dict[int, Tuple]] = [{}]
+        for node, time in sources.items():
+            if time < arrivals[0][node]:
+                arrivals[0][node] = best[node] = time
+                labels[0][node] = ("access",)
+        marked = set(sources)
+        self._relax_footpaths(0, marked, arrivals, labels, best, INF)
+
+        def target_bound():
+            return min((best[node] + egress for node, egress in targets.items()), default=INF)
+
+        for k in range(1, max_rounds + 1):
+            previous = arrivals[k - 1]
+            current = list(previous)
+            arrivals.append(current)
+            labels.append({})
+
+            # Bu turda taranacak hatlar ve her birinde en erken işaretli durak
+            queue: Dict[int, int] = {}
+            for node in marked:
+                for route_index, position in self.routes_by_stop[node]:
+                    if position < queue.get(route_index, INF):
+                        queue[route_index] = position
+
+            marked = set()
+            bound = target_bound()
+            for route_index, start_position in queue.items():
+                route = self.routes[route_index]
+                trip = None
+                board = -1
+                for position in range(start_position, len(route.stops)):
+                    node = route.stops[position]
+                    if trip is not None:
+                        arrival = trip + route.offsets[position]
+                        if arrival < best[node] and arrival < bound:
+                            current[node] = best[node] = arrival
+                            labels[k][node] = ("ride", route_index, board, position, trip)
+                            marked.add(node)
+                    # Önceki turda bu durağa daha erken gelinmişse daha erken sefere binilebilir
+                    if previous[node] < INF and (trip is None or previous[node] <= trip + route.offsets[position]):
+                        earlier = route.earliest_trip(position, previous[node])
+                        if earlier is not None and (trip is None or earlier < trip):
+                            trip = earlier
+                            board = position
+
+            self._relax_footpaths(k, marked, arrivals, labels, best, target_bound())
+            if not marked:
+                break
+
+        # En iyi varışı veren hedef ve tur (eşitlikte daha az araç bacağı tercih edilir)
+        # 0. tur araç kullanmadığından yolculuk sayılmaz
+        best_total, best_round, best_target = INF, -1, -1
+        for k in range(1, len(arrivals)):
+            for node, egress in targets.items():
+                if node in labels[k] and arrivals[k][node] + egress < best_total:
+                    best_total, best_round, best_target = arrivals[k][node] + egress, k, node
+        if best_round < 0:
+            return None
+
+        return {
+            "arrival": best_total,
+            "target": best_target,
+            "legs": self._journey(best_round, best_target, arrivals, labels)
+        }
+
+    def _relax_footpaths(self, k, marked, arrivals, labels, best, bound):
+        for node in list(marked):
+            for target, time, edge in self.footpaths[node]:
+                arrival = arrivals[k][node] + time
+                if arrival < best[target] and arrival < bound:
+                    arrivals[k][target] = best[target] = arrival
+                    labels[k][target] = ("walk", node, edge)
+                    marked.add(target)
+
+    def _journey(self, k, node, arrivals, labels) -> List[Dict[str, Any]]:
+        """Etiketleri geriye doğru izleyerek bacak listesini oluşturur."""
+        legs = []
+        while True:
+            label = labels[k][node]
+            if label[0] == "access":
+                break
+            if label[0] == "walk":
+                _, previous, edge = label
+                legs.append({"kind": "transfer", "from": previous, "to": node, "edge": edge,
+                             "departure": arrivals[k][previous], "arrival": arrivals[k][node]})
+                node = previous
+            else:
+                _, route_index, board, alight, trip = label
+                route = self.routes[route_index]
+                board_node = route.stops[board]
+                legs.append({"kind": "ride", "route": route, "board": board, "alight": alight,
+                             "ready": arrivals[k - 1][board_node],
+                             "departure": trip + route.offsets[board],
+                             "arrival": trip + route.offsets[alight]})
+                node = board_node
+                # Biniş durağına ulaşılan tur, değeri önceki turlardan kopyalanmış olabilir
+                k -= 1
+                while node not in labels[k]:
+                    k -= 1
+        legs.reverse()
+        return legs
+
+def format_time(minutes: float) -> str:
+    minutes = int(round(minutes))
+    return f"{minutes // 60 % 24:02d}:{minutes % 60:02d}"
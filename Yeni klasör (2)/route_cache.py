@@ -0,0 +1,100 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Callable, Set, Tuple
+
+class RouteCache:
+    """
+    find_routes_by_type sonuçları için sınırlı boyutlu, süreli (LRU/TTL) önbellek.
+    Anahtar: ızgaraya yuvarlanmış koordinatlar ve yolcu tipi. Rotalar bakiye sınırı olmadan
+    saklanır; bakiye kontrolü her istekte önbellekten dönen rotalara uygulanır.
+    Ağ görüntüsünün sürümü değişince önbellek tamamen boşaltılır; artımlı güncellemelerden
+    sonra carry_over ile yalnızca etkilenen girdiler silinir.
+    """
+    def __init__(self, max_entries: int = 1024, ttl: float = 300.0,
+                 grid: float = 0.0005):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.grid = grid
+        self.version = None
+        self._entries: "OrderedDict[Tuple, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.dropped = 0
+
+    def snap(self, coord: Dict[str, float]) -> Tuple[int, int]:
+        return (round(coord["lat"] / self.grid), round(coord["lng"] / self.grid))
+
+    def _invalidate(self, version: str) -> None:
+        if self.version is not None:
+            self.invalidations += 1
+        self._entries.clear()
+        self.version = version
+
+    def carry_over(self, old_version: str, new_version: str, affected_stops: Set[str], flush: bool) -> int:
+        """
+        Artımlı ağ güncellemesinden sonra, etkilenen duraklardan geçen rotaları içeren girdileri siler
+        ve kalanları yeni sürüme taşır. Güncelleme yeni veya daha iyi bir rota oluşturabiliyorsa (flush)
+        hangi girdilerin değişeceği bilinemeyeceğinden önbellek tamamen boşaltılır. Kalan girdi sayısını döndürür.
+        """
+        with self._lock:
+            if flush or self.version != old_version:
+                self._invalidate(new_version)
+                return 0
+            stale = [key for key, (_, routes) in self._entries.items()
+                     if any(stop["id"] in affected_stops
+                            for route_list in routes.values() for route in route_list
+                            for stop in route.get("stops", ()))]
+            for key in stale:
+                del self._entries[key]
+            self.dropped += len(stale)
+            self.version = new_version
+            return len(self._entries)
+
+    def find_routes(self, network, start_coord, end_coord, passenger_type: str,
+                    compute: Callable) -> Dict[str, Any]:
+        """Önbellekte yoksa compute(start, end, passenger_type) ile bakiye sınırı olmadan hesaplayıp saklar."""
+        key = (self.snap(start_coord), self.snap(end_coord), passenger_type)
+
+        with self._lock:
+            if network.version != self.version:
+                self._invalidate(network.version)
+            entry = self._entries.get(key)
+            if entry is not None:
+                if time.monotonic() - entry[0] <= self.ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self._entries[key]
+                self.expirations += 1
+            self.misses += 1
+
+        # Hesaplama kilit dışında yapılır; aynı anahtar için eşzamanlı iki hesaplama olabilir
+        routes = compute(start_coord, end_coord, passenger_type)
+
+        with self._lock:
+            if network.version == self.version:
+                self._entries[key] = (time.monotonic(), routes)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return routes
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "version": self.version,
+                "size": len(self._entries),
+                "maxEntries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+                "dropped": self.dropped
+            }
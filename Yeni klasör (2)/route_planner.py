@@ -1,10 +1,24 @@
 import math
 import heapq
-from typing import List, Dict, Any
+import bisect
+from array import array
+from typing import List, Dict, Any, Optional
 from dataclasses import dataclass
 from transport_system import Passenger, Vehicle, Payment, Location
 from distance_calculator import DistanceCalculator, DistanceCalculatorFactory
 from route_strategy import RouteStrategy, RouteStrategyFactory
+from compiled_graph import CompiledGraph, EDGE_TYPES, EDGE_DIRECT
+from network_snapshot import NetworkSnapshot
+from edge_geometry import route_geometry
+from polyline import encode_points
+from spatial_index import SpatialIndex
+from transport_data import parse_time, with_distance
+from raptor import format_time
+
+# Toplu taşıma seçenekleri için gereken en az KentKart bakiyesi (en düşük toplu taşıma ücreti)
+MIN_TRANSIT_BALANCE = 7.0
+# Kısa (3 km'den az) yolculuklarda durağa en fazla yürüme mesafesi (km)
+SHORT_TRIP_WALK = 0.5
 
 @dataclass
 class RouteStep:
@@ -37,23 +51,21 @@ class RoutePlanner:
         strategy = RouteStrategyFactory.create_strategy(strategy_type, self.distance_calculator)
         return strategy.find_route(start_coord, end_coord, stops, passenger.passenger_type.value, payment_info)
 
-    def find_nearest_stops(self, user_coord: Dict[str, float], stops: List[Dict[str, Any]], k: int = 3) -> List[Dict[str, Any]]:
+    def find_nearest_stops(self, user_coord: Dict[str, float], stops: List[Dict[str, Any]], k: int = 3,
+                           index: SpatialIndex = None) -> List[Dict[str, Any]]:
         """
         Kullanıcının konumuna en yakın k adet durağı bulur.
         """
-        distances = []
-        for stop in stops:
-            dist = self.distance_calculator.calculate_distance(
+        if index is not None:
+            nearest = index.nearest(user_coord["lat"], user_coord["lng"], k)
+        else:
+            distances = self.distance_calculator.calculate_distances(
                 user_coord["lat"], user_coord["lng"],
-                stop["lat"], stop["lon"]
+                [stop["lat"] for stop in stops], [stop["lon"] for stop in stops]
             )
-            distances.append({
-                **stop,
-                "distance": dist
-            })
-        
-        distances.sort(key=lambda x: x["distance"])
-        return distances[:k]
+            nearest = sorted(enumerate(distances), key=lambda x: (x[1], x[0]))[:k]
+
+        return [with_distance(stops[i], dist) for i, dist in nearest]
 
     def calculate_fare(self, distance: float, vehicle: Vehicle, passenger: Passenger,
                       is_transfer: bool = False, total_journey_distance: float = None) -> float:
@@ -116,21 +128,17 @@ def haversine(lat1, lon1, lat2, lon2):
     
     return distance
 
-def find_nearest_stops(user_coord, stops, k=3):
+def find_nearest_stops(user_coord, stops, k=3, index=None):
     """
     Kullanıcının konumuna en yakın k adet durağı bulur.
+    index, stops listesi üzerine kurulmuş SpatialIndex'tir; verilmezse geçici olarak oluşturulur.
     """
-    distances = []
-    for stop in stops:
-        dist = haversine(user_coord["lat"], user_coord["lng"], stop["lat"], stop["lon"])
-        distances.append({
-            **stop,
-            "distance": dist
-        })
-    
-    # Mesafeye göre sırala ve en yakın k durağı döndür
-    distances.sort(key=lambda x: x["distance"])
-    return distances[:k]
+    if index is None:
+        index = SpatialIndex(stops)
+    nearest = index.nearest(user_coord["lat"], user_coord["lng"], k)
+
+    # Tablo görünümleri kopyalanmaz, sadece mesafe bilgisi eklenir
+    return [with_distance(stops[i], dist) for i, dist in nearest]
 
 def calculate_distance(lat1, lon1, lat2, lon2):
     """Haversine formülü ile iki nokta arasındaki mesafeyi hesaplar."""
@@ -146,89 +154,116 @@ def calculate_distance(lat1, lon1, lat2, lon2):
     
     return R * c
 
-def find_nearest_stop(user_coord, stops):
-    min_distance = float("inf")
-    nearest = None
-    
-    for stop in stops:
-        dist = haversine(user_coord["lat"], user_coord["lng"], stop["lat"], stop["lon"])
-        
-        if dist < min_distance:
-            min_distance = dist
-            nearest = stop
-    
-    return nearest, min_distance
+def find_nearest_stop(user_coord, stops, index=None):
+    if index is None:
+        index = SpatialIndex(stops)
+    nearest = index.nearest(user_coord["lat"], user_coord["lng"], 1)
+    if not nearest:
+        return None, float("inf")
+    i, dist = nearest[0]
+    return stops[i], dist
 
 def build_graph(stops):
-    graph = {}
-    # Normal duraklar arası bağlantıları ekle
-    for stop in stops:
-        graph[stop["id"]] = []
-        # Direkt bağlantılar
-        for edge in stop.get("nextStops", []):
-            graph[stop["id"]].append({
-                "target": edge["stopId"],
-                "type": "direct",
-                "cost": edge["ucret"],
-                "time": edge["sure"],
-                "distance": edge["mesafe"],
-                "mode": stop["type"]
-            })
-        
-        # Transfer bağlantıları
-        if stop.get("transfer"):
-            transfer = stop["transfer"]
-            graph[stop["id"]].append({
-                "target": transfer["transferStopId"],
-                "type": "transfer",
-                "cost": transfer["transferUcret"],
-                "time": transfer["transferSure"],
-                "distance": 0.1,  # Transfer için küçük bir mesafe ekle
-                "mode": "transfer"
-            })
-    return graph
+    """Duraklardan tamsayı indeksli, sıkıştırılmış bağlantı grafını oluşturur."""
+    return CompiledGraph.from_stops(stops)
 
 def dijkstra(graph, start_id, end_id):
-    distances = {node: float('infinity') for node in graph}
-    distances[start_id] = 0
-    pq = [(0, start_id, [{"id": start_id, "type": "start"}])]
-    visited = set()
+    start = graph.index_of(start_id)
+    end = graph.index_of(end_id)
+    if start is None or end is None:
+        return float('infinity'), []
+
+    offsets = graph.offsets
+    targets = graph.targets
+    weights = graph.weight
+    distances = [float('infinity')] * graph.node_count
+    distances[start] = 0
+    # Yol her adımda kopyalanmaz, önceki düğüm ve kenar tutulur
+    parent_node = [-1] * graph.node_count
+    parent_edge = [-1] * graph.node_count
+    pq = [(0, start)]
+    visited = [False] * graph.node_count
 
     while pq:
-        current_distance, current_node, path = heapq.heappop(pq)
+        current_distance, current_node = heapq.heappop(pq)
         
-        if current_node == end_id:
-            return current_distance, path
+        if current_node == end:
+            return current_distance, reconstruct_path(graph, start, end, parent_node, parent_edge)
             
-        if current_node in visited:
+        if visited[current_node]:
             continue
             
-        visited.add(current_node)
+        visited[current_node] = True
         
-        for edge in graph[current_node]:
-            neighbor = edge["target"]
-            if neighbor not in visited:
-                # Ağırlık hesaplamasını güncelle
-                # Mesafe ve süreye daha fazla, ücrete daha az ağırlık ver
-                weight = (edge["distance"] * 2) + (edge["time"] / 5) + (edge["cost"] / 2)
-                
-                # Transfer için ek maliyet
-                if edge["type"] == "transfer":
-                    weight += 1  # Transfer maliyetini artır
-                
-                distance = current_distance + weight
+        for e in range(offsets[current_node], offsets[current_node + 1]):
+            neighbor = targets[e]
+            if not visited[neighbor]:
+                # Karma ağırlık (transfer cezası dahil) graf derlenirken hesaplanır
+                distance = current_distance + weights[e]
                 
                 if distance < distances[neighbor]:
                     distances[neighbor] = distance
-                    new_path = path + [{"id": neighbor, "type": edge["type"], "mode": edge["mode"]}]
-                    heapq.heappush(pq, (distance, neighbor, new_path))
+                    parent_node[neighbor] = current_node
+                    parent_edge[neighbor] = e
+                    heapq.heappush(pq, (distance, neighbor))
     
     return float('infinity'), []
 
-def find_routes_by_type(start_coord, end_coord, stops, taxi_info, passenger_type="Genel", payment_info=None, taxi_threshold=3.0):
+def shortest_path(network, start_id, end_id):
+    """
+    Ağ görüntüsünde kısayol hiyerarşisi varsa iki yönlü CH sorgusuyla, yoksa dijkstra ile
+    en kısa yolu bulur. İki yol da aynı karma ağırlığı kullanır ve aynı biçimde yol döndürür.
+    """
+    if network.contraction is None:
+        return dijkstra(network.graph, start_id, end_id)
+    graph = network.graph
+    start = graph.index_of(start_id)
+    end = graph.index_of(end_id)
+    if start is None or end is None:
+        return float('infinity'), []
+
+    distance, edges = network.contraction.query(start, end)
+    if distance == float('infinity'):
+        return distance, []
+    return distance, edge_path(graph, start, edges)
+
+def edge_path(graph, start, edges):
+    """Graf kenarları dizisinden reconstruct_path ile aynı biçimde yol oluşturur."""
+    path = [{"id": graph.stop_ids[start], "type": "start"}]
+    for e in edges:
+        path.append({
+            "id": graph.stop_ids[graph.targets[e]],
+            "type": EDGE_TYPES[graph.edge_type[e]],
+            "mode": graph.modes[graph.mode[e]]
+        })
+    return path
+
+def reconstruct_path(graph, start, end, parent_node, parent_edge):
+    """Önceki düğüm/kenar dizilerinden yolu bir kez oluşturur."""
+    path = []
+    node = end
+    while node != start:
+        e = parent_edge[node]
+        path.append({
+            "id": graph.stop_ids[node],
+            "type": EDGE_TYPES[graph.edge_type[e]],
+            "mode": graph.modes[graph.mode[e]]
+        })
+        node = parent_node[node]
+    path.append({"id": graph.stop_ids[start], "type": "start"})
+    path.reverse()
+    return path
+
+def find_routes_by_type(start_coord, end_coord, stops, taxi_info, passenger_type="Genel", payment_info=None, taxi_threshold=3.0, network=None, max_routes=3):
     """
     Farklı ulaşım tiplerinde rota alternatifleri hesaplar.
+    network verilmezse duraklardan geçici bir ağ görüntüsü oluşturulur.
+    Toplu taşıma rotaları kısa ve uzun yolculukta aynı çok kaynaklı aramayla (access_search) bulunur.
+    Her kategoride en ucuz max_routes rota döner (None ise tümü).
     """
+    if network is None:
+        network = NetworkSnapshot("local", "", taxi_info, stops)
+
     routes = {
         "bus_only": [],
         "tram_only": [],
@@ -238,6 +273,10 @@ def find_routes_by_type(start_coord, end_coord, stops, taxi_info, passenger_type
         "walking": []
     }
 
+    # Bakiye sınırı varsa ödenemeyen rotalar aramadan sonra elendiğinden arama kesilmeden yapılır;
+    # böylece sonuç affordable_routes ile aynıdır
+    search_limit = max_routes if payment_info is None else None
+
     # Ödeme bilgilerini kontrol et
     if payment_info is None:
         payment_info = {
@@ -246,653 +285,401 @@ def find_routes_by_type(start_coord, end_coord, stops, taxi_info, passenger_type
             "kentkart": float('inf')
         }
 
-    total_available_balance = payment_info.get("cash", 0) + payment_info.get("creditCard", 0)
     kentkart_balance = payment_info.get("kentkart", 0)
 
     # Direkt mesafeyi hesapla
     direct_distance = calculate_distance(start_coord["lat"], start_coord["lng"], end_coord["lat"], end_coord["lng"])
 
-    def is_payment_viable(total_cost, requires_kentkart=True):
-        """Ödeme yapılabilirliğini kontrol eder"""
-        if requires_kentkart:
-            # Toplu taşıma için KentKart gerekli
-            return kentkart_balance >= total_cost
-        else:
-            # Taksi için nakit veya kredi kartı kullanılabilir
-            return total_available_balance >= total_cost
-
-    # 3 km'den kısa mesafeler için özel değerlendirme
-    if direct_distance <= 3.0:
-        # Yürüme seçeneği her zaman mevcut
-        walking_time = calculate_walking_time(direct_distance)
-        walking_route = {
+    def direct_route(mode, distance, time, cost, info):
+        return {
             "steps": [{
-                "mode": "Yürüme",
+                "mode": mode,
                 "from": {"lat": start_coord["lat"], "lng": start_coord["lng"]},
                 "to": {"lat": end_coord["lat"], "lng": end_coord["lng"]},
-                "distance": direct_distance,
-                "time": walking_time,
-                "cost": 0,
-                "info": f"{direct_distance:.2f} km yürüyüş ({walking_time} dakika)"
+                "distance": distance,
+                "time": time,
+                "cost": cost,
+                "info": info
             }],
-            "total_distance": direct_distance,
-            "total_time": walking_time,
-            "total_cost": 0,
+            "total_distance": distance,
+            "total_time": time,
+            "total_cost": cost,
             "stops": []
         }
-        routes["walking"].append(walking_route)
-
-        # Taksi seçeneği (ödeme kontrolü ile)
-        taxi_time = calculate_taxi_time(direct_distance)
-        taxi_cost = calculate_taxi_fare(direct_distance, taxi_info)
-        if is_payment_viable(taxi_cost, requires_kentkart=False):
-            taxi_route = {
-                "steps": [{
-                    "mode": "Taksi",
-                    "from": {"lat": start_coord["lat"], "lng": start_coord["lng"]},
-                    "to": {"lat": end_coord["lat"], "lng": end_coord["lng"]},
-                    "distance": direct_distance,
-                    "time": taxi_time,
-                    "cost": taxi_cost,
-                    "info": f"{direct_distance:.2f} km taksi yolculuğu ({taxi_time} dakika)"
-                }],
-                "total_distance": direct_distance,
-                "total_time": taxi_time,
-                "total_cost": taxi_cost,
-                "stops": []
-            }
-            routes["taxi_only"].append(taxi_route)
-
-        # Toplu taşıma seçenekleri (ödeme kontrolü ile)
-        if kentkart_balance >= 7.0:  # Minimum toplu taşıma ücreti
-            bus_stops = [s for s in stops if s["type"] == "bus"]
-            tram_stops = [s for s in stops if s["type"] == "tram"]
-            nearest_bus_starts = find_nearest_stops(start_coord, bus_stops, k=1)
-            nearest_bus_ends = find_nearest_stops(end_coord, bus_stops, k=1)
-            nearest_tram_starts = find_nearest_stops(start_coord, tram_stops, k=1)
-            nearest_tram_ends = find_nearest_stops(end_coord, tram_stops, k=1)
-
-            def is_transit_viable(start_stop, end_stop):
-                total_walking = start_stop["distance"] + end_stop["distance"]
-                if total_walking > direct_distance * 0.5 or start_stop["distance"] > 0.5 or end_stop["distance"] > 0.5:
-                    return False
-                return True
-
-            # Otobüs rotası
-            if nearest_bus_starts and nearest_bus_ends:
-                start_stop = nearest_bus_starts[0]
-                end_stop = nearest_bus_ends[0]
-                if is_transit_viable(start_stop, end_stop):
-                    route = create_bus_route(start_coord, end_coord, start_stop, end_stop, bus_stops, passenger_type)
-                    if route and is_payment_viable(route["total_cost"]):
-                        routes["bus_only"].append(route)
-
-            # Tramvay rotası
-            if nearest_tram_starts and nearest_tram_ends:
-                start_stop = nearest_tram_starts[0]
-                end_stop = nearest_tram_ends[0]
-                if is_transit_viable(start_stop, end_stop):
-                    route = create_tram_route(start_coord, end_coord, start_stop, end_stop, tram_stops, passenger_type)
-                    if route and is_payment_viable(route["total_cost"]):
-                        routes["tram_only"].append(route)
-
-    else:
-        # 3 km'den uzun mesafeler için rota hesaplama
-        # Taksi seçeneği
-        taxi_time = calculate_taxi_time(direct_distance)
-        taxi_cost = calculate_taxi_fare(direct_distance, taxi_info)
-        if is_payment_viable(taxi_cost, requires_kentkart=False):
-            taxi_route = {
-                "steps": [{
-                    "mode": "Taksi",
-                    "from": {"lat": start_coord["lat"], "lng": start_coord["lng"]},
-                    "to": {"lat": end_coord["lat"], "lng": end_coord["lng"]},
-                    "distance": direct_distance,
-                    "time": taxi_time,
-                    "cost": taxi_cost,
-                    "info": f"{direct_distance:.2f} km taksi yolculuğu ({taxi_time} dakika)"
-                }],
-                "total_distance": direct_distance,
-                "total_time": taxi_time,
-                "total_cost": taxi_cost,
-                "stops": []
-            }
-            routes["taxi_only"].append(taxi_route)
-
-        # Toplu taşıma seçenekleri (ödeme kontrolü ile)
-        if kentkart_balance >= 7.0:
-            bus_stops = [s for s in stops if s["type"] == "bus"]
-            tram_stops = [s for s in stops if s["type"] == "tram"]
-            nearest_bus_starts = find_nearest_stops(start_coord, bus_stops, k=3)
-            nearest_bus_ends = find_nearest_stops(end_coord, bus_stops, k=3)
-            nearest_tram_starts = find_nearest_stops(start_coord, tram_stops, k=3)
-            nearest_tram_ends = find_nearest_stops(end_coord, tram_stops, k=3)
-
-            # Otobüs rotaları
-            for start_stop in nearest_bus_starts:
-                for end_stop in nearest_bus_ends:
-                    if start_stop["distance"] <= taxi_threshold and end_stop["distance"] <= taxi_threshold:
-                        route = create_bus_route(start_coord, end_coord, start_stop, end_stop, bus_stops, passenger_type)
-                        if route and is_payment_viable(route["total_cost"]):
-                            routes["bus_only"].append(route)
-
-            # Tramvay rotaları
-            for start_stop in nearest_tram_starts:
-                for end_stop in nearest_tram_ends:
-                    if start_stop["distance"] <= taxi_threshold and end_stop["distance"] <= taxi_threshold:
-                        route = create_tram_route(start_coord, end_coord, start_stop, end_stop, tram_stops, passenger_type)
-                        if route and is_payment_viable(route["total_cost"]):
-                            routes["tram_only"].append(route)
-
-            # Karma rotalar
-            for bus_start in nearest_bus_starts:
-                for tram_end in nearest_tram_ends:
-                    if bus_start["distance"] <= taxi_threshold and tram_end["distance"] <= taxi_threshold:
-                        route = create_mixed_route(start_coord, end_coord, bus_start, tram_end, stops, passenger_type)
-                        if route and is_payment_viable(route["total_cost"]):
-                            routes["mixed"].append(route)
-
-            for tram_start in nearest_tram_starts:
-                for bus_end in nearest_bus_ends:
-                    if tram_start["distance"] <= taxi_threshold and bus_end["distance"] <= taxi_threshold:
-                        route = create_mixed_route(start_coord, end_coord, tram_start, bus_end, stops, passenger_type)
-                        if route and is_payment_viable(route["total_cost"]):
-                            routes["mixed"].append(route)
-
-            # Taksi + Toplu Taşıma kombinasyonları
-            taxi_routes = create_taxi_mixed_routes(start_coord, end_coord, stops, taxi_info, passenger_type)
-            if taxi_routes:
-                viable_taxi_routes = []
-                for route in taxi_routes:
-                    # Taksi kısmı için nakit/kredi kartı, toplu taşıma kısmı için KentKart kontrolü
-                    taxi_steps = [step for step in route["steps"] if step["mode"] == "Taksi"]
-                    transit_steps = [step for step in route["steps"] if step["mode"] in ["Bus", "Tram"]]
-                    
-                    taxi_cost = sum(step["cost"] for step in taxi_steps)
-                    transit_cost = sum(step["cost"] for step in transit_steps)
-                    
-                    if is_payment_viable(taxi_cost, requires_kentkart=False) and is_payment_viable(transit_cost):
-                        viable_taxi_routes.append(route)
-                
-                if viable_taxi_routes:
-                    routes["taxi_mixed"] = viable_taxi_routes
+
+    # 3 km'den kısa mesafelerde yürüme seçeneği her zaman mevcut
+    short_trip = direct_distance <= 3.0
+    if short_trip:
+        walking_time = calculate_walking_time(direct_distance)
+        routes["walking"].append(direct_route("Yürüme", direct_distance, walking_time, 0,
+                                              f"{direct_distance:.2f} km yürüyüş ({walking_time} dakika)"))
+
+    # Taksi seçeneği (ödeme kontrolü ile)
+    taxi_time = calculate_taxi_time(direct_distance)
+    taxi_cost = calculate_taxi_fare(direct_distance, taxi_info)
+    taxi_route = direct_route("Taksi", direct_distance, taxi_time, taxi_cost,
+                              f"{direct_distance:.2f} km taksi yolculuğu ({taxi_time} dakika)")
+    if is_affordable(taxi_route, payment_info):
+        routes["taxi_only"].append(taxi_route)
+
+    # Toplu taşıma seçenekleri (ödeme kontrolü ile)
+    if kentkart_balance >= MIN_TRANSIT_BALANCE:
+        if short_trip:
+            # Kısa yolculukta yalnızca yakın duraklara yürüyerek tek araçlı rotalar aranır
+            access_modes = (("walk", SHORT_TRIP_WALK),)
+            categories = ("bus_only", "tram_only")
+        else:
+            # Yürüme eşiğindeki tüm duraklar yürüyerek, toplam mesafenin %40'ı içindekiler taksiyle
+            # erişilen/ayrılınan duraklardır
+            access_modes = (("walk", taxi_threshold), ("taxi", direct_distance * 0.4))
+            categories = ("bus_only", "tram_only", "mixed", "taxi_mixed")
+        # Tüm rota türleri tek bir çok kaynaklı aramayla bulunur
+        index = network.index_of_type("all")
+        graph = network.graph
+
+        def access_points(coord):
+            for mode, radius in access_modes:
+                for i, dist in index.within(coord["lat"], coord["lng"], radius):
+                    yield graph.index_of(index.stops[i]["id"]), mode, access_value(mode, dist, taxi_info)
+
+        sources = {(node, mode): value for node, mode, value in access_points(start_coord)}
+        targets = {}
+        for node, mode, value in access_points(end_coord):
+            targets.setdefault(node, []).append((mode, value))
+
+        found = access_search(network, end_coord, sources, targets, passenger_type, categories, search_limit)
+        for route_type, results in found.items():
+            for result in results:
+                # Kısa yolculukta toplam yürüme doğrudan mesafenin yarısını aşmamalı
+                if short_trip and result["access_distance"] + result["egress_distance"] > direct_distance * 0.5:
+                    continue
+                route = create_search_route(start_coord, end_coord, result, network, taxi_info, passenger_type)
+                # Taksi kısmı için nakit/kredi kartı, toplu taşıma kısmı için KentKart kontrolü
+                if is_affordable(route, payment_info):
+                    routes[route_type].append(route)
 
     # Her kategori için rotaları sırala
     for route_type in routes:
         if routes[route_type]:
             routes[route_type].sort(key=lambda x: (x["total_cost"], x["total_time"], x["total_distance"]))
-            routes[route_type] = routes[route_type][:3]  # Her kategoride en iyi 3 rotayı tut
+            routes[route_type] = routes[route_type][:max_routes]
 
     return routes
 
-def find_intermediate_stops(start_stop, end_stop, all_stops):
-    """İki durak arasındaki ara durakları bulur"""
-    intermediate_stops = []
-    current = start_stop
-    visited = set()
-
-    while current and current['id'] != end_stop['id']:
-        visited.add(current['id'])
-        next_stop = None
-        min_distance = float('inf')
-
-        # Mevcut duraktan gidilebilecek tüm durakları kontrol et
-        for next_possible in current.get('nextStops', []):
-            if next_possible['stopId'] not in visited:
-                # Hedef durağa olan mesafeyi hesapla
-                for stop in all_stops:
-                    if stop['id'] == next_possible['stopId']:
-                        distance = calculate_distance(
-                            stop['lat'], stop['lon'],
-                            end_stop['lat'], end_stop['lon']
-                        )
-                        if distance < min_distance:
-                            min_distance = distance
-                            next_stop = stop
-                            break
-
-        if next_stop:
-            intermediate_stops.append(next_stop)
-            current = next_stop
-        else:
-            break
-
-    return intermediate_stops
-
-def create_bus_route(start, end, start_stop, end_stop, bus_stops, passenger_type):
-    """Sadece otobüs kullanan rota oluşturur."""
-    steps = []
-    total_distance = 0
-    total_time = 0
-    total_cost = 0
-    all_stops = [start_stop]  # Başlangıç durağını ekle
-
-    # Başlangıç noktasından ilk durağa yürüyüş
-    walk_distance = start_stop["distance"]
-    walk_time = calculate_walking_time(walk_distance)
-    steps.append({
-        "mode": "Yürüme",
-        "from": {"lat": start["lat"], "lng": start["lng"]},
-        "to": {"lat": start_stop["lat"], "lng": start_stop["lon"]},
-        "distance": walk_distance,
-        "time": walk_time,
-        "cost": 0,
-        "info": f"{walk_distance:.2f} km yürüyüş ({walk_time} dakika)"
-    })
-    total_distance += walk_distance
-    total_time += walk_time
-
-    # Ara durakları bul
-    intermediate_stops = find_intermediate_stops(start_stop, end_stop, bus_stops)
-    all_stops.extend(intermediate_stops)  # Ara durakları ekle
-    all_stops.append(end_stop)  # Bitiş durağını ekle
-
-    # Otobüs yolculuğu (ara duraklarla birlikte)
-    current_stop = start_stop
-    for next_stop in intermediate_stops + [end_stop]:
-        segment_distance = calculate_distance(
-            current_stop["lat"], current_stop["lon"],
-            next_stop["lat"], next_stop["lon"]
-        )
-        segment_time = calculate_bus_time(segment_distance)
-        segment_cost = calculate_fare(segment_distance, "bus", passenger_type)
-
-        steps.append({
-            "mode": "Bus",
-            "from": {"lat": current_stop["lat"], "lng": current_stop["lon"]},
-            "to": {"lat": next_stop["lat"], "lng": next_stop["lon"]},
-            "distance": segment_distance,
-            "time": segment_time,
-            "cost": segment_cost,
-            "info": f"{segment_distance:.2f} km otobüs yolculuğu ({segment_time} dakika)"
-        })
-        total_distance += segment_distance
-        total_time += segment_time
-        total_cost += segment_cost
-        current_stop = next_stop
+def step_cost(route, modes) -> float:
+    return sum(step["cost"] for step in route["steps"] if step["mode"] in modes)
 
-    # Son duraktan varış noktasına yürüyüş
-    walk_distance = end_stop["distance"]
-    walk_time = calculate_walking_time(walk_distance)
-    steps.append({
-        "mode": "Yürüme",
-        "from": {"lat": end_stop["lat"], "lng": end_stop["lon"]},
-        "to": {"lat": end["lat"], "lng": end["lng"]},
-        "distance": walk_distance,
-        "time": walk_time,
-        "cost": 0,
-        "info": f"{walk_distance:.2f} km yürüyüş ({walk_time} dakika)"
-    })
-    total_distance += walk_distance
-    total_time += walk_time
-
-    return {
-        "steps": steps,
-        "total_distance": total_distance,
-        "total_time": total_time,
-        "total_cost": total_cost,
-        "stops": all_stops  # Tüm durakları içerir
-    }
-
-def create_tram_route(start, end, start_stop, end_stop, tram_stops, passenger_type):
-    """Sadece tramvay kullanan rota oluşturur."""
-    steps = []
-    total_distance = 0
-    total_time = 0
-    total_cost = 0
-    all_stops = [start_stop]  # Başlangıç durağını ekle
-
-    # Başlangıç noktasından ilk durağa yürüyüş
-    walk_distance = start_stop["distance"]
-    walk_time = calculate_walking_time(walk_distance)
-    steps.append({
-        "mode": "Yürüme",
-        "from": {"lat": start["lat"], "lng": start["lng"]},
-        "to": {"lat": start_stop["lat"], "lng": start_stop["lon"]},
-        "distance": walk_distance,
-        "time": walk_time,
-        "cost": 0,
-        "info": f"{walk_distance:.2f} km yürüyüş ({walk_time} dakika)"
-    })
-    total_distance += walk_distance
-    total_time += walk_time
-
-    # Ara durakları bul
-    intermediate_stops = find_intermediate_stops(start_stop, end_stop, tram_stops)
-    all_stops.extend(intermediate_stops)  # Ara durakları ekle
-    all_stops.append(end_stop)  # Bitiş durağını ekle
-
-    # Tramvay yolculuğu (ara duraklarla birlikte)
-    current_stop = start_stop
-    for next_stop in intermediate_stops + [end_stop]:
-        segment_distance = calculate_distance(
-            current_stop["lat"], current_stop["lon"],
-            next_stop["lat"], next_stop["lon"]
-        )
-        segment_time = calculate_tram_time(segment_distance)
-        segment_cost = calculate_fare(segment_distance, "tram", passenger_type)
-
-        steps.append({
-            "mode": "Tram",
-            "from": {"lat": current_stop["lat"], "lng": current_stop["lon"]},
-            "to": {"lat": next_stop["lat"], "lng": next_stop["lon"]},
-            "distance": segment_distance,
-            "time": segment_time,
-            "cost": segment_cost,
-            "info": f"{segment_distance:.2f} km tramvay yolculuğu ({segment_time} dakika)"
-        })
-        total_distance += segment_distance
-        total_time += segment_time
-        total_cost += segment_cost
-        current_stop = next_stop
+def is_affordable(route, payment_info=None) -> bool:
+    """
+    Tüm stratejilerin bakiye kuralı: taksi kısmı nakit ve kredi kartıyla, toplu taşıma kısmı
+    KentKart ile ödenir. payment_info None ise sınır yoktur; verilirse eksik bakiyeler 0 sayılır.
+    """
+    if payment_info is None:
+        return True
+    available_balance = payment_info.get("cash", 0) + payment_info.get("creditCard", 0)
+    kentkart_balance = payment_info.get("kentkart", 0)
+    return step_cost(route, ("Taksi",)) <= available_balance and step_cost(route, ("Bus", "Tram")) <= kentkart_balance
 
-    # Son duraktan varış noktasına yürüyüş
-    walk_distance = end_stop["distance"]
-    walk_time = calculate_walking_time(walk_distance)
-    steps.append({
-        "mode": "Yürüme",
-        "from": {"lat": end_stop["lat"], "lng": end_stop["lon"]},
-        "to": {"lat": end["lat"], "lng": end["lng"]},
-        "distance": walk_distance,
-        "time": walk_time,
-        "cost": 0,
-        "info": f"{walk_distance:.2f} km yürüyüş ({walk_time} dakika)"
-    })
-    total_distance += walk_distance
-    total_time += walk_time
+def affordable_routes(routes, payment_info=None, max_routes=3):
+    """
+    Bakiye sınırı olmadan hesaplanmış rotalardan ödenebilenleri find_routes_by_type ile aynı
+    kurallarla (is_affordable) seçer.
+    """
+    if payment_info is None:
+        return {route_type: route_list[:max_routes] for route_type, route_list in routes.items()}
+    kentkart_balance = payment_info.get("kentkart", 0)
+    affordable = {}
+    for route_type, route_list in routes.items():
+        if route_type not in ("walking", "taxi_only") and kentkart_balance < MIN_TRANSIT_BALANCE:
+            affordable[route_type] = []
+            continue
+        affordable[route_type] = [route for route in route_list if is_affordable(route, payment_info)][:max_routes]
+    return affordable
 
-    return {
-        "steps": steps,
-        "total_distance": total_distance,
-        "total_time": total_time,
-        "total_cost": total_cost,
-        "stops": all_stops  # Tüm durakları içerir
-    }
+# Çok kaynaklı aramanın rota aşamaları: araca binilmedi, ilk araçta, aktarma yapıldı, ikinci araçta
+BOARDING, RIDING, TRANSFERRED, RIDING_SECOND = range(4)
 
-def create_mixed_route(start, end, start_stop, end_stop, stops, passenger_type):
-    """Otobüs ve tramvay karması rota oluşturur."""
-    steps = []
-    total_distance = 0
-    total_time = 0
-    total_cost = 0
+def access_value(mode, distance, taxi_info):
+    """Bir noktadan durağa yürüyerek ("walk") veya taksiyle ("taxi") erişimin (ücret, süre, mesafe) değeri."""
+    if mode == "taxi":
+        return (calculate_taxi_fare(distance, taxi_info), calculate_taxi_time(distance), distance)
+    return (0, calculate_walking_time(distance), distance)
 
-    # Başlangıç noktasından ilk durağa yürüyüş
-    walk_distance = start_stop["distance"]
-    walk_time = calculate_walking_time(walk_distance)
-    steps.append({
-        "mode": "Yürüme",
-        "from": {"lat": start["lat"], "lng": start["lng"]},
-        "to": {"lat": start_stop["lat"], "lng": start_stop["lon"]},
-        "distance": walk_distance,
-        "time": walk_time,
-        "cost": 0,
-        "info": f"{walk_distance:.2f} km yürüyüş ({walk_time} dakika)"
-    })
-    total_distance += walk_distance
-    total_time += walk_time
-
-    # İlk araç yolculuğu
-    first_vehicle_distance = calculate_distance(
-        start_stop["lat"], start_stop["lon"],
-        end_stop["lat"], end_stop["lon"]
-    )
-    first_vehicle_type = start_stop["type"]
-    first_vehicle_time = calculate_bus_time(first_vehicle_distance) if first_vehicle_type == "bus" else calculate_tram_time(first_vehicle_distance)
-    first_vehicle_cost = calculate_fare(first_vehicle_distance, first_vehicle_type, passenger_type)
-    
-    steps.append({
-        "mode": "Bus" if first_vehicle_type == "bus" else "Tram",
-        "from": {"lat": start_stop["lat"], "lng": start_stop["lon"]},
-        "to": {"lat": end_stop["lat"], "lng": end_stop["lon"]},
-        "distance": first_vehicle_distance,
-        "time": first_vehicle_time,
-        "cost": first_vehicle_cost,
-        "info": f"{first_vehicle_distance:.2f} km {first_vehicle_type} yolculuğu ({first_vehicle_time} dakika)"
-    })
-    total_distance += first_vehicle_distance
-    total_time += first_vehicle_time
-    total_cost += first_vehicle_cost
-
-    # Aktarma yürüyüşü ve ikinci araç
-    transfer_stops = find_transfer_stops(end_stop, stops, end)
-    if transfer_stops:
-        transfer_stop = transfer_stops[0]
-        
-        # Aktarma yürüyüşü
-        transfer_distance = calculate_distance(
-            end_stop["lat"], end_stop["lon"],
-            transfer_stop["lat"], transfer_stop["lon"]
-        )
-        transfer_time = calculate_walking_time(transfer_distance)
-        steps.append({
-            "mode": "Aktarma",
-            "from": {"lat": end_stop["lat"], "lng": end_stop["lon"]},
-            "to": {"lat": transfer_stop["lat"], "lng": transfer_stop["lon"]},
-            "distance": transfer_distance,
-            "time": transfer_time,
-            "cost": 0,
-            "info": f"{transfer_distance:.2f} km aktarma yürüyüşü ({transfer_time} dakika)"
-        })
-        total_distance += transfer_distance
-        total_time += transfer_time
+def vehicle_hop(distance, stop_type, passenger_type, is_transfer=False):
+    """İki durak arası araç yolculuğunun (ücret, süre) değeri."""
+    time = calculate_bus_time(distance) if stop_type == "bus" else calculate_tram_time(distance)
+    return calculate_fare(distance, stop_type, passenger_type, is_transfer), time
 
-        # İkinci araç yolculuğu
-        second_vehicle_distance = calculate_distance(
-            transfer_stop["lat"], transfer_stop["lon"],
-            end_stop["lat"], end_stop["lon"]
-        )
-        second_vehicle_type = transfer_stop["type"]
-        second_vehicle_time = calculate_bus_time(second_vehicle_distance) if second_vehicle_type == "bus" else calculate_tram_time(second_vehicle_distance)
-        second_vehicle_cost = calculate_fare(second_vehicle_distance, second_vehicle_type, passenger_type, is_transfer=True)
-        
-        steps.append({
-            "mode": "Bus" if second_vehicle_type == "bus" else "Tram",
-            "from": {"lat": transfer_stop["lat"], "lng": transfer_stop["lon"]},
-            "to": {"lat": end_stop["lat"], "lng": end_stop["lon"]},
-            "distance": second_vehicle_distance,
-            "time": second_vehicle_time,
-            "cost": second_vehicle_cost,
-            "info": f"{second_vehicle_distance:.2f} km {second_vehicle_type} yolculuğu ({second_vehicle_time} dakika)"
-        })
-        total_distance += second_vehicle_distance
-        total_time += second_vehicle_time
-        total_cost += second_vehicle_cost
+def edge_fare(network, u, e, passenger_type="Genel", after_transfer=False):
+    """
+    u düğümünden çıkan e kenarının ücreti; tüm stratejiler find_routes_by_type rotalarıyla aynı
+    kuralı kullanır: araç kenarı durakların kuş uçuşu uzaklığıyla calculate_fare (aktarmadan sonraki
+    ilk yolculukta aktarma indirimi), aktarma ve yürüme kenarları ücretsizdir.
+    """
+    if network.graph.edge_type[e] != EDGE_DIRECT:
+        return 0
+    return vehicle_hop(hop_lengths(network)[0][e], network.table.types[u], passenger_type, after_transfer)[0]
+
+def path_fares(network, hops, passenger_type="Genel"):
+    """(düğüm, kenar) sırasıyla verilen yolun kenar ücretleri (bkz. edge_fare)."""
+    fares = []
+    after_transfer = False
+    for u, e in hops:
+        fares.append(edge_fare(network, u, e, passenger_type, after_transfer))
+        after_transfer = network.graph.edge_type[e] != EDGE_DIRECT
+    return fares
+
+def route_category(access, egress, phase, stop_type):
+    """
+    Tamamlanan rotanın türü. Taksili rotalar (taxi_mixed) taksi ile tek bir toplu taşıma
+    yolculuğundan oluşur; iki ucu da taksi olan rotalar hiçbir türe girmez.
+    """
+    if access == "taxi" or egress == "taxi":
+        return "taxi_mixed" if access != egress and phase == RIDING else None
+    if phase == RIDING_SECOND:
+        return "mixed"
+    return f"{stop_type}_only"
+
+def search_categories(access, phase, stop_type):
+    """Durumdan devam eden rotaların girebileceği rota türleri."""
+    if access == "taxi":
+        return ("taxi_mixed",)
+    if phase in (TRANSFERRED, RIDING_SECOND):
+        return ("mixed",)
+    return (f"{stop_type}_only", "mixed", "taxi_mixed")
+
+def hop_lengths(network):
+    """
+    Ağ görüntüsü başına bir kez hesaplanan kenar başına kuş uçuşu uzunluklar (km; rota adımlarıyla
+    aynı hesap), en uzun araç kenarı ve en uzun aktarma/yürüme kenarı.
+    """
+    if network.hop_lengths is None:
+        graph = network.graph
+        lats, lons = network.table.lat, network.table.lon
+        lengths = array("d", bytes(8 * graph.edge_count))
+        longest = [0.0, 0.0]
+        for u in range(graph.node_count):
+            for e in range(graph.offsets[u], graph.offsets[u + 1]):
+                v = graph.targets[e]
+                lengths[e] = calculate_distance(lats[u], lons[u], lats[v], lons[v])
+                kind = 0 if graph.edge_type[e] == EDGE_DIRECT else 1
+                longest[kind] = max(longest[kind], lengths[e])
+        network.hop_lengths = (lengths, longest[0], longest[1])
+    return network.hop_lengths
+
+def access_search(network, end, sources, targets, passenger_type="Genel",
+                  categories=("bus_only", "tram_only", "mixed", "taxi_mixed"), limit=3):
+    """
+    Tüm erişim duraklarından başlayıp tüm ayrılış duraklarında sonlanan tek bir çok kaynaklı arama.
+    sources: (düğüm, erişim şekli) -> erişim değeri, targets: düğüm -> [(ayrılış şekli, ayrılış değeri)];
+    değerler access_value ile hesaplanır, end ayrılış duraklarından yüründüğü/gidildiği noktadır.
+    Etiketler rotaların sıralandığı gibi (ücret, süre, mesafe) sırasıyla karşılaştırılır. Durum
+    (erişim şekli, aşama, düğüm) olduğundan tüm rota türleri aynı aramada bulunur; bir durumdan
+    girilebilecek türlerin en iyi limit rotası bulunduysa durum genişletilmez; limit None ise tüm
+    adaylar döner ve arama erişilebilen tüm durumları dolaşır.
+    Sonuç: rota türü -> en iyi limit aday (create_search_route ile rotaya çevrilir).
+    """
+    graph = network.graph
+    lats, lons, types = network.table.lat, network.table.lon, network.table.types
+    offsets = graph.offsets
+    edge_targets = graph.targets
+    edge_types = graph.edge_type
+    times = graph.time
+    infinity = float('infinity')
+
+    # Kalan ücretin alt sınırı (A*): her araç yolculuğu en az 7 TL'dir ve en uzun araç kenarından
+    # uzun değildir; hedefe kalan kuş uçuşu mesafeden ayrılış yarıçapı ve (aktarma hakkı varsa)
+    # en uzun aktarma kenarı düşülür. Sınır tutarlı olduğundan sonuçlar değişmez.
+    lengths, longest_hop, longest_transfer = hop_lengths(network)
+    # Kayan nokta yuvarlamasına karşı sınır çok az küçültülür
+    fare_per_km = 7.0 / longest_hop * (1 - 1e-9) if longest_hop > 0 else 0.0
+    egress_bounds = {}
+    for options in targets.values():
+        for egress, value in options:
+            radius, fare = egress_bounds.get(egress, (0.0, infinity))
+            egress_bounds[egress] = (max(radius, value[2]), min(fare, value[0]))
+    remaining = {}
+    end_lat, end_lon = math.radians(end["lat"]), math.radians(end["lng"])
+    end_cos = math.cos(end_lat)
+
+    def fare_bound(access, phase, node):
+        if node not in remaining:
+            # calculate_distance ile aynı formül; varış noktası bir kez radyana çevrilir
+            lat, lon = math.radians(lats[node]), math.radians(lons[node])
+            remaining[node] = 2 * 6371 * math.asin(math.sqrt(
+                math.sin((end_lat - lat) / 2) ** 2 + math.cos(lat) * end_cos * math.sin((end_lon - lon) / 2) ** 2))
+        distance = remaining[node] - (longest_transfer if access == "walk" and phase in (BOARDING, RIDING) else 0)
+        bound = infinity
+        for egress, (radius, fare) in egress_bounds.items():
+            # Taksili rotalarda aktarma yapılmaz, iki ucu taksi olan rota aranmaz
+            if egress == "walk" or (access == "walk" and phase in (BOARDING, RIDING)):
+                bound = min(bound, fare_per_km * max(0.0, distance - radius) + fare)
+        return bound
+
+    # Erişim ve ayrılış duraklarının tiplerinden oluşamayacak türler (ör. yakında tramvay durağı yoksa
+    # tram_only) için arama sürdürülmez; aksi halde bu türler dolmadığından arama tüm ağı dolaşır
+    access_types = {(access, types[node]) for node, access in sources}
+    egress_types = {(egress, types[node]) for node, options in targets.items() for egress, _ in options}
+    possible = set()
+    for access, first_type in access_types:
+        for egress, last_type in egress_types:
+            if access == "walk" and egress == "walk":
+                possible.add(f"{first_type}_only" if first_type == last_type else "mixed")
+            elif access != egress and first_type == last_type:
+                possible.add("taxi_mixed")
+    categories = [category for category in categories if category in possible]
+    found = {category: [] for category in categories}
+
+    def cost_bound(category):
+        # Türün en iyi limit rotası bulunduysa daha pahalı rotalar listeye giremez
+        if category not in found:
+            return -infinity
+        results = found[category]
+        return results[-1][0][0] if limit is not None and len(results) >= limit else infinity
+
+    best = {}
+    parent = {}
+    settled = set()
+    pq = []
+    for (node, access), value in sources.items():
+        key = (access, BOARDING, node)
+        if value < best.get(key, (infinity,)):
+            best[key] = value
+            parent[key] = None
+            heapq.heappush(pq, (value[0] + fare_bound(*key), value[1], value[2], key))
+
+    # Kenar başına (aktarma indirimli/indirimsiz) araç değerleri bir kez hesaplanır
+    hop_values = {}
 
-    # Son duraktan varış noktasına yürüyüş
-    walk_distance = end_stop["distance"]
-    walk_time = calculate_walking_time(walk_distance)
-    steps.append({
-        "mode": "Yürüme",
-        "from": {"lat": end_stop["lat"], "lng": end_stop["lon"]},
-        "to": {"lat": end["lat"], "lng": end["lng"]},
-        "distance": walk_distance,
-        "time": walk_time,
-        "cost": 0,
-        "info": f"{walk_distance:.2f} km yürüyüş ({walk_time} dakika)"
-    })
-    total_distance += walk_distance
-    total_time += walk_time
+    while pq:
+        estimate, _, _, key = heapq.heappop(pq)
+        if key in settled:
+            continue
+        settled.add(key)
+        access, phase, u = key
+        if all(estimate > cost_bound(category) for category in search_categories(access, phase, types[u])):
+            continue
+        label = best[key]
+
+        if phase in (RIDING, RIDING_SECOND):
+            for egress, value in targets.get(u, ()):
+                category = route_category(access, egress, phase, types[u])
+                if category not in found:
+                    continue
+                total = (label[0] + value[0], label[1] + value[1], label[2] + value[2])
+                bisect.insort(found[category], (total, key, egress, value[2]))
+                if limit is not None:
+                    del found[category][limit:]
+
+        can_transfer = phase == RIDING and access == "walk"
+        for e in range(offsets[u], offsets[u + 1]):
+            if edge_types[e] != EDGE_DIRECT and not can_transfer:
+                # Düğümün kenarları direkt bağlantılarla başlar; kalanlar aktarma ve yürüme kenarlarıdır
+                break
+            v = edge_targets[e]
+            # Kapatılmış durakların kenar süreleri sonsuzdur (bkz. network_updates.py)
+            if times[e] == infinity:
+                continue
+            if edge_types[e] == EDGE_DIRECT:
+                # Aynı araçla devam; aktarmadan sonraki ilk yolculukta aktarma indirimi uygulanır
+                if types[v] != types[u]:
+                    continue
+                next_phase = RIDING if phase in (BOARDING, RIDING) else RIDING_SECOND
+            elif types[v] != types[u]:
+                # Aktarma veya yürüme kenarıyla diğer ulaşım tipine geçiş
+                next_phase = TRANSFERRED
+            else:
+                continue
+            next_key = (access, next_phase, v)
+            if next_key in settled:
+                continue
+
+            distance = lengths[e]
+            if next_phase == TRANSFERRED:
+                fare, time = 0, calculate_walking_time(distance)
+            else:
+                values = hop_values.get((e, phase == TRANSFERRED))
+                if values is None:
+                    values = hop_values[(e, phase == TRANSFERRED)] = vehicle_hop(
+                        distance, types[u], passenger_type, phase == TRANSFERRED)
+                fare, time = values
+
+            next_label = (label[0] + fare, label[1] + time, label[2] + distance)
+            if next_label < best.get(next_key, (infinity,)):
+                best[next_key] = next_label
+                parent[next_key] = key
+                heapq.heappush(pq, (next_label[0] + fare_bound(*next_key), next_label[1], next_label[2], next_key))
+
+    results = {}
+    for category, candidates in found.items():
+        results[category] = []
+        for total, key, egress, egress_distance in candidates:
+            path = []
+            while key is not None:
+                path.append(key)
+                key = parent[key]
+            path.reverse()
+            results[category].append({
+                "access": path[0][0],
+                "access_distance": sources[(path[0][2], path[0][0])][2],
+                "egress": egress,
+                "egress_distance": egress_distance,
+                "path": [(node, phase) for _, phase, node in path]
+            })
+    return results
 
+def route_step(mode, from_point, to_point, distance, time, cost, info):
     return {
-        "steps": steps,
-        "total_distance": total_distance,
-        "total_time": total_time,
-        "total_cost": total_cost,
-        "stops": [start_stop, end_stop]
+        "mode": mode,
+        "from": from_point,
+        "to": to_point,
+        "distance": distance,
+        "time": time,
+        "cost": cost,
+        "info": info
     }
 
-def create_taxi_mixed_routes(start, end, stops, taxi_info, passenger_type):
-    """Taksi ve toplu taşıma karması rotalar oluşturur."""
-    routes = []
-    direct_distance = calculate_distance(start["lat"], start["lng"], end["lat"], end["lng"])
-
-    # Tüm durakları mesafeye göre sırala
-    all_stops = []
-    for stop in stops:
-        distance_to_start = calculate_distance(start["lat"], start["lng"], stop["lat"], stop["lon"])
-        distance_to_end = calculate_distance(stop["lat"], stop["lon"], end["lat"], end["lng"])
-        
-        # Sadece toplam mesafenin %40'ından daha yakın durakları değerlendir
-        if distance_to_start <= direct_distance * 0.4 or distance_to_end <= direct_distance * 0.4:
-            all_stops.append({
-                **stop,
-                "distance_to_start": distance_to_start,
-                "distance_to_end": distance_to_end
-            })
-
-    # Başlangıç noktasına yakın duraklar için
-    start_stops = sorted(all_stops, key=lambda x: x["distance_to_start"])[:5]
-    for stop in start_stops:
-        # Taksi ile başlangıç
-        route = create_taxi_to_transit_route(start, end, stop, stops, taxi_info, passenger_type, "start")
-        if route:
-            routes.append(route)
-
-    # Bitiş noktasına yakın duraklar için
-    end_stops = sorted(all_stops, key=lambda x: x["distance_to_end"])[:5]
-    for stop in end_stops:
-        # Taksi ile bitiş
-        route = create_taxi_to_transit_route(start, end, stop, stops, taxi_info, passenger_type, "end")
-        if route:
-            routes.append(route)
-
-    return routes
-
-def create_taxi_to_transit_route(start, end, transit_stop, stops, taxi_info, passenger_type, taxi_position):
-    """Taksi ve toplu taşıma kombinasyonu rota oluşturur."""
-    steps = []
-    total_distance = 0
-    total_time = 0
-    total_cost = 0
-    route_stops = []
-
-    if taxi_position == "start":
-        # Taksi ile başlangıç
-        taxi_distance = calculate_distance(start["lat"], start["lng"], transit_stop["lat"], transit_stop["lon"])
-        taxi_time = calculate_taxi_time(taxi_distance)
-        taxi_cost = calculate_taxi_fare(taxi_distance, taxi_info)
-        
-        steps.append({
-            "mode": "Taksi",
-            "from": {"lat": start["lat"], "lng": start["lng"]},
-            "to": {"lat": transit_stop["lat"], "lng": transit_stop["lon"]},
-            "distance": taxi_distance,
-            "time": taxi_time,
-            "cost": taxi_cost,
-            "info": f"{taxi_distance:.2f} km taksi yolculuğu ({taxi_time} dakika)"
-        })
-        total_distance += taxi_distance
-        total_time += taxi_time
-        total_cost += taxi_cost
-        route_stops.append(transit_stop)
-
-        # Toplu taşıma ile devam
-        transit_distance = calculate_distance(
-            transit_stop["lat"], transit_stop["lon"],
-            end["lat"], end["lng"]
-        )
-        transit_time = calculate_bus_time(transit_distance) if transit_stop["type"] == "bus" else calculate_tram_time(transit_distance)
-        transit_cost = calculate_fare(transit_distance, transit_stop["type"], passenger_type)
-        
-        steps.append({
-            "mode": "Bus" if transit_stop["type"] == "bus" else "Tram",
-            "from": {"lat": transit_stop["lat"], "lng": transit_stop["lon"]},
-            "to": {"lat": end["lat"], "lng": end["lng"]},
-            "distance": transit_distance,
-            "time": transit_time,
-            "cost": transit_cost,
-            "info": f"{transit_distance:.2f} km {transit_stop['type']} yolculuğu ({transit_time} dakika)"
-        })
-        total_distance += transit_distance
-        total_time += transit_time
-        total_cost += transit_cost
-
-    else:
-        # Toplu taşıma ile başlangıç
-        transit_distance = calculate_distance(
-            start["lat"], start["lng"],
-            transit_stop["lat"], transit_stop["lon"]
-        )
-        transit_time = calculate_bus_time(transit_distance) if transit_stop["type"] == "bus" else calculate_tram_time(transit_distance)
-        transit_cost = calculate_fare(transit_distance, transit_stop["type"], passenger_type)
-        
-        steps.append({
-            "mode": "Bus" if transit_stop["type"] == "bus" else "Tram",
-            "from": {"lat": start["lat"], "lng": start["lng"]},
-            "to": {"lat": transit_stop["lat"], "lng": transit_stop["lon"]},
-            "distance": transit_distance,
-            "time": transit_time,
-            "cost": transit_cost,
-            "info": f"{transit_distance:.2f} km {transit_stop['type']} yolculuğu ({transit_time} dakika)"
-        })
-        total_distance += transit_distance
-        total_time += transit_time
-        total_cost += transit_cost
-        route_stops.append(transit_stop)
-
-        # Taksi ile bitiş
-        taxi_distance = calculate_distance(transit_stop["lat"], transit_stop["lon"], end["lat"], end["lng"])
-        taxi_time = calculate_taxi_time(taxi_distance)
-        taxi_cost = calculate_taxi_fare(taxi_distance, taxi_info)
-        
-        steps.append({
-            "mode": "Taksi",
-            "from": {"lat": transit_stop["lat"], "lng": transit_stop["lon"]},
-            "to": {"lat": end["lat"], "lng": end["lng"]},
-            "distance": taxi_distance,
-            "time": taxi_time,
-            "cost": taxi_cost,
-            "info": f"{taxi_distance:.2f} km taksi yolculuğu ({taxi_time} dakika)"
-        })
-        total_distance += taxi_distance
-        total_time += taxi_time
-        total_cost += taxi_cost
+def access_step(mode, from_point, to_point, distance, taxi_info):
+    """Yürüme veya taksi ile erişim/ayrılış adımı."""
+    cost, time, _ = access_value(mode, distance, taxi_info)
+    if mode == "taxi":
+        return route_step("Taksi", from_point, to_point, distance, time, cost,
+                          f"{distance:.2f} km taksi yolculuğu ({time} dakika)")
+    return route_step("Yürüme", from_point, to_point, distance, time, cost,
+                      f"{distance:.2f} km yürüyüş ({time} dakika)")
+
+def create_search_route(start, end, result, network, taxi_info, passenger_type):
+    """access_search sonucundaki durak yolundan adımları ve toplamları oluşturur."""
+    graph = network.graph
+    path = result["path"]
+    stops = [network.stops_by_id[graph.stop_ids[node]] for node, _ in path]
+    points = [{"lat": stop["lat"], "lng": stop["lon"]} for stop in stops]
+
+    steps = [access_step(result["access"], {"lat": start["lat"], "lng": start["lng"]}, points[0],
+                         result["access_distance"], taxi_info)]
+    for i in range(1, len(path)):
+        from_stop, to_stop = stops[i - 1], stops[i]
+        distance = calculate_distance(from_stop["lat"], from_stop["lon"], to_stop["lat"], to_stop["lon"])
+        if path[i][1] == TRANSFERRED:
+            time = calculate_walking_time(distance)
+            steps.append(route_step("Aktarma", points[i - 1], points[i], distance, time, 0,
+                                    f"{distance:.2f} km aktarma yürüyüşü ({time} dakika)"))
+            continue
+        fare, time = vehicle_hop(distance, from_stop["type"], passenger_type, path[i - 1][1] == TRANSFERRED)
+        vehicle = "otobüs" if from_stop["type"] == "bus" else "tramvay"
+        steps.append(route_step("Bus" if from_stop["type"] == "bus" else "Tram", points[i - 1], points[i],
+                                distance, time, fare, f"{distance:.2f} km {vehicle} yolculuğu ({time} dakika)"))
+    steps.append(access_step(result["egress"], points[-1], {"lat": end["lat"], "lng": end["lng"]},
+                             result["egress_distance"], taxi_info))
 
     return {
         "steps": steps,
-        "total_distance": total_distance,
-        "total_time": total_time,
-        "total_cost": total_cost,
-        "stops": route_stops
+        "total_distance": sum(step["distance"] for step in steps),
+        "total_time": sum(step["time"] for step in steps),
+        "total_cost": sum(step["cost"] for step in steps),
+        "stops": stops
     }
 
-def find_transfer_stops(current_stop, all_stops, destination):
-    """En uygun aktarma duraklarını bulur."""
-    other_type = "tram" if current_stop["type"] == "bus" else "bus"
-    transfer_stops = []
-    
-    for stop in all_stops:
-        if stop["type"] == other_type:
-            distance = calculate_distance(
-                current_stop["lat"], current_stop["lon"],
-                stop["lat"], stop["lon"]
-            )
-            # 1 km'den yakın durakları aktarma için değerlendir
-            if distance <= 1.0:
-                # Hedef yönünde olan durakları tercih et
-                direction_score = calculate_direction_score(current_stop, stop, destination)
-                transfer_stops.append({
-                    **stop,
-                    "transfer_distance": distance,
-                    "direction_score": direction_score
-                })
-    
-    # Yön skoru ve mesafeye göre sırala
-    transfer_stops.sort(key=lambda x: (x["direction_score"], x["transfer_distance"]))
-    return transfer_stops[:3]  # En iyi 3 aktarma noktasını döndür
-
-def calculate_direction_score(current_stop, transfer_stop, destination):
-    """Aktarma durağının hedef yönünde olup olmadığını değerlendirir."""
-    current_to_dest = calculate_distance(
-        current_stop["lat"], current_stop["lon"],
-        destination["lat"], destination["lng"]
-    )
-    transfer_to_dest = calculate_distance(
-        transfer_stop["lat"], transfer_stop["lon"],
-        destination["lat"], destination["lng"]
-    )
-    return transfer_to_dest / current_to_dest  # 1'den küçük değerler daha iyi
-
 def calculate_walking_time(distance):
     """Yürüme süresini hesaplar (ortalama 5 km/saat hız)."""
     return int(distance * 12)  # 12 dakika/km
@@ -913,7 +700,7 @@ def calculate_taxi_fare(distance, taxi_info):
     """Taksi ücretini hesaplar."""
     return taxi_info["openingFee"] + (distance * taxi_info["costPerKm"])
 
-def plan_route(start_coord, end_coord, stops, taxi_info, passenger_type="Genel", payment_info=None, taxi_threshold=3.0):
+def plan_route(start_coord, end_coord, stops, taxi_info, passenger_type="Genel", payment_info=None, taxi_threshold=3.0, network=None):
     """Ana rota planlama fonksiyonu"""
     # Direkt mesafeyi hesapla
     direct_distance = haversine(start_coord["lat"], start_coord["lng"],
@@ -928,12 +715,12 @@ def plan_route(start_coord, end_coord, stops, taxi_info, passenger_type="Genel",
             "cost": 0,
             "time": int(direct_distance * 15),
             "info": f"Yürüme (mesafe: {direct_distance:.2f} km)"
-        }], [[start_coord["lat"], start_coord["lng"]], 
-             [end_coord["lat"], end_coord["lng"]]], []
+        }], encode_points([(start_coord["lat"], start_coord["lng"]),
+                           (end_coord["lat"], end_coord["lng"])]), []
     
     # Tüm rota alternatiflerini hesapla
     routes = find_routes_by_type(start_coord, end_coord, stops, taxi_info,
-                               passenger_type, payment_info, taxi_threshold)
+                               passenger_type, payment_info, taxi_threshold, network)
     
     # En uygun rotayı seç
     best_route = None
@@ -973,7 +760,9 @@ def plan_route(start_coord, end_coord, stops, taxi_info, passenger_type="Genel",
                     best_route = route
     
     if best_route:
-        return best_route["steps"], best_route["polyline"], best_route["stops"]
+        # Geometri, bağlantıların önceden sadeleştirilmiş şekillerinden oluşturulur (bkz. edge_geometry.py)
+        polyline, _ = route_geometry(best_route, network)
+        return best_route["steps"], polyline, best_route["stops"]
 
 def calculate_vehicle_time(distance, vehicle_type):
     """Araç süresini hesaplar."""
@@ -984,6 +773,18 @@ def calculate_vehicle_time(distance, vehicle_type):
     else:  # taxi
         return int(distance * 1.2)  # 50 km/saat
 
+# Yolcu tipine göre indirim oranları
+PASSENGER_DISCOUNTS = {
+    "Genel": 1.0,
+    "Öğrenci": 0.5,
+    "Öğretmen": 0.5,
+    "Yaşlı": 0.5
+}
+
+def fare_discount(passenger_type):
+    """Yolcu tipinin toplu taşıma ücretlerine uygulanan indirim oranı."""
+    return PASSENGER_DISCOUNTS.get(passenger_type, 1.0)
+
 def calculate_fare(distance, vehicle_type, passenger_type, is_transfer=False):
     """Toplu taşıma ücretini hesaplar."""
     # Temel ücretler (TL)
@@ -993,14 +794,6 @@ def calculate_fare(distance, vehicle_type, passenger_type, is_transfer=False):
         "taxi": 15.0  # Açılış ücreti
     }
     
-    # Yolcu tipine göre indirim oranları
-    discounts = {
-        "Genel": 1.0,
-        "Öğrenci": 0.5,
-        "Öğretmen": 0.5,
-        "Yaşlı": 0.5
-    }
-    
     # Araç tipine göre km başına ücret
     per_km_fares = {
         "bus": 2.0,
@@ -1012,7 +805,7 @@ def calculate_fare(distance, vehicle_type, passenger_type, is_transfer=False):
     base_fare = base_fares.get(vehicle_type, 7.0)
     
     # İndirim oranını al
-    discount = discounts.get(passenger_type, 1.0)
+    discount = fare_discount(passenger_type)
     
     # Km başına ücreti al
     per_km = per_km_fares.get(vehicle_type, 2.0)
@@ -1036,4 +829,128 @@ def calculate_fare(distance, vehicle_type, passenger_type, is_transfer=False):
     else:  # taxi
         total_fare = max(total_fare, 15.0)  # Minimum 15 TL
     
-    return round(total_fare, 2)
\ No newline at end of file
+    return round(total_fare, 2)
+
+def find_earliest_arrival_route(start_coord, end_coord, network, departure_time: str,
+                                max_walk: float = 1.0, max_rounds: int = 4,
+                                passenger_type: str = "Genel") -> Optional[Dict[str, Any]]:
+    """
+    Verilen kalkış saatinde ("SS:DD") yola çıkan yolcu için sefer planlarına göre
+    en erken varış rotasını, bekleme süreleri dahil hesaplar. Ücretler diğer stratejilerle
+    aynı şekilde edge_fare ile hesaplanır.
+    """
+    engine = network.raptor
+    if engine is None:
+        return None
+
+    graph = network.graph
+    index = network.index_of_type("all")
+    start_minute = parse_time(departure_time)
+
+    def access_stops(coord):
+        nearby = index.within(coord["lat"], coord["lng"], max_walk)
+        return nearby or index.nearest(coord["lat"], coord["lng"], 1)
+
+    walk_to = {graph.index_of(index.stops[i]["id"]): dist for i, dist in access_stops(start_coord)}
+    walk_from = {graph.index_of(index.stops[i]["id"]): dist for i, dist in access_stops(end_coord)}
+    sources = {node: start_minute + calculate_walking_time(dist) for node, dist in walk_to.items()}
+    targets = {node: calculate_walking_time(dist) for node, dist in walk_from.items()}
+
+    journey = engine.earliest_arrival(sources, targets, max_rounds)
+    if journey is None or not journey["legs"]:
+        return None
+
+    def stop_of(node):
+        return network.stops_by_id[graph.stop_ids[node]]
+
+    def point(stop):
+        return {"lat": stop["lat"], "lng": stop["lon"]}
+
+    legs = journey["legs"]
+    first_node = legs[0]["route"].stops[legs[0]["board"]] if legs[0]["kind"] == "ride" else legs[0]["from"]
+    first_stop = stop_of(first_node)
+    last_stop = stop_of(journey["target"])
+    steps = []
+    stops = [first_stop]
+
+    walk_distance = walk_to[first_node]
+    walk_time = calculate_walking_time(walk_distance)
+    steps.append({
+        "mode": "Yürüme",
+        "from": {"lat": start_coord["lat"], "lng": start_coord["lng"]},
+        "to": point(first_stop),
+        "distance": walk_distance,
+        "time": walk_time,
+        "cost": 0,
+        "info": f"{walk_distance:.2f} km yürüyüş ({walk_time} dakika)"
+    })
+
+    # Hatların sırasıyla (düğüm, kenar) çiftleri; ücretler path_fares ile tek seferde hesaplanır
+    hops = []
+    for leg in legs:
+        if leg["kind"] == "transfer":
+            hops.append((leg["from"], leg["edge"]))
+        else:
+            route = leg["route"]
+            hops.extend(zip(route.stops[leg["board"]:leg["alight"]], route.edges[leg["board"]:leg["alight"]]))
+    fares = iter(path_fares(network, hops, passenger_type))
+
+    for leg in legs:
+        if leg["kind"] == "transfer":
+            from_stop, to_stop = stop_of(leg["from"]), stop_of(leg["to"])
+            time = leg["arrival"] - leg["departure"]
+            steps.append({
+                "mode": "Aktarma",
+                "from": point(from_stop),
+                "to": point(to_stop),
+                "distance": graph.distance[leg["edge"]],
+                "time": time,
+                "cost": next(fares),
+                "info": f"{from_stop['name']} → {to_stop['name']} aktarma ({time:g} dakika)"
+            })
+            stops.append(to_stop)
+            continue
+
+        route = leg["route"]
+        edges = route.edges[leg["board"]:leg["alight"]]
+        from_stop = stop_of(route.stops[leg["board"]])
+        to_stop = stop_of(route.stops[leg["alight"]])
+        wait = leg["departure"] - leg["ready"]
+        distance = sum(graph.distance[e] for e in edges)
+        mode = "Bus" if route.line.type == "bus" else "Tram"
+        steps.append({
+            "mode": mode,
+            "from": point(from_stop),
+            "to": point(to_stop),
+            "distance": distance,
+            "time": leg["arrival"] - leg["ready"],
+            "wait": wait,
+            "departure": format_time(leg["departure"]),
+            "arrival": format_time(leg["arrival"]),
+            "cost": sum(next(fares) for _ in edges),
+            "info": f"{route.line.name}: {format_time(leg['departure'])} kalkış, "
+                    f"{format_time(leg['arrival'])} varış ({wait:g} dakika bekleme)"
+        })
+        stops.extend(stop_of(node) for node in route.stops[leg["board"] + 1:leg["alight"] + 1])
+
+    walk_distance = walk_from[journey["target"]]
+    walk_time = calculate_walking_time(walk_distance)
+    steps.append({
+        "mode": "Yürüme",
+        "from": point(last_stop),
+        "to": {"lat": end_coord["lat"], "lng": end_coord["lng"]},
+        "distance": walk_distance,
+        "time": walk_time,
+        "cost": 0,
+        "info": f"{walk_distance:.2f} km yürüyüş ({walk_time} dakika)"
+    })
+
+    return {
+        "steps": steps,
+        "total_distance": sum(step["distance"] for step in steps),
+        "total_time": journey["arrival"] - start_minute,
+        "total_cost": sum(step["cost"] for step in steps),
+        "departure": format_time(start_minute),
+        "arrival": format_time(journey["arrival"]),
+        "stops": stops
+    }
\ No newline at end of file
@@ -0,0 +1,145 @@
+import os
+from array import array
+from typing import Dict, Any
+from binary_store import ArrayFile, write_arrays
+from compiled_graph import CompiledGraph
+from contraction import CH_ARRAYS, ContractionHierarchy
+from edge_geometry import EdgeGeometry
+from spatial_index import CellMap, SpatialIndex
+from transport_data import (Line, StopTable, StringColumn, CodedColumn, SortedIndex, StopList)
+
+SNAPSHOT_FORMAT = 3
+
+# StopTable'ın doğrudan dizi olarak yazılan sütunları ve tür kodları
+NUMERIC_COLUMNS = {
+    "lat": "d", "lon": "d", "terminal": "B", "next_offsets": "i", "next_distance": "d",
+    "next_time": "d", "next_cost": "d", "transfer_time": "d", "transfer_cost": "d"
+}
+STRING_COLUMNS = ["ids", "names", "next_ids", "next_shapes", "transfer_ids"]
+# Boş (None) değer alabilen metin sütunları
+OPTIONAL_COLUMNS = ("next_shapes", "transfer_ids")
+GRAPH_ARRAYS = ["offsets", "targets", "distance", "time", "cost", "mode", "edge_type", "weight"]
+
+def snapshot_path(data_path: str, version: str) -> str:
+    """Görüntü dosyası veri dosyasının yanında, sürüm adıyla tutulur."""
+    return f"{os.path.splitext(data_path)[0]}.{version}.snapshot.bin"
+
+def write_snapshot(path: str, network) -> None:
+    """
+    Ağ görüntüsünü (durak tablosu, graf, tip listeleri, konum indeksleri, bağlantı şekilleri,
+    varsa kısayol hiyerarşisi)
+    tek bir mmap ile açılabilen ikili dosyaya yazar.
+    """
+    table = network.table
+    arrays: Dict[str, array] = {}
+    for column, typecode in NUMERIC_COLUMNS.items():
+        arrays[f"stops.{column}"] = array(typecode, getattr(table, column))
+    for column in STRING_COLUMNS:
+        blob, offsets, present = StringColumn.encode(list(getattr(table, column)))
+        arrays[f"stops.{column}.blob"] = blob
+        arrays[f"stops.{column}.offsets"] = offsets
+        arrays[f"stops.{column}.present"] = present
+    type_names = sorted(set(table.types))
+    arrays["stops.types"] = array("b", (type_names.index(stop_type) for stop_type in table.types))
+    arrays["stops.order"] = SortedIndex.order_of(list(table.ids))
+
+    graph = network.graph
+    for name in GRAPH_ARRAYS:
+        values = getattr(graph, name)
+        arrays[f"graph.{name}"] = array(values.typecode if isinstance(values, array) else values.format, values)
+
+    spatial = {}
+    for stop_type, index in network.spatial_index.items():
+        stops = network.stops_by_type[stop_type]
+        if stop_type != "all":
+            arrays[f"types.{stop_type}.positions"] = array("i", stops.positions)
+        cells = index.cells if isinstance(index.cells, CellMap) else CellMap.from_cells(index.cells)
+        arrays[f"spatial.{stop_type}.lat"] = array("d", index.lats)
+        arrays[f"spatial.{stop_type}.lon"] = array("d", index.lons)
+        arrays[f"spatial.{stop_type}.keys"] = array("q", cells.keys)
+        arrays[f"spatial.{stop_type}.offsets"] = array("i", cells.offsets)
+        arrays[f"spatial.{stop_type}.members"] = array("i", cells.members)
+        spatial[stop_type] = {"cellSize": index.cell_size, "xScale": index._x_scale, "bounds": index.bounds}
+
+    # Düzeylere göre sadeleştirilmiş bağlantı şekilleri (bkz. edge_geometry.py)
+    for zoom, chunks in network.geometry.levels.items():
+        blob, offsets, present = StringColumn.encode(list(chunks))
+        arrays[f"geometry.{zoom}.blob"] = blob
+        arrays[f"geometry.{zoom}.offsets"] = offsets
+        arrays[f"geometry.{zoom}.present"] = present
+
+    # İsteğe bağlı kısayol hiyerarşisi görüntüyle birlikte saklanır
+    if network.contraction is not None:
+        for name, values in network.contraction.arrays().items():
+            arrays[f"ch.{name}"] = array(CH_ARRAYS[name], values)
+
+    meta = {
+        "format": SNAPSHOT_FORMAT,
+        "version": network.version,
+        "city": network.city,
+        "taxi": network.taxi,
+        "typeNames": type_names,
+        "modes": list(graph.modes),
+        "walkRadius": network.walk_radius,
+        "geometryZooms": list(network.geometry.levels),
+        "spatial": spatial,
+        "lines": [{field: getattr(line, field) for field in Line.__slots__} for line in network.lines]
+    }
+    write_arrays(path, arrays, meta)
+
+def read_snapshot(store: ArrayFile) -> Dict[str, Any]:
+    """
+    Açılmış görüntü dosyasından NetworkSnapshot bileşenlerini oluşturur.
+    Tüm sütunlar mmap görünümleridir; ağ boyutuyla orantılı kopyalama veya ayrıştırma yapılmaz.
+    """
+    meta = store.meta
+
+    def strings(column: str) -> StringColumn:
+        present = store[f"stops.{column}.present"] if column in OPTIONAL_COLUMNS else None
+        return StringColumn(store[f"stops.{column}.blob"], store[f"stops.{column}.offsets"], present)
+
+    columns = {column: store[f"stops.{column}"] for column in NUMERIC_COLUMNS}
+    columns.update({column: strings(column) for column in STRING_COLUMNS})
+    columns["types"] = CodedColumn(store["stops.types"], meta["typeNames"])
+    columns["index"] = SortedIndex(columns["ids"], store["stops.order"])
+    table = StopTable.from_columns(columns)
+
+    graph = CompiledGraph(table.ids, *(store[f"graph.{name}"] for name in GRAPH_ARRAYS[:-1]),
+                          meta["modes"], index=table.index, weight=store["graph.weight"])
+
+    stops_by_type = {"all": StopList(table)}
+    spatial_index = {}
+    for stop_type, spec in meta["spatial"].items():
+        if stop_type != "all":
+            stops_by_type[stop_type] = StopList(table, store[f"types.{stop_type}.positions"])
+        cells = CellMap(store[f"spatial.{stop_type}.keys"], store[f"spatial.{stop_type}.offsets"],
+                        store[f"spatial.{stop_type}.members"])
+        spatial_index[stop_type] = SpatialIndex.from_arrays(
+            stops_by_type[stop_type], store[f"spatial.{stop_type}.lat"], store[f"spatial.{stop_type}.lon"],
+            cells, spec["cellSize"], spec["xScale"], spec["bounds"]
+        )
+
+    contraction = None
+    if "ch.rank" in store:
+        contraction = ContractionHierarchy.from_arrays(graph, {name: store[f"ch.{name}"] for name in CH_ARRAYS})
+
+    geometry = EdgeGeometry({
+        zoom: StringColumn(store[f"geometry.{zoom}.blob"], store[f"geometry.{zoom}.offsets"],
+                           store[f"geometry.{zoom}.present"])
+        for zoom in meta["geometryZooms"]
+    })
+
+    return {
+        "version": meta["version"],
+        "city": meta["city"],
+        "taxi": meta["taxi"],
+        "stops": table,
+        "lines": [Line(**line) for line in meta["lines"]],
+        "graph": graph,
+        "stops_by_type": stops_by_type,
+        "spatial_index": spatial_index,
+        "contraction": contraction,
+        "geometry": geometry,
+        # Yarıçap alanı olmayan eski dosyalarda yürüme kenarı yoktur
+        "walk_radius": meta.get("walkRadius", 0.0)
+    }
@@ -0,0 +1,238 @@
+import copy
+import heapq
+import math
+from array import array
+from bisect import bisect_left
+from typing import List, Dict, Any, Tuple
+from distance_calculator import HaversineCalculator, as_coordinate_array
+
+# Bir enlem derecesinin yaklaşık uzunluğu (km)
+KM_PER_DEGREE = 6371 * math.pi / 180
+
+# Düzlem izdüşümü ile gerçek mesafe arasındaki farka karşı güvenlik payı
+BOUND_FACTOR = 0.95
+
+class CellMap:
+    """
+    Hücre -> durak sıraları eşlemesinin düz dizilerle tutulan hali (ikili görüntü dosyası için).
+    keys sıralı paketlenmiş hücre anahtarlarıdır; hücre j'nin durakları members[offsets[j]:offsets[j + 1]].
+    """
+    def __init__(self, keys, offsets, members):
+        self.keys = keys
+        self.offsets = offsets
+        self.members = members
+
+    @staticmethod
+    def pack(cx: int, cy: int) -> int:
+        return cx * (1 << 32) + (cy + (1 << 31))
+
+    def get(self, cell: Tuple[int, int], default=None):
+        key = self.pack(*cell)
+        j = bisect_left(self.keys, key)
+        if j < len(self.keys) and self.keys[j] == key:
+            return self.members[self.offsets[j]:self.offsets[j + 1]]
+        return default
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def to_dict(self) -> Dict[Tuple[int, int], List[int]]:
+        """Düzenlenebilir sözlük haline çevirir (artımlı güncellemeler için)."""
+        cells = {}
+        for j, key in enumerate(self.keys):
+            cx, cy = divmod(key, 1 << 32)
+            cells[(cx, cy - (1 << 31))] = list(self.members[self.offsets[j]:self.offsets[j + 1]])
+        return cells
+
+    @classmethod
+    def from_cells(cls, cells: Dict[Tuple[int, int], List[int]]) -> "CellMap":
+        keys = array("q")
+        offsets = array("i", [0])
+        members = array("i")
+        for cell in sorted(cells, key=lambda c: cls.pack(*c)):
+            keys.append(cls.pack(*cell))
+            members.extend(cells[cell])
+            offsets.append(len(members))
+        return cls(keys, offsets, members)
+
+class SpatialIndex:
+    """
+    Durakları düzlem koordinatlarına izdüşürüp eşit boyutlu ızgara hücrelerinde tutar.
+    Sorgular durak listesindeki sırayı ve gerçek (haversine) mesafeyi döndürür.
+    """
+    def __init__(self, stops: List[Dict[str, Any]], cell_size: float = 0.5):
+        self.stops = stops
+        self.cell_size = cell_size
+        self.distance_calculator = HaversineCalculator()
+        lats = [stop["lat"] for stop in stops]
+        lons = [stop["lon"] for stop in stops]
+        self.lats = as_coordinate_array(lats)
+        self.lons = as_coordinate_array(lons)
+
+        ref_lat = (min(lats) + max(lats)) / 2 if stops else 0.0
+        self._x_scale = KM_PER_DEGREE * math.cos(math.radians(ref_lat))
+
+        self.cells: Dict[Tuple[int, int], List[int]] = {}
+        for i in range(len(stops)):
+            self.cells.setdefault(self._cell_of(lats[i], lons[i]), []).append(i)
+
+        if self.cells:
+            self._min_cx = min(cx for cx, _ in self.cells)
+            self._max_cx = max(cx for cx, _ in self.cells)
+            self._min_cy = min(cy for _, cy in self.cells)
+            self._max_cy = max(cy for _, cy in self.cells)
+
+    def __len__(self) -> int:
+        return len(self.stops)
+
+    @property
+    def bounds(self) -> List[int]:
+        return [self._min_cx, self._max_cx, self._min_cy, self._max_cy] if self.cells else []
+
+    @classmethod
+    def from_arrays(cls, stops, lats, lons, cells: CellMap, cell_size: float,
+                    x_scale: float, bounds: List[int]) -> "SpatialIndex":
+        """Önceden hesaplanmış koordinat ve hücre dizilerinden, yeniden hesaplamadan indeks oluşturur."""
+        index = cls.__new__(cls)
+        index.stops = stops
+        index.cell_size = cell_size
+        index.distance_calculator = HaversineCalculator()
+        index.lats = as_coordinate_array(lats)
+        index.lons = as_coordinate_array(lons)
+        index._x_scale = x_scale
+        index.cells = cells
+        if bounds:
+            index._min_cx, index._max_cx, index._min_cy, index._max_cy = bounds
+        return index
+
+    def with_stops(self, stops) -> "SpatialIndex":
+        """Koordinat ve hücre dizilerini paylaşan, başka bir durak listesine bakan kopya."""
+        index = copy.copy(self)
+        index.stops = stops
+        return index
+
+    def _with_cell_members(self, i: int, edit) -> "SpatialIndex":
+        """i sıralı durağın hücresini edit ile değiştirilmiş kopya; diğer hücreler paylaşılır."""
+        cells = self.cells.to_dict() if isinstance(self.cells, CellMap) else dict(self.cells)
+        cell = self._cell_of(float(self.lats[i]), float(self.lons[i]))
+        members = edit(list(cells.get(cell, ())))
+        if members:
+            cells[cell] = members
+        else:
+            cells.pop(cell, None)
+        index = copy.copy(self)
+        index.cells = cells
+        return index
+
+    def without(self, i: int) -> "SpatialIndex":
+        """i sıralı durağı sorgu sonuçlarından çıkaran kopya (kapatılan duraklar için)."""
+        return self._with_cell_members(i, lambda members: [j for j in members if j != i])
+
+    def with_member(self, i: int) -> "SpatialIndex":
+        """without ile çıkarılmış durağı hücresine geri ekleyen kopya."""
+        def add(members: List[int]) -> List[int]:
+            if i not in members:
+                members.insert(bisect_left(members, i), i)
+            return members
+        return self._with_cell_members(i, add)
+
+    def _include(self, lat: float, lon: float) -> None:
+        """Hücre sınırlarını verilen noktayı kapsayacak şekilde genişletir (yalnızca kopyalarda)."""
+        cx, cy = self._cell_of(lat, lon)
+        if getattr(self, "_min_cx", None) is None:
+            self._min_cx = self._max_cx = cx
+            self._min_cy = self._max_cy = cy
+        else:
+            self._min_cx, self._max_cx = min(self._min_cx, cx), max(self._max_cx, cx)
+            self._min_cy, self._max_cy = min(self._min_cy, cy), max(self._max_cy, cy)
+
+    def appended(self, lat: float, lon: float) -> "SpatialIndex":
+        """Durak listesinin sonuna eklenmiş yeni durağı da içeren kopya."""
+        index = copy.copy(self)
+        index.lats = as_coordinate_array([*self.lats, lat])
+        index.lons = as_coordinate_array([*self.lons, lon])
+        index._include(lat, lon)
+        return index.with_member(len(index.lats) - 1)
+
+    def moved(self, i: int, lat: float, lon: float, member: bool = True) -> "SpatialIndex":
+        """i sıralı durağın koordinatları değişmiş kopya; member False ise durak hücreye eklenmez."""
+        index = self.without(i)
+        lats, lons = [*self.lats], [*self.lons]
+        lats[i], lons[i] = lat, lon
+        index.lats = as_coordinate_array(lats)
+        index.lons = as_coordinate_array(lons)
+        if not member:
+            return index
+        index._include(lat, lon)
+        return index.with_member(i)
+
+    def _cell_of(self, lat: float, lon: float) -> Tuple[int, int]:
+        return (math.floor(lon * self._x_scale / self.cell_size),
+                math.floor(lat * KM_PER_DEGREE / self.cell_size))
+
+    def _ring(self, cx: int, cy: int, r: int):
+        """
+        (cx, cy) hücresine Chebyshev uzaklığı tam olarak r olan dolu hücreleri gezer.
+        Yalnızca durakların hücre sınırları içinde kalan kısım taranır.
+        """
+        min_x, max_x = max(cx - r, self._min_cx), min(cx + r, self._max_cx)
+        for y in {cy - r, cy + r}:
+            if self._min_cy <= y <= self._max_cy:
+                for x in range(min_x, max_x + 1):
+                    cell = self.cells.get((x, y))
+                    if cell:
+                        yield cell
+        min_y, max_y = max(cy - r + 1, self._min_cy), min(cy + r - 1, self._max_cy)
+        for x in {cx - r, cx + r} if r else ():
+            if self._min_cx <= x <= self._max_cx:
+                for y in range(min_y, max_y + 1):
+                    cell = self.cells.get((x, y))
+                    if cell:
+                        yield cell
+
+    def distances(self, lat: float, lon: float, indices: List[int]) -> List[float]:
+        """Verilen sıralardaki duraklara olan mesafeleri tek seferde hesaplar."""
+        if not indices:
+            return []
+        lats = [self.lats[i] for i in indices] if isinstance(self.lats, list) else self.lats[indices]
+        lons = [self.lons[i] for i in indices] if isinstance(self.lons, list) else self.lons[indices]
+        distances = self.distance_calculator.calculate_distances(lat, lon, lats, lons)
+        return distances if isinstance(distances, list) else distances.tolist()
+
+    def nearest(self, lat: float, lon: float, k: int = 1) -> List[Tuple[int, float]]:
+        """Verilen noktaya en yakın k durağı (sıra, mesafe) olarak döndürür."""
+        if not self.cells or k <= 0:
+            return []
+
+        cx, cy = self._cell_of(lat, lon)
+        max_r = max(abs(cx - self._min_cx), abs(cx - self._max_cx),
+                    abs(cy - self._min_cy), abs(cy - self._max_cy))
+        # Sınırların dışındaki sorguda arama sınırlara en yakın halkadan başlar; aradaki halkalar boştur
+        min_r = max(self._min_cx - cx, cx - self._max_cx, self._min_cy - cy, cy - self._max_cy, 0)
+        candidates = []
+        for r in range(min_r, max_r + 1):
+            ring = [i for cell in self._ring(cx, cy, r) for i in cell]
+            candidates.extend(zip(self.distances(lat, lon, ring), ring))
+            # İncelenmemiş hücrelerdeki duraklar en az r hücre uzaklıktadır
+            if len(candidates) >= k:
+                kth = heapq.nsmallest(k, candidates)[-1][0]
+                if kth <= r * self.cell_size * BOUND_FACTOR:
+                    break
+
+        return [(i, dist) for dist, i in heapq.nsmallest(k, candidates)]
+
+    def within(self, lat: float, lon: float, radius: float) -> List[Tuple[int, float]]:
+        """Verilen yarıçap (km) içindeki durakları mesafeye göre sıralı döndürür."""
+        if not self.cells:
+            return []
+
+        cx, cy = self._cell_of(lat, lon)
+        reach = math.ceil(radius / (self.cell_size * BOUND_FACTOR))
+        nearby = []
+        for x in range(max(cx - reach, self._min_cx), min(cx + reach, self._max_cx) + 1):
+            for y in range(max(cy - reach, self._min_cy), min(cy + reach, self._max_cy) + 1):
+                nearby.extend(self.cells.get((x, y), ()))
+
+        results = [(dist, i) for dist, i in zip(self.distances(lat, lon, nearby), nearby) if dist <= radius]
+        results.sort()
+        return [(i, dist) for dist, i in results]
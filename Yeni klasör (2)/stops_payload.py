@@ -0,0 +1,46 @@
+import gzip
+import hashlib
+import json
+from typing import Dict, Any, List, Optional
+from transport_data import json_default
+
+try:
+    import brotli
+except ImportError:  # brotli kurulu değilse yalnızca gzip kullanılır
+    brotli = None
+
+# Haritanın durak işaretlerini çizmek için yeterli alanlar (bağlantılar ve aktarmalar hariç)
+SLIM_FIELDS = ("id", "name", "type", "lat", "lon", "sonDurak")
+VIEWS = ("full", "slim")
+
+class EncodedPayload:
+    """Bir kez serileştirilip sıkıştırılmış yanıt gövdesi ve kodlama başına güçlü ETag'ler."""
+    def __init__(self, data: Any):
+        self.body = json.dumps(data, ensure_ascii=False, separators=(",", ":"),
+                               default=json_default).encode("utf-8")
+        digest = hashlib.sha256(self.body).hexdigest()[:16]
+        self.encodings: Dict[str, bytes] = {"identity": self.body, "gzip": gzip.compress(self.body, 9)}
+        if brotli is not None:
+            self.encodings["br"] = brotli.compress(self.body)
+        self.etags = {encoding: f"{digest}-{encoding}" for encoding in self.encodings}
+
+    def negotiate(self, accept_encodings) -> str:
+        """İstemcinin kabul ettiği en küçük kodlamayı seçer."""
+        for encoding in ("br", "gzip"):
+            if encoding in self.encodings and accept_encodings[encoding]:
+                return encoding
+        return "identity"
+
+def slim_stops(stops: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [{field: stop[field] for field in SLIM_FIELDS if field in stop} for stop in stops]
+
+def stops_payload(network, view: str = "full") -> Optional[EncodedPayload]:
+    """Ağ görüntüsü başına bir kez hesaplanan /get_stops gövdesi; bilinmeyen görünümde None."""
+    if view not in VIEWS:
+        return None
+    payload = network.payloads.get(view)
+    if payload is None:
+        # Eşzamanlı iki istek aynı gövdeyi hesaplayabilir, sonuç aynıdır
+        payload = EncodedPayload(network.stops if view == "full" else slim_stops(network.stops))
+        network.payloads[view] = payload
+    return payload
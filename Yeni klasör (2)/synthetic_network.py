@@ -0,0 +1,85 @@
+import argparse
+import json
+import math
+import random
+from typing import Dict, Any
+from route_planner import haversine
+
+# Izmit merkezi; sentetik ağlar gerçek ağın çevresine yerleştirilir
+CENTER = (40.765, 29.94)
+KM_PER_DEGREE = 6371 * math.pi / 180
+
+def grid_network(rows: int, cols: int, spacing: float = 0.4, tram_every: int = 5,
+                 seed: int = 1) -> Dict[str, Any]:
+    """
+    data.txt biçiminde rows x cols otobüs duraklı ızgara ağı üretir.
+    Komşu otobüs durakları iki yönlü bağlıdır; her tram_every satırda bir tramvay hattı
+    otobüs duraklarına aktarmalı olarak satır boyunca ilerler. Koordinatlar ve süreler
+    seed ile belirlenen küçük sapmalar içerir.
+    """
+    rnd = random.Random(seed)
+    lat_step = spacing / KM_PER_DEGREE
+    lon_step = spacing / (KM_PER_DEGREE * math.cos(math.radians(CENTER[0])))
+    lat0 = CENTER[0] - lat_step * (rows - 1) / 2
+    lon0 = CENTER[1] - lon_step * (cols - 1) / 2
+
+    stops: Dict[str, Dict[str, Any]] = {}
+
+    def add_stop(stop_id: str, stop_type: str, lat: float, lon: float) -> Dict[str, Any]:
+        stop = {"id": stop_id, "name": stop_id, "type": stop_type, "lat": round(lat, 6), "lon": round(lon, 6),
+                "sonDurak": False, "nextStops": [], "transfer": None}
+        stops[stop_id] = stop
+        return stop
+
+    def connect(a: Dict[str, Any], b: Dict[str, Any], minutes_per_km: float, fare: float) -> None:
+        # Yol mesafesi kuş uçuşundan biraz uzundur, süreler trafikle birlikte değişir
+        distance = round(haversine(a["lat"], a["lon"], b["lat"], b["lon"]) * rnd.uniform(1.1, 1.4), 3)
+        a["nextStops"].append({"stopId": b["id"], "mesafe": distance,
+                               "sure": max(1, round(distance * minutes_per_km * rnd.uniform(1.0, 1.6))),
+                               "ucret": fare})
+
+    for r in range(rows):
+        for c in range(cols):
+            add_stop(f"bus_{r}_{c}", "bus", lat0 + r * lat_step + rnd.uniform(-0.2, 0.2) * lat_step,
+                     lon0 + c * lon_step + rnd.uniform(-0.2, 0.2) * lon_step)
+    for r in range(rows):
+        for c in range(cols):
+            stop = stops[f"bus_{r}_{c}"]
+            for dr, dc in ((0, 1), (1, 0), (0, -1), (-1, 0)):
+                neighbor = stops.get(f"bus_{r + dr}_{c + dc}")
+                if neighbor:
+                    connect(stop, neighbor, 2.0, 1.5)
+
+    for r in range(tram_every // 2, rows, tram_every):
+        for c in range(cols):
+            bus = stops[f"bus_{r}_{c}"]
+            tram = add_stop(f"tram_{r}_{c}", "tram", bus["lat"] + 0.0002, bus["lon"])
+            bus["transfer"] = {"transferStopId": tram["id"], "transferSure": 2, "transferUcret": 0.5}
+            tram["transfer"] = {"transferStopId": bus["id"], "transferSure": 2, "transferUcret": 0.5}
+        for c in range(cols - 1):
+            connect(stops[f"tram_{r}_{c}"], stops[f"tram_{r}_{c + 1}"], 1.5, 2.0)
+            connect(stops[f"tram_{r}_{c + 1}"], stops[f"tram_{r}_{c}"], 1.5, 2.0)
+        stops[f"tram_{r}_0"]["sonDurak"] = stops[f"tram_{r}_{cols - 1}"]["sonDurak"] = True
+
+    return {
+        "city": f"Sentetik {rows}x{cols}",
+        "taxi": {"openingFee": 10.0, "costPerKm": 4.0},
+        "duraklar": list(stops.values())
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Test ve ölçümler için sentetik ızgara ağı üretir")
+    parser.add_argument("--rows", type=int, default=50)
+    parser.add_argument("--cols", type=int, default=50)
+    parser.add_argument("--spacing", type=float, default=0.4, help="Durak aralığı (km)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", required=True, help="Yazılacak veri dosyası")
+    args = parser.parse_args()
+
+    data = grid_network(args.rows, args.cols, args.spacing, seed=args.seed)
+    with open(args.out, "w", encoding="utf-8") as file:
+        json.dump(data, file, ensure_ascii=False)
+    print(f"{len(data['duraklar'])} durak yazıldı: {args.out}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+import copy
+import pytest
+from compiled_graph import EDGE_DIRECT
+from network_snapshot import NetworkSnapshot
+from network_updates import apply_updates
+from transport_data import CityData, NetworkDataError
+from synthetic_network import grid_network
+
+GRAPH_ARRAYS = ("offsets", "targets", "distance", "time", "cost", "edge_type", "weight")
+
+NEW_STOP = {"id": "bus_new", "name": "Yeni", "type": "bus", "lat": 40.7662, "lon": 29.9415, "sonDurak": False,
+            "nextStops": [{"stopId": "bus_4_4", "mesafe": 0.4, "sure": 1, "ucret": 1.0}],
+            "transfer": {"transferStopId": "tram_2_2", "transferSure": 2, "transferUcret": 0}}
+
+UPDATES = {
+    "values": [
+        {"op": "modify_edge", "from": "bus_2_2", "to": "bus_2_3", "sure": 9, "mesafe": 1.2},
+        {"op": "modify_transfer", "stop": "bus_2_3", "transferSure": 5}],
+    "edges": [
+        {"op": "add_edge", "from": "bus_4_4", "to": "bus_2_2", "mesafe": 1.0, "sure": 2, "ucret": 1.0},
+        {"op": "remove_edge", "from": "bus_2_2", "to": "bus_2_3"},
+        {"op": "remove_transfer", "stop": "bus_2_3"},
+        {"op": "set_transfer", "stop": "bus_4_4", "transferStopId": "bus_5_5", "transferSure": 4, "transferUcret": 0.5}],
+    "stops": [
+        {"op": "add_stop", "stop": NEW_STOP},
+        {"op": "add_edge", "from": "bus_5_5", "to": "bus_new", "mesafe": 0.5, "sure": 1, "ucret": 0.0},
+        {"op": "modify_stop", "stop": "bus_5_5", "lat": 40.7701, "name": "Taşındı"}],
+    "remove": [
+        {"op": "add_stop", "stop": NEW_STOP},
+        {"op": "remove_stop", "stop": "bus_4_4"},
+        {"op": "modify_edge", "from": "bus_2_2", "to": "bus_2_3", "ucret": 9.0}],
+}
+
+def edited(data, operations):
+    """İşlemleri veri dosyasının içeriğine uygular; karşılaştırma için ağ baştan kurulur."""
+    data = copy.deepcopy(data)
+    stops = {stop["id"]: stop for stop in data["duraklar"]}
+    for operation in operations:
+        op = operation["op"]
+        if op in ("modify_edge", "add_edge", "remove_edge"):
+            source = stops[operation["from"]]
+            if op == "remove_edge":
+                source["nextStops"] = [edge for edge in source["nextStops"] if edge["stopId"] != operation["to"]]
+                continue
+            edge = next((edge for edge in source["nextStops"] if edge["stopId"] == operation["to"]), None)
+            if edge is None:
+                edge = {"stopId": operation["to"]}
+                source["nextStops"].append(edge)
+            edge.update({key: operation[key] for key in ("mesafe", "sure", "ucret") if key in operation})
+        elif op == "modify_transfer":
+            stops[operation["stop"]]["transfer"]["transferSure"] = operation["transferSure"]
+        elif op == "remove_transfer":
+            stops[operation["stop"]]["transfer"] = None
+        elif op == "set_transfer":
+            stops[operation["stop"]]["transfer"] = {key: operation[key] for key in
+                                                    ("transferStopId", "transferSure", "transferUcret")}
+        elif op == "add_stop":
+            stop = copy.deepcopy(operation["stop"])
+            data["duraklar"].append(stop)
+            stops[stop["id"]] = stop
+        elif op == "modify_stop":
+            stops[operation["stop"]].update({key: operation[key] for key in ("lat", "lon", "name") if key in operation})
+        elif op == "remove_stop":
+            removed = operation["stop"]
+            data["duraklar"] = [stop for stop in data["duraklar"] if stop["id"] != removed]
+            for stop in data["duraklar"]:
+                stop["nextStops"] = [edge for edge in stop["nextStops"] if edge["stopId"] != removed]
+                if stop["transfer"] and stop["transfer"]["transferStopId"] == removed:
+                    stop["transfer"] = None
+    return NetworkSnapshot.from_city("rebuilt", CityData.from_dict(data))
+
+def graph_state(network):
+    graph = network.graph
+    state = {name: list(getattr(graph, name)) for name in GRAPH_ARRAYS}
+    state["stop_ids"] = list(graph.stop_ids)
+    state["modes"] = [graph.modes[mode] for mode in graph.mode]
+    state["stops"] = [dict(stop) for stop in network.stops]
+    return state
+
+@pytest.fixture(scope="module")
+def data():
+    return grid_network(8, 8)
+
+@pytest.mark.parametrize("name", UPDATES)
+def test_patched_snapshot_equals_rebuild(data, name):
+    base = NetworkSnapshot.from_city("base", CityData.from_dict(data))
+    before = graph_state(base)
+    update = apply_updates(base, UPDATES[name], "patched")
+    assert graph_state(update.snapshot) == graph_state(edited(data, UPDATES[name]))
+    # Yama kopya üzerinde yapılır; yayınlanmış görüntü değişmez
+    assert graph_state(base) == before
+
+def test_invalid_operation_publishes_nothing(data):
+    base = NetworkSnapshot.from_city("base", CityData.from_dict(data))
+    before = graph_state(base)
+    with pytest.raises(NetworkDataError):
+        apply_updates(base, [{"op": "remove_stop", "stop": "bus_4_4"},
+                             {"op": "modify_edge", "from": "x", "to": "y", "sure": 1}], "patched")
+    assert graph_state(base) == before
+
+def test_close_and_reopen_restores_graph(data):
+    base = NetworkSnapshot.from_city("base", CityData.from_dict(data))
+    closed = apply_updates(base, [{"op": "close_stop", "stop": "bus_2_3"}], "closed").snapshot
+    # Kapalı durağa giden aktarma ve yürüme kenarları kullanılamaz
+    graph = closed.graph
+    u = graph.index_of("bus_2_3")
+    incoming = [e for e in range(graph.edge_count) if graph.targets[e] == u and graph.edge_type[e] != EDGE_DIRECT]
+    assert incoming and all(graph.time[e] == float("inf") for e in incoming)
+    reopened = apply_updates(closed, [{"op": "open_stop", "stop": "bus_2_3"}], "reopened").snapshot
+    assert graph_state(reopened) == graph_state(base)
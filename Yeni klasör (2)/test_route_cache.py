@@ -0,0 +1,90 @@
+from types import SimpleNamespace
+import pytest
+import route_cache
+from route_cache import RouteCache
+
+START = {"lat": 40.7655, "lng": 29.9410}
+END = {"lat": 40.7810, "lng": 29.9600}
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(route_cache.time, "monotonic", clock)
+    return clock
+
+def counting_compute():
+    calls = []
+
+    def compute(start, end, passenger_type):
+        calls.append((start, end, passenger_type))
+        return {"walking": [{"stops": [], "calls": len(calls)}]}
+    return compute, calls
+
+def test_nearby_coordinates_share_an_entry(clock):
+    cache = RouteCache(grid=0.0005)
+    network = SimpleNamespace(version="v1")
+    compute, calls = counting_compute()
+    first = cache.find_routes(network, START, END, "Genel", compute)
+    # Aynı ızgara hücresindeki koordinatlar aynı anahtara yuvarlanır
+    nearby = {"lat": START["lat"] + 0.0001, "lng": START["lng"] - 0.0001}
+    assert cache.find_routes(network, nearby, END, "Genel", compute) is first
+    assert len(calls) == 1
+    # Başka hücre veya yolcu tipi ayrı anahtardır
+    cache.find_routes(network, {"lat": START["lat"] + 0.001, "lng": START["lng"]}, END, "Genel", compute)
+    cache.find_routes(network, START, END, "Öğrenci", compute)
+    assert len(calls) == 3
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 3
+
+def test_expired_entries_are_recomputed(clock):
+    cache = RouteCache(ttl=60)
+    network = SimpleNamespace(version="v1")
+    compute, calls = counting_compute()
+    cache.find_routes(network, START, END, "Genel", compute)
+    clock.now += 60
+    cache.find_routes(network, START, END, "Genel", compute)
+    assert len(calls) == 1
+    clock.now += 61
+    cache.find_routes(network, START, END, "Genel", compute)
+    assert len(calls) == 2
+    assert cache.stats()["expirations"] == 1
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = RouteCache(max_entries=2)
+    network = SimpleNamespace(version="v1")
+    compute, calls = counting_compute()
+    ends = [{"lat": END["lat"] + 0.01 * i, "lng": END["lng"]} for i in range(3)]
+    cache.find_routes(network, START, ends[0], "Genel", compute)
+    cache.find_routes(network, START, ends[1], "Genel", compute)
+    # ends[0] kullanıldığından en eski girdi ends[1] olur
+    cache.find_routes(network, START, ends[0], "Genel", compute)
+    cache.find_routes(network, START, ends[2], "Genel", compute)
+    assert cache.stats()["evictions"] == 1 and cache.stats()["size"] == 2
+    cache.find_routes(network, START, ends[0], "Genel", compute)
+    assert len(calls) == 3
+    cache.find_routes(network, START, ends[1], "Genel", compute)
+    assert len(calls) == 4
+
+def test_new_network_version_clears_the_cache(clock):
+    cache = RouteCache()
+    compute, calls = counting_compute()
+    cache.find_routes(SimpleNamespace(version="v1"), START, END, "Genel", compute)
+    cache.find_routes(SimpleNamespace(version="v2"), START, END, "Genel", compute)
+    assert len(calls) == 2
+    assert cache.stats()["invalidations"] == 1
+
+def test_carry_over_drops_only_routes_through_affected_stops(clock):
+    cache = RouteCache()
+    network = SimpleNamespace(version="v1")
+    routes = {"bus_only": [{"stops": [{"id": "bus_1"}, {"id": "bus_2"}]}]}
+    cache.find_routes(network, START, END, "Genel", lambda *args: routes)
+    cache.find_routes(network, END, START, "Genel", lambda *args: {"walking": [{"stops": []}]})
+    assert cache.carry_over("v1", "v2", {"bus_2"}, flush=False) == 1
+    assert cache.stats()["dropped"] == 1 and cache.version == "v2"
+    assert cache.carry_over("v2", "v3", set(), flush=True) == 0
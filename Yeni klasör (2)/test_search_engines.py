@@ -0,0 +1,103 @@
+import heapq
+import random
+import pytest
+from compiled_graph import EDGE_DIRECT
+from contraction import ContractionHierarchy
+from network_snapshot import NetworkSnapshot
+from transport_data import CityData
+from synthetic_network import grid_network
+from route_planner import dijkstra, shortest_path
+from astar_search import fastest_path
+from pareto_search import pareto_search, dominates
+
+INF = float("inf")
+
+def plain_dijkstra(graph, sources, weights):
+    """Karşılaştırma için yalın çok kaynaklı Dijkstra; düğüm başına en küçük toplam ağırlık."""
+    best = [INF] * graph.node_count
+    pq = []
+    for node, start in sources.items():
+        best[node] = start
+        heapq.heappush(pq, (start, node))
+    while pq:
+        value, u = heapq.heappop(pq)
+        if value > best[u]:
+            continue
+        for e in range(graph.offsets[u], graph.offsets[u + 1]):
+            v = graph.targets[e]
+            if value + weights[e] < best[v]:
+                best[v] = value + weights[e]
+                heapq.heappush(pq, (best[v], v))
+    return best
+
+def random_pairs(graph, count, seed=1):
+    rnd = random.Random(seed)
+    return [tuple(rnd.sample(range(graph.node_count), 2)) for _ in range(count)]
+
+@pytest.fixture(scope="module")
+def network():
+    return NetworkSnapshot.from_city("grid", CityData.from_dict(grid_network(8, 8)))
+
+def test_contraction_matches_dijkstra(network):
+    graph = network.graph
+    network.contraction = ContractionHierarchy.build(graph)
+    try:
+        for start, end in random_pairs(graph, 60):
+            start_id, end_id = graph.stop_ids[start], graph.stop_ids[end]
+            distance, path = dijkstra(graph, start_id, end_id)
+            ch_distance, ch_path = shortest_path(network, start_id, end_id)
+            assert ch_distance == pytest.approx(distance)
+            assert ch_path[0]["id"] == start_id and ch_path[-1]["id"] == end_id
+    finally:
+        network.contraction = None
+
+@pytest.mark.parametrize("search", ["astar", "dijkstra"])
+def test_fastest_path_matches_dijkstra(network, search):
+    graph = network.graph
+    for start, end in random_pairs(graph, 60):
+        expected = plain_dijkstra(graph, {start: 0}, graph.time)[end]
+        result = fastest_path(network, {start: 0}, {end: 0}, search)
+        assert result["time"] == pytest.approx(expected)
+        # Yol, bulunan süreyi veren kenarlardan oluşur
+        assert sum(graph.time[e] for _, e in result["path"][1:]) == pytest.approx(expected)
+
+def test_pareto_front_contains_fastest_and_cheapest(network):
+    graph = network.graph
+    for start, end in random_pairs(graph, 20):
+        front = pareto_search(graph, {start: (0, 0)}, {end: (0, 0)}, max_labels=10 ** 6, max_transfers=10 ** 6)
+        assert min(option["time"] for option in front) == pytest.approx(plain_dijkstra(graph, {start: 0}, graph.time)[end])
+        assert min(option["cost"] for option in front) == pytest.approx(plain_dijkstra(graph, {start: 0}, graph.cost)[end])
+        for option in front:
+            label = (option["time"], option["cost"], option["transfers"], 0, 0, 0, True)
+            assert not any(other is not option and dominates((other["time"], other["cost"], other["transfers"],
+                                                               0, 0, 0, True), label)
+                           for other in front)
+
+def test_raptor_matches_dijkstra_with_frequent_trips():
+    # Her satır ve sütunda iki yönlü, dakikada bir kalkan hatlar: bekleme olmadığından
+    # en erken varış, hatların kapsadığı grafta en kısa süreye eşittir
+    data = grid_network(6, 6)
+    lines = []
+    for r in range(6):
+        stops = [f"bus_{r}_{c}" for c in range(6)]
+        lines += [stops, stops[::-1]]
+        if any(stop["id"] == f"tram_{r}_0" for stop in data["duraklar"]):
+            trams = [f"tram_{r}_{c}" for c in range(6)]
+            lines += [trams, trams[::-1]]
+    for c in range(6):
+        stops = [f"bus_{r}_{c}" for r in range(6)]
+        lines += [stops, stops[::-1]]
+    data["hatlar"] = [{"id": f"h{i}", "name": f"Hat {i}", "type": "tram" if stops[0].startswith("tram") else "bus",
+                       "stops": stops, "headway": 1, "serviceStart": "06:00", "serviceEnd": "24:00"}
+                      for i, stops in enumerate(lines)]
+    # Yürüme kenarlarının süreleri tam dakika olmadığından yalnızca aktarmalar kullanılır
+    network = NetworkSnapshot.from_city("grid-lines", CityData.from_dict(data), walk_radius=0.0)
+    graph = network.graph
+    engine = network.raptor
+    for start, end in random_pairs(graph, 60):
+        expected = plain_dijkstra(graph, {start: 480}, graph.time)[end]
+        journey = engine.earliest_arrival({start: 480}, {end: 0}, max_rounds=64)
+        assert journey["arrival"] == pytest.approx(expected)
+        rides = [leg for leg in journey["legs"] if leg["kind"] == "ride"]
+        assert rides and all(graph.edge_type[e] == EDGE_DIRECT
+                             for leg in rides for e in leg["route"].edges[leg["board"]:leg["alight"]])
@@ -1,64 +1,696 @@
 import json
-from typing import List, Dict, Optional
-
-class Transfer:
-    def __init__(self, transferStopId: str, transferSure: int, transferUcret: float):
-        self.transferStopId = transferStopId
-        self.transferSure = transferSure
-        self.transferUcret = transferUcret
-
-class NextStop:
-    def __init__(self, stopId: str, mesafe: float, sure: int, ucret: float):
-        self.stopId = stopId
-        self.mesafe = mesafe
-        self.sure = sure
-        self.ucret = ucret
-
-class Stop:
-    def __init__(self, id: str, name: str, type: str, lat: float, lon: float, sonDurak: bool, nextStops: List[NextStop], transfer: Optional[Transfer]):
+import re
+import sys
+import time
+from array import array
+from collections.abc import Mapping, Sequence
+from typing import List, Dict, Any, Optional, Iterator, Tuple
+from polyline import encode_points, decode_points
+
+try:
+    import resource
+except ImportError:  # Windows'ta resource modülü yoktur
+    resource = None
+
+class Line:
+    """
+    Bir hattın durak sırası ve sefer planı.
+    Seferler ya sabit aralıkla (headway, dakika) serviceStart-serviceEnd arasında
+    ya da departures listesindeki kalkış saatleriyle ("SS:DD") tanımlanır.
+    """
+    __slots__ = ("id", "name", "type", "stops", "headway", "serviceStart", "serviceEnd", "departures")
+
+    def __init__(self, id: str, name: str, type: str, stops: List[str], headway: Optional[int] = None,
+                 serviceStart: Optional[str] = None, serviceEnd: Optional[str] = None,
+                 departures: Optional[List[str]] = None):
         self.id = id
         self.name = name
         self.type = type
-        self.lat = lat
-        self.lon = lon
-        self.sonDurak = sonDurak
-        self.nextStops = nextStops
-        self.transfer = transfer
+        self.stops = stops
+        self.headway = headway
+        self.serviceStart = serviceStart
+        self.serviceEnd = serviceEnd
+        self.departures = departures
+
+    def departure_minutes(self) -> List[int]:
+        """İlk duraktan kalkış saatlerini gece yarısından itibaren dakika olarak döndürür."""
+        if self.departures:
+            return sorted(parse_time(departure) for departure in self.departures)
+        if self.headway:
+            start = parse_time(self.serviceStart or "06:00")
+            end = parse_time(self.serviceEnd or "24:00")
+            return list(range(start, end + 1, self.headway))
+        return []
+
+def parse_time(value: str) -> int:
+    """"SS:DD" biçimindeki saati gece yarısından itibaren dakikaya çevirir."""
+    hours, minutes = value.split(":")
+    return int(hours) * 60 + int(minutes)
+
+class StopTable:
+    """
+    Tüm durakların sütun düzeninde (struct-of-arrays) tutulduğu tablo.
+    Koordinatlar ve bağlantı değerleri ardışık dizilerdedir; durak i'nin bağlantıları
+    next_offsets[i] ile next_offsets[i + 1] arasındaki indekslerdedir.
+    Bağlantının isteğe bağlı yol şekli (ara noktalar) next_shapes'te polyline olarak kodlanır.
+    """
+    __slots__ = ("ids", "names", "types", "lat", "lon", "terminal", "next_offsets", "next_ids",
+                 "next_distance", "next_time", "next_cost", "next_shapes", "transfer_ids", "transfer_time",
+                 "transfer_cost", "index")
+
+    def __init__(self):
+        self.ids: List[str] = []
+        self.names: List[str] = []
+        self.types: List[str] = []
+        self.lat = array("d")
+        self.lon = array("d")
+        self.terminal = bytearray()
+        self.next_offsets = array("i", [0])
+        self.next_ids: List[str] = []
+        self.next_distance = array("d")
+        self.next_time = array("d")
+        self.next_cost = array("d")
+        self.next_shapes: List[Optional[str]] = []
+        self.transfer_ids: List[Optional[str]] = []
+        self.transfer_time = array("d")
+        self.transfer_cost = array("d")
+        self.index: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def append(self, durak: Dict[str, Any]) -> None:
+        """JSON'daki bir durak kaydını tabloya ekler."""
+        self.index[durak["id"]] = len(self.ids)
+        self.ids.append(sys.intern(durak["id"]))
+        self.names.append(durak["name"])
+        # Tip ve durak kimlikleri çok tekrarlandığından tek kopya tutulur
+        self.types.append(sys.intern(durak["type"]))
+        self.lat.append(durak["lat"])
+        self.lon.append(durak["lon"])
+        self.terminal.append(1 if durak.get("sonDurak") else 0)
+
+        for next_stop in durak.get("nextStops") or []:
+            self.next_ids.append(sys.intern(next_stop["stopId"]))
+            self.next_distance.append(next_stop["mesafe"])
+            self.next_time.append(next_stop["sure"])
+            self.next_cost.append(next_stop["ucret"])
+            self.next_shapes.append(encode_points(next_stop["sekil"]) if next_stop.get("sekil") else None)
+        self.next_offsets.append(len(self.next_ids))
+
+        transfer = durak.get("transfer")
+        self.transfer_ids.append(sys.intern(transfer["transferStopId"]) if transfer else None)
+        self.transfer_time.append(transfer["transferSure"] if transfer else 0)
+        self.transfer_cost.append(transfer["transferUcret"] if transfer else 0)
+
+    @classmethod
+    def from_records(cls, duraklar: List[Dict[str, Any]]) -> "StopTable":
+        table = cls()
+        for durak in duraklar:
+            table.append(durak)
+        return table
+
+    @classmethod
+    def from_columns(cls, columns: Dict[str, Any]) -> "StopTable":
+        """Hazır sütunlardan (örneğin ikili görüntü dosyasındaki mmap görünümlerinden) tablo oluşturur."""
+        table = cls.__new__(cls)
+        for field in cls.__slots__:
+            setattr(table, field, columns[field])
+        return table
+
+    def next_stops(self, i: int) -> List[Dict[str, Any]]:
+        next_stops = []
+        for e in range(self.next_offsets[i], self.next_offsets[i + 1]):
+            next_stop = {"stopId": self.next_ids[e], "mesafe": self.next_distance[e],
+                         "sure": minutes(self.next_time[e]), "ucret": self.next_cost[e]}
+            if self.next_shapes[e] is not None:
+                next_stop["sekil"] = [list(point) for point in decode_points(self.next_shapes[e])]
+            next_stops.append(next_stop)
+        return next_stops
+
+    def transfer(self, i: int) -> Optional[Dict[str, Any]]:
+        if self.transfer_ids[i] is None:
+            return None
+        return {"transferStopId": self.transfer_ids[i], "transferSure": minutes(self.transfer_time[i]),
+                "transferUcret": self.transfer_cost[i]}
+
+    def views(self) -> List["StopView"]:
+        return [StopView(self, i) for i in range(len(self.ids))]
+
+def minutes(value: float) -> Any:
+    """Süreler dizide ondalıklı tutulur; tam sayıysa kaynak veri gibi tam sayı döndürülür."""
+    return int(value) if value.is_integer() else value
+
+class StringColumn(Sequence):
+    """
+    UTF-8 metinlerin tek bir bayt dizisinde, başlangıç konumlarıyla tutulduğu sütun.
+    Metinler erişildikçe çözülür; present verilmişse 0 olan satırlar None döner.
+    """
+    __slots__ = ("blob", "offsets", "present")
+
+    def __init__(self, blob, offsets, present=None):
+        self.blob = blob
+        self.offsets = offsets
+        self.present = present
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> Optional[str]:
+        if not -len(self) <= i < len(self):
+            raise IndexError(i)
+        i %= len(self)
+        if self.present is not None and not self.present[i]:
+            return None
+        return bytes(self.blob[self.offsets[i]:self.offsets[i + 1]]).decode("utf-8")
+
+    @staticmethod
+    def encode(values: List[Optional[str]]):
+        """Metin listesini (bayt dizisi, konumlar, dolu mu) sütunlarına çevirir."""
+        blob = bytearray()
+        offsets = array("q", [0])
+        present = bytearray()
+        for value in values:
+            if value is not None:
+                blob += value.encode("utf-8")
+            offsets.append(len(blob))
+            present.append(value is not None)
+        return array("B", blob), offsets, array("B", present)
+
+class CodedColumn(Sequence):
+    """Az sayıda farklı değeri (durak tipleri gibi) küçük tamsayı kodlarıyla tutan sütun."""
+    __slots__ = ("codes", "names")
+
+    def __init__(self, codes, names: List[str]):
+        self.codes = codes
+        self.names = names
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __getitem__(self, i: int) -> str:
+        return self.names[self.codes[i]]
+
+class SortedIndex(Mapping):
+    """Kimlik -> sıra eşlemesi; kimliklere göre sıralı permütasyon üzerinde ikili arama yapar."""
+    __slots__ = ("ids", "order")
+
+    def __init__(self, ids: Sequence, order):
+        self.ids = ids
+        self.order = order
+
+    def __getitem__(self, stop_id: str) -> int:
+        ids, order = self.ids, self.order
+        low, high = 0, len(order)
+        while low < high:
+            middle = (low + high) // 2
+            if ids[order[middle]] < stop_id:
+                low = middle + 1
+            else:
+                high = middle
+        if low < len(order) and ids[order[low]] == stop_id:
+            return order[low]
+        raise KeyError(stop_id)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.ids)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @staticmethod
+    def order_of(ids: List[str]) -> array:
+        return array("i", sorted(range(len(ids)), key=ids.__getitem__))
+
+class StopList(Sequence):
+    """Tablonun tüm duraklarına veya positions ile seçilen alt kümesine görünüm listesi; kopya oluşturmaz."""
+    __slots__ = ("table", "positions")
+
+    def __init__(self, table: StopTable, positions=None):
+        self.table = table
+        self.positions = positions
+
+    def __len__(self) -> int:
+        return len(self.table) if self.positions is None else len(self.positions)
+
+    def __getitem__(self, i: int) -> "StopView":
+        if not -len(self) <= i < len(self):
+            raise IndexError(i)
+        i %= len(self)
+        return StopView(self.table, i if self.positions is None else self.positions[i])
+
+class StopsById(Mapping):
+    """Durak kimliğinden görünüme eşleme; tablonun kimlik indeksini kullanır."""
+    __slots__ = ("table",)
+
+    def __init__(self, table: StopTable):
+        self.table = table
+
+    def __getitem__(self, stop_id: str) -> "StopView":
+        return StopView(self.table, self.table.index[stop_id])
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.table.ids)
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+class StopView(Mapping):
+    """
+    Tablodaki bir durağa sözlük arayüzüyle erişim sağlar, değerleri kopyalamaz.
+    distance verilmişse (en yakın durak sorguları) "distance" anahtarı da bulunur.
+    """
+    __slots__ = ("table", "i", "distance")
+    FIELDS = ("id", "name", "type", "lat", "lon", "sonDurak", "nextStops", "transfer")
+
+    def __init__(self, table: StopTable, i: int, distance: Optional[float] = None):
+        self.table = table
+        self.i = i
+        self.distance = distance
+
+    def __getitem__(self, key: str) -> Any:
+        table = self.table
+        if key == "lat":
+            return table.lat[self.i]
+        if key == "lon":
+            return table.lon[self.i]
+        if key == "id":
+            return table.ids[self.i]
+        if key == "type":
+            return table.types[self.i]
+        if key == "name":
+            return table.names[self.i]
+        if key == "sonDurak":
+            return bool(table.terminal[self.i])
+        if key == "nextStops":
+            return table.next_stops(self.i)
+        if key == "transfer":
+            return table.transfer(self.i)
+        if key == "distance" and self.distance is not None:
+            return self.distance
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self.FIELDS
+        if self.distance is not None:
+            yield "distance"
+
+    def __len__(self) -> int:
+        return len(self.FIELDS) + (self.distance is not None)
+
+    def __repr__(self) -> str:
+        return f"StopView({self.table.ids[self.i]!r})"
+
+    def with_distance(self, distance: float) -> "StopView":
+        return StopView(self.table, self.i, distance)
+
+def with_distance(stop, distance: float):
+    """Durağı mesafe bilgisiyle döndürür; tablo görünümleri kopyalanmaz."""
+    if isinstance(stop, StopView):
+        return stop.with_distance(distance)
+    return {**stop, "distance": distance}
+
+def json_default(value: Any) -> Any:
+    """json.dumps için: durak görünümlerini sözlüğe çevirir."""
+    if isinstance(value, StopView):
+        return dict(value)
+    if isinstance(value, StopList):
+        return list(value)
+    raise TypeError(f"{type(value).__name__} JSON'a çevrilemez")
 
 class CityData:
-    def __init__(self, city: str, taxi: Dict[str, float], duraklar: List[Stop]):
+    """Yükleyicinin ve planlayıcının ortak kullandığı şehir verisi; duraklar StopTable'da tutulur."""
+    __slots__ = ("city", "taxi", "stops", "hatlar")
+
+    def __init__(self, city: str, taxi: Dict[str, float], stops: StopTable, hatlar: Optional[List[Line]] = None):
         self.city = city
         self.taxi = taxi
-        self.duraklar = duraklar
-
-def load_data(file_path: str) -> Optional[CityData]:
-    try:
-        with open(file_path, 'r', encoding='utf-8') as file:
-            data = json.load(file)
-
-        print(f"Veri yüklendi: {data['city']}")
-
-        duraklar = []
-        for durak in data['duraklar']:
-            nextStops = [NextStop(**next_stop) for next_stop in durak.get('nextStops', [])]
-            transfer = Transfer(**durak['transfer']) if durak['transfer'] else None
-            duraklar.append(
-                Stop(
-                    id=durak['id'],
-                    name=durak['name'],
-                    type=durak['type'],
-                    lat=durak['lat'],
-                    lon=durak['lon'],
-                    sonDurak=durak['sonDurak'],
-                    nextStops=nextStops,
-                    transfer=transfer
-                )
-            )
-
-        print(f"Duraklar yüklendi: {len(duraklar)}")
-        return CityData(city=data['city'], taxi=data['taxi'], duraklar=duraklar)
-    except json.JSONDecodeError as e:
-        print(f"JSON decode error: {e}")
-    except Exception as e:
-        print(f"An error occurred while loading the data: {e}")
-    return None
\ No newline at end of file
+        self.stops = stops
+        self.hatlar = hatlar or []
+
+    @property
+    def duraklar(self) -> List[StopView]:
+        return self.stops.views()
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "CityData":
+        """Bellekteki JSON verisini akış yükleyicisiyle aynı kurallarla doğrulayıp yükler."""
+        loader = CityLoader()
+        loader.header = {key: value for key, value in data.items() if key not in ("duraklar", "hatlar")}
+        for durak in data.get('duraklar', []):
+            loader.add_stop(durak)
+        # Sefer planları isteğe bağlıdır
+        for hat in data.get('hatlar', []):
+            loader.add_line(hat)
+        return loader.finish()
+
+class NetworkDataError(ValueError):
+    """Ağ verisi okunamadığında veya tutarsız olduğunda fırlatılır; her hata konumuyla birlikte tutulur."""
+    def __init__(self, errors: List[Tuple[str, str]]):
+        self.errors = errors
+        shown = "\n".join(f"  {location}: {message}" for location, message in errors[:MAX_REPORTED_ERRORS])
+        more = len(errors) - MAX_REPORTED_ERRORS
+        super().__init__(f"Ağ verisinde {len(errors)} hata:\n{shown}" + (f"\n  ... ve {more} hata daha" if more > 0 else ""))
+
+MAX_REPORTED_ERRORS = 20
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+def is_shape(value: Any) -> bool:
+    """Bağlantı şekli [enlem, boylam] noktalarından oluşan bir listedir."""
+    return isinstance(value, list) and all(
+        isinstance(point, list) and len(point) == 2 and all(_is_number(v) for v in point) for point in value
+    )
+
+def is_time(value: Any) -> bool:
+    """parse_time'ın okuyabildiği "SS:DD" saati; gece yarısını aşan seferler için saat 0-47 olabilir."""
+    match = re.fullmatch(r"([0-9]{1,2}):([0-5][0-9])", value) if isinstance(value, str) else None
+    return match is not None and int(match.group(1)) <= 47
+
+# Alan adı -> (doğrulama, beklenen tür açıklaması)
+STOP_FIELDS = {
+    "id": (lambda v: isinstance(v, str), "metin"),
+    "name": (lambda v: isinstance(v, str), "metin"),
+    "type": (lambda v: isinstance(v, str), "metin"),
+    "lat": (_is_number, "sayı"),
+    "lon": (_is_number, "sayı")
+}
+NEXT_STOP_FIELDS = {
+    "stopId": (lambda v: isinstance(v, str), "metin"),
+    "mesafe": (_is_number, "sayı"),
+    "sure": (_is_number, "sayı"),
+    "ucret": (_is_number, "sayı")
+}
+TRANSFER_FIELDS = {
+    "transferStopId": (lambda v: isinstance(v, str), "metin"),
+    "transferSure": (_is_number, "sayı"),
+    "transferUcret": (_is_number, "sayı")
+}
+
+def format_location(line: int, column: int = 0) -> str:
+    """Kaynak konumunu metne çevirir; satır 0 bellekteki veri demektir."""
+    if not line:
+        return "veri"
+    return f"satır {line}, sütun {column}" if column else f"satır {line}"
+
+class CityLoader:
+    """
+    Kayıtları geldikleri sırayla doğrulayıp doğrudan StopTable'a ekler (tek geçiş).
+    Durak referansları ileriye dönük olabileceğinden bütünlük kontrolü finish() içinde yapılır.
+    """
+    def __init__(self):
+        self.header: Dict[str, Any] = {}
+        self.stops = StopTable()
+        self.lines: List[Line] = []
+        # Eklenen her durağın kayıt sırası ve kaynak konumu (hata mesajları için)
+        self.stop_records = 0
+        self.stop_paths = array("i")
+        self.stop_lines = array("i")
+        self.stop_columns = array("i")
+        self.line_locations: List[Tuple[int, int]] = []
+        # Geçersiz olduğu için eklenmeyen durakların kimlikleri; bunlara verilen referanslar ayrıca raporlanmaz
+        self.rejected_ids = set()
+        self.errors: List[Tuple[str, str]] = []
+
+    def error(self, line: int, column: int, message: str) -> None:
+        self.errors.append((format_location(line, column), message))
+
+    def _check_fields(self, record: Any, fields: Dict[str, Tuple], line: int, column: int, path: str) -> bool:
+        if not isinstance(record, dict):
+            self.error(line, column, f"{path} bir nesne olmalı")
+            return False
+        valid = True
+        for field, (check, expected) in fields.items():
+            if field not in record:
+                self.error(line, column, f"{path}.{field} eksik")
+                valid = False
+            elif not check(record[field]):
+                self.error(line, column, f"{path}.{field} {expected} olmalı, {record[field]!r} bulundu")
+                valid = False
+        return valid
+
+    def add_stop(self, durak: Any, line: int = 0, column: int = 0) -> None:
+        record = self.stop_records
+        self.stop_records += 1
+        path = f"duraklar[{record}]"
+        valid = self._check_fields(durak, STOP_FIELDS, line, column, path)
+        if valid:
+            for j, next_stop in enumerate(durak.get("nextStops") or []):
+                valid &= self._check_fields(next_stop, NEXT_STOP_FIELDS, line, column, f"{path}.nextStops[{j}]")
+                if isinstance(next_stop, dict) and "sekil" in next_stop and not is_shape(next_stop["sekil"]):
+                    self.error(line, column, f"{path}.nextStops[{j}].sekil [enlem, boylam] noktalarından oluşan liste olmalı")
+                    valid = False
+            if durak.get("transfer"):
+                valid &= self._check_fields(durak["transfer"], TRANSFER_FIELDS, line, column, f"{path}.transfer")
+            if durak["id"] in self.stops.index:
+                self.error(line, column, f"{path}.id tekrar eden durak kimliği: {durak['id']!r}")
+                valid = False
+        if not valid:
+            if isinstance(durak, dict) and isinstance(durak.get("id"), str):
+                self.rejected_ids.add(durak["id"])
+            return
+        self.stops.append(durak)
+        self.stop_paths.append(record)
+        self.stop_lines.append(line)
+        self.stop_columns.append(column)
+
+    def add_line(self, hat: Any, line: int = 0, column: int = 0) -> None:
+        path = f"hatlar[{len(self.line_locations)}]"
+        self.line_locations.append((line, column))
+        if not isinstance(hat, dict) or not isinstance(hat.get("stops"), list):
+            self.error(line, column, f"{path} durak listesi (stops) olan bir nesne olmalı")
+            return
+        try:
+            transit_line = Line(**hat)
+            transit_line.departure_minutes()
+        except (TypeError, ValueError) as e:
+            self.error(line, column, f"{path} geçersiz hat tanımı: {e}")
+            return
+        self.lines.append(transit_line)
+
+    def finish(self) -> CityData:
+        """Referans bütünlüğünü kontrol eder; hata varsa NetworkDataError fırlatır."""
+        for field in ("city", "taxi"):
+            if field not in self.header:
+                self.errors.append(("başlık", f"{field} eksik"))
+
+        stops = self.stops
+
+        def unknown(stop_id: str) -> bool:
+            return stop_id not in stops.index and stop_id not in self.rejected_ids
+
+        for i in range(len(stops)):
+            path = f"duraklar[{self.stop_paths[i]}]"
+            for e in range(stops.next_offsets[i], stops.next_offsets[i + 1]):
+                if unknown(stops.next_ids[e]):
+                    self.error(self.stop_lines[i], self.stop_columns[i],
+                               f"{path}.nextStops[{e - stops.next_offsets[i]}].stopId bilinmeyen durak: {stops.next_ids[e]!r}")
+            transfer_id = stops.transfer_ids[i]
+            if transfer_id is not None and unknown(transfer_id):
+                self.error(self.stop_lines[i], self.stop_columns[i],
+                           f"{path}.transfer.transferStopId bilinmeyen durak: {transfer_id!r}")
+
+        for i, (transit_line, (line, column)) in enumerate(zip(self.lines, self.line_locations)):
+            for j, stop_id in enumerate(transit_line.stops):
+                if unknown(stop_id):
+                    self.error(line, column, f"hatlar[{i}].stops[{j}] bilinmeyen durak: {stop_id!r}")
+
+        if self.errors:
+            raise NetworkDataError(self.errors)
+        return CityData(city=self.header["city"], taxi=self.header["taxi"], stops=stops, hatlar=self.lines)
+
+class JsonStream:
+    """
+    Büyük bir JSON belgesini parça parça okuyan ayrıştırıcı.
+    Dizilerin elemanları tek tek çözülür; bellekte yalnızca o anki eleman ve okuma tamponu tutulur.
+    """
+    WHITESPACE = " \t\n\r"
+
+    def __init__(self, file, chunk_size: int = 1 << 16):
+        self.file = file
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+        # Satırlar tamponun _counted konumuna kadar sayılmıştır; _line_start tampon kaydırıldıkça negatif olabilir
+        self._counted = 0
+        self._line = 1
+        self._line_start = 0
+
+    def position(self, pos: Optional[int] = None) -> Tuple[int, int]:
+        """Tampondaki konumun dosyadaki (satır, sütun) karşılığı; konumlar artan sırayla sorulur."""
+        pos = self.pos if pos is None else pos
+        if pos > self._counted:
+            newlines = self.buffer.count("\n", self._counted, pos)
+            if newlines:
+                self._line += newlines
+                self._line_start = self.buffer.rfind("\n", self._counted, pos) + 1
+            self._counted = pos
+        return self._line, pos - self._line_start + 1
+
+    def fail(self, message: str, pos: Optional[int] = None) -> NetworkDataError:
+        return NetworkDataError([(format_location(*self.position(pos)), message)])
+
+    def _fill(self) -> bool:
+        """Okunmuş kısmı atıp tampona yeni bir parça ekler; dosya bittiyse False döner."""
+        if self.pos:
+            self.position()
+            self.buffer = self.buffer[self.pos:]
+            self._counted -= self.pos
+            self._line_start -= self.pos
+            self.pos = 0
+        chunk = self.file.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer += chunk
+        return True
+
+    def peek(self) -> str:
+        """Boşlukları atlayıp sıradaki karakteri döndürür; dosya sonunda boş metin."""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in self.WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer) or not self._fill():
+                return self.buffer[self.pos:self.pos + 1]
+
+    def expect(self, characters: str) -> str:
+        character = self.peek()
+        if not character or character not in characters:
+            found = repr(character) if character else "dosya sonu"
+            raise self.fail(f"{' veya '.join(characters)} bekleniyordu, {found} bulundu")
+        self.pos += 1
+        return character
+
+    def value(self) -> Any:
+        """Sıradaki JSON değerini çözer, gerekirse tampona yeni parçalar okur."""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+                # Tampon sonunda biten bir sayı devam ediyor olabilir
+                if end < len(self.buffer) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError as e:
+                if self.eof:
+                    raise self.fail(f"geçersiz JSON: {e.msg}", e.pos)
+            self._fill()
+
+    def items(self) -> Iterator[str]:
+        """En üst düzey nesnenin anahtarlarını sırayla verir; değer çağıran tarafından okunur."""
+        self.expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            self.peek()
+            key_pos = self.pos
+            key = self.value()
+            if not isinstance(key, str):
+                raise self.fail("nesne anahtarı metin olmalı", key_pos)
+            self.expect(":")
+            yield key
+            if self.expect(",}") == "}":
+                return
+
+    def elements(self) -> Iterator[Tuple[Any, int, int]]:
+        """Sıradaki diziyi eleman eleman (değer, satır, sütun) olarak verir."""
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            self.peek()
+            line, column = self.position()
+            yield self.value(), line, column
+            if self.expect(",]") == "]":
+                return
+
+class LoadReport:
+    """Yükleme süresi ve sürecin en yüksek bellek kullanımı."""
+    __slots__ = ("seconds", "peak_memory_kb", "stops", "links", "lines")
+
+    def __init__(self, seconds: float, peak_memory_kb: Optional[int], stops: int, links: int, lines: int):
+        self.seconds = seconds
+        self.peak_memory_kb = peak_memory_kb
+        self.stops = stops
+        self.links = links
+        self.lines = lines
+
+    def __str__(self) -> str:
+        memory = f"{self.peak_memory_kb / 1024:.1f} MB" if self.peak_memory_kb is not None else "bilinmiyor"
+        return (f"{self.stops} durak, {self.links} bağlantı, {self.lines} hat "
+                f"{self.seconds:.3f} sn'de yüklendi (en yüksek bellek: {memory})")
+
+def peak_memory_kb() -> Optional[int]:
+    """Sürecin en yüksek bellek kullanımı (KB); resource modülü yoksa None."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS bayt, Linux KB döndürür
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+def stream_city(file) -> CityData:
+    """Tek JSON belgesi biçimindeki veriyi duraklar ve hatlar dizilerini eleman eleman okuyarak yükler."""
+    loader = CityLoader()
+    stream = JsonStream(file)
+    for key in stream.items():
+        if key == "duraklar":
+            for durak, line, column in stream.elements():
+                loader.add_stop(durak, line, column)
+        elif key == "hatlar":
+            for hat, line, column in stream.elements():
+                loader.add_line(hat, line, column)
+        else:
+            loader.header[key] = stream.value()
+    if stream.peek():
+        raise stream.fail("belge sonundan sonra fazladan veri")
+    return loader.finish()
+
+def stream_city_lines(file) -> CityData:
+    """
+    JSON Lines biçimi: her satır bir kayıttır.
+    {"city": ..., "taxi": ...} başlık, {"durak": {...}} durak, {"hat": {...}} hat kaydıdır.
+    """
+    loader = CityLoader()
+    for number, text in enumerate(file, 1):
+        if not text.strip():
+            continue
+        try:
+            record = json.loads(text)
+        except json.JSONDecodeError as e:
+            loader.error(number, e.colno, f"geçersiz JSON: {e.msg}")
+            continue
+        if not isinstance(record, dict):
+            loader.error(number, 0, "kayıt bir nesne olmalı")
+        elif "durak" in record:
+            loader.add_stop(record["durak"], number)
+        elif "hat" in record:
+            loader.add_line(record["hat"], number)
+        else:
+            loader.header.update(record)
+    return loader.finish()
+
+def load_city(file_path: str) -> Tuple[CityData, LoadReport]:
+    """
+    Veri dosyasını akış halinde okuyup doğrulayarak yükler; .jsonl uzantılı dosyalar JSON Lines sayılır.
+    Geçersiz veya tutarsız veride NetworkDataError fırlatır.
+    """
+    started = time.perf_counter()
+    with open(file_path, "r", encoding="utf-8") as file:
+        if file_path.endswith(".jsonl"):
+            city_data = stream_city_lines(file)
+        else:
+            city_data = stream_city(file)
+    report = LoadReport(time.perf_counter() - started, peak_memory_kb(), len(city_data.stops),
+                        len(city_data.stops.next_ids), len(city_data.hatlar))
+    return city_data, report
+
+def load_data(file_path: str) -> CityData:
+    """Veri dosyasını yükler ve özetini yazdırır; hatalı veride NetworkDataError fırlatır."""
+    city_data, report = load_city(file_path)
+    print(f"Veri yüklendi: {city_data.city} - {report}")
+    return city_data
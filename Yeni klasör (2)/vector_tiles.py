@@ -0,0 +1,340 @@
+import argparse
+import glob
+import math
+import os
+import shutil
+import struct
+import time
+from bisect import bisect_left, bisect_right
+from typing import List, Dict, Any, Optional, Tuple
+from edge_geometry import geometry_level
+from network_snapshot import NetworkSnapshot
+from polyline import to_e5, decode_points
+
+# Mapbox Vector Tile (MVT 2.1) karoları; koordinatlar karo içinde 0..EXTENT tam sayılarıdır
+TILE_MIMETYPE = "application/vnd.mapbox-vector-tile"
+EXTENT = 4096
+# Kenardaki işaretler kesilmesin diye karoya eklenen komşu alan (karo birimi)
+BUFFER = 64
+MAX_TILE_ZOOM = 20
+# Diske yalnızca bu yakınlaştırmaya kadar ve ağın sınır kutusunu kapsayan dolu karolar yazılır
+CACHE_MAX_ZOOM = 16
+# Bu yakınlaştırmanın altında duraklar CLUSTER_CELL büyüklüğündeki hücrelerde kümelenir
+CLUSTER_MAX_ZOOM = 14
+CLUSTER_CELL = 512
+# Kümeleme düzeylerinde çizgi noktaları bir piksele (256 piksellik karoda) yuvarlanır;
+# bir pikselden kısa bağlantılar çizilmez ve bağlantılar tip başına tek özellikte birleştirilir
+LINE_GRID = EXTENT // 256
+
+# Geometri komutları ve özellik türleri (MVT şeması)
+MOVE_TO, LINE_TO = 1, 2
+POINT, LINESTRING = 1, 2
+
+def mercator(lat: float, lon: float) -> Tuple[float, float]:
+    """Web Mercator izdüşümü; dünya 0..1 aralığında birim karedir (y kuzeyden güneye artar)."""
+    lat = max(min(lat, 85.0511), -85.0511)
+    y = math.log(math.tan(math.pi / 4 + math.radians(lat) / 2))
+    return (lon + 180) / 360, (1 - y / math.pi) / 2
+
+def valid_tile(z: int, x: int, y: int) -> bool:
+    return 0 <= z <= MAX_TILE_ZOOM and 0 <= x < 2 ** z and 0 <= y < 2 ** z
+
+# --- Protobuf kodlaması ---
+
+def varint(value: int) -> bytes:
+    out = bytearray()
+    while value > 0x7f:
+        out.append((value & 0x7f) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+def zigzag(value: int) -> int:
+    return value << 1 if value >= 0 else (-value << 1) - 1
+
+def message_field(number: int, payload: bytes) -> bytes:
+    """Uzunluk önekli (wire type 2) alan."""
+    return varint(number << 3 | 2) + varint(len(payload)) + payload
+
+def varint_field(number: int, value: int) -> bytes:
+    return varint(number << 3) + varint(value)
+
+def packed_field(number: int, values: List[int]) -> bytes:
+    return message_field(number, b"".join(varint(value) for value in values))
+
+def encode_value(value: Any) -> bytes:
+    """Özellik değeri (Value mesajı): metin, mantıksal, tam sayı veya ondalık."""
+    if isinstance(value, str):
+        return message_field(1, value.encode("utf-8"))
+    if isinstance(value, bool):
+        return varint_field(7, int(value))
+    if isinstance(value, int):
+        return varint_field(6, zigzag(value))
+    return varint(3 << 3 | 1) + struct.pack("<d", value)
+
+def point_geometry(x: int, y: int) -> List[int]:
+    return [MOVE_TO | 1 << 3, zigzag(x), zigzag(y)]
+
+def line_geometry(lines: List[List[Tuple[int, int]]]) -> List[int]:
+    """
+    Her parçanın ilk noktasına MoveTo, kalanlarına tek LineTo; birden çok parça MultiLineString olur.
+    Koordinatlar imlecin bir önceki konumuna göre farktır, imleç parçalar arasında sıfırlanmaz.
+    """
+    geometry = []
+    x = y = 0
+    for points in lines:
+        for j, (px, py) in enumerate(points):
+            if j == 0:
+                geometry.append(MOVE_TO | 1 << 3)
+            elif j == 1:
+                geometry.append(LINE_TO | (len(points) - 1) << 3)
+            geometry += (zigzag(px - x), zigzag(py - y))
+            x, y = px, py
+    return geometry
+
+class LayerBuilder:
+    """Bir MVT katmanı; özellik anahtarları ve değerleri katman içinde bir kez yazılır."""
+    def __init__(self, name: str):
+        self.name = name
+        self.features: List[bytes] = []
+        self.keys: Dict[str, int] = {}
+        self.values: Dict[Tuple[type, Any], int] = {}
+
+    def add(self, geometry_type: int, geometry: List[int], properties: Dict[str, Any],
+            feature_id: Optional[int] = None) -> None:
+        tags = []
+        for key, value in properties.items():
+            tags.append(self.keys.setdefault(key, len(self.keys)))
+            tags.append(self.values.setdefault((type(value), value), len(self.values)))
+        feature = varint_field(1, feature_id) if feature_id is not None else b""
+        feature += packed_field(2, tags) + varint_field(3, geometry_type) + packed_field(4, geometry)
+        self.features.append(feature)
+
+    def encode(self) -> bytes:
+        layer = varint_field(15, 2) + message_field(1, self.name.encode("utf-8"))
+        layer += b"".join(message_field(2, feature) for feature in self.features)
+        layer += b"".join(message_field(3, key.encode("utf-8")) for key in self.keys)
+        layer += b"".join(message_field(4, encode_value(value)) for _, value in self.values)
+        return layer + varint_field(5, EXTENT)
+
+# --- Karo üretimi ---
+
+class TileSource:
+    """
+    Ağ görüntüsünden karo üretmek için izdüşürülmüş duraklar ve hat bağlantıları.
+    Duraklar ve bağlantılar batı sınırlarına göre sıralıdır; bir karonun içeriği ikili aramayla bulunur.
+    """
+    def __init__(self, network):
+        self.network = network
+        table = network.table
+        points = [mercator(table.lat[i], table.lon[i]) for i in range(len(table))]
+        self.points = points
+        self.stop_order = sorted(range(len(points)), key=lambda i: points[i][0])
+        self.stop_xs = [points[i][0] for i in self.stop_order]
+
+        # Bağlantı: (batı, doğu, kuzey, güney, başlangıç, bitiş, tablo kaydı); sınırlar şekli de kapsar
+        edges = []
+        for u in range(len(table)):
+            for e in range(table.next_offsets[u], table.next_offsets[u + 1]):
+                v = table.index.get(table.next_ids[e])
+                if v is None:
+                    continue
+                shape = [points[u], points[v]]
+                if table.next_shapes[e] is not None:
+                    shape += [mercator(lat, lon) for lat, lon in decode_points(table.next_shapes[e])]
+                xs = [x for x, _ in shape]
+                ys = [y for _, y in shape]
+                edges.append((min(xs), max(xs), min(ys), max(ys), u, v, e))
+        edges.sort()
+        self.edges = edges
+        self.edge_xs = [edge[0] for edge in edges]
+        self.max_edge_width = max((edge[1] - edge[0] for edge in edges), default=0.0)
+        # Durakları ve bağlantı şekillerini kapsayan (batı, kuzey, doğu, güney) sınırları
+        self.bounds = None
+        if points:
+            self.bounds = (min([self.stop_xs[0]] + [edge[0] for edge in edges]),
+                           min([y for _, y in points] + [edge[2] for edge in edges]),
+                           max([self.stop_xs[-1]] + [edge[1] for edge in edges]),
+                           max([y for _, y in points] + [edge[3] for edge in edges]))
+
+    def tile_range(self, z: int) -> Optional[Tuple[int, int, int, int]]:
+        """Sınır kutusunu kapsayan z düzeyindeki karoların (ilk x, ilk y, son x, son y) aralığı."""
+        if self.bounds is None:
+            return None
+        scale = 2 ** z
+        west, north, east, south = self.bounds
+        return (int(west * scale), int(north * scale),
+                min(int(east * scale), scale - 1), min(int(south * scale), scale - 1))
+
+    def covers(self, z: int, x: int, y: int) -> bool:
+        tiles = self.tile_range(z)
+        return tiles is not None and tiles[0] <= x <= tiles[2] and tiles[1] <= y <= tiles[3]
+
+    def tile(self, z: int, x: int, y: int) -> bytes:
+        """(z, x, y) karosunun MVT içeriği: hat bağlantıları ("lines") ve duraklar ("stops")."""
+        scale = 2 ** z
+        margin = BUFFER / EXTENT / scale
+        west, east = x / scale - margin, (x + 1) / scale + margin
+        north, south = y / scale - margin, (y + 1) / scale + margin
+
+        def local(point: Tuple[float, float]) -> Tuple[int, int]:
+            return round((point[0] * scale - x) * EXTENT), round((point[1] * scale - y) * EXTENT)
+
+        return self._lines(z, local, west, east, north, south) + \
+            self._stops(z, local, west, east, north, south)
+
+    def _lines(self, z: int, local, west: float, east: float, north: float, south: float) -> bytes:
+        network = self.network
+        table = network.table
+        geometry = network.geometry
+        level = geometry_level(z)
+        layer = LayerBuilder("lines")
+        seen = set()
+        merged: Dict[str, List[List[Tuple[int, int]]]] = {}
+        first = bisect_left(self.edge_xs, west - self.max_edge_width)
+        last = bisect_right(self.edge_xs, east)
+        for min_x, max_x, min_y, max_y, u, v, e in self.edges[first:last]:
+            if max_x < west or max_y < north or min_y > south:
+                continue
+            chunk = geometry.chunk(level, e)
+            if chunk is None:
+                coords = [self.points[u], self.points[v]]
+            else:
+                previous = (to_e5(table.lat[u]), to_e5(table.lon[u]))
+                coords = [self.points[u]] + [mercator(lat, lon) for lat, lon in decode_points(chunk, previous)]
+            # Aynı karo birimine (kümeleme düzeylerinde aynı piksele) düşen ardışık noktalar tek noktadır
+            points = []
+            for point in map(local, coords):
+                if z < CLUSTER_MAX_ZOOM:
+                    point = (point[0] // LINE_GRID * LINE_GRID, point[1] // LINE_GRID * LINE_GRID)
+                if not points or point != points[-1]:
+                    points.append(point)
+            key = tuple(points)
+            # Çift yönlü bağlantılar aynı çizgiyi iki kez çizmez
+            if len(points) < 2 or key in seen or key[::-1] in seen:
+                continue
+            seen.add(key)
+            if z < CLUSTER_MAX_ZOOM:
+                merged.setdefault(table.types[u], []).append(points)
+            else:
+                layer.add(LINESTRING, line_geometry([points]), {"type": table.types[u]}, e)
+        for stop_type, lines in merged.items():
+            layer.add(LINESTRING, line_geometry(lines), {"type": stop_type})
+        return message_field(3, layer.encode()) if layer.features else b""
+
+    def _stops(self, z: int, local, west: float, east: float, north: float, south: float) -> bytes:
+        table = self.network.table
+        layer = LayerBuilder("stops")
+        first = bisect_left(self.stop_xs, west)
+        last = bisect_right(self.stop_xs, east)
+        stops = [i for i in self.stop_order[first:last] if north <= self.points[i][1] <= south]
+
+        def add_stop(i: int, point: Tuple[int, int]) -> None:
+            layer.add(POINT, point_geometry(*point), {
+                "id": table.ids[i], "name": table.names[i], "type": table.types[i],
+                "sonDurak": bool(table.terminal[i])
+            }, i)
+
+        if z >= CLUSTER_MAX_ZOOM:
+            for i in stops:
+                add_stop(i, local(self.points[i]))
+        else:
+            # Hücreler karo sınırlarına hizalıdır; her küme yalnızca bir karoda yer alır
+            cells: Dict[Tuple[int, int], List[Tuple[int, Tuple[int, int]]]] = {}
+            for i in stops:
+                point = local(self.points[i])
+                if 0 <= point[0] < EXTENT and 0 <= point[1] < EXTENT:
+                    cells.setdefault((point[0] // CLUSTER_CELL, point[1] // CLUSTER_CELL), []).append((i, point))
+            for members in cells.values():
+                if len(members) == 1:
+                    add_stop(*members[0])
+                    continue
+                types = {table.types[i] for i, _ in members}
+                center = (round(sum(p[0] for _, p in members) / len(members)),
+                          round(sum(p[1] for _, p in members) / len(members)))
+                layer.add(POINT, point_geometry(*center), {
+                    "cluster": True, "count": len(members),
+                    "type": types.pop() if len(types) == 1 else "karma"
+                })
+        return message_field(3, layer.encode()) if layer.features else b""
+
+def tile_source(network) -> TileSource:
+    """Ağ görüntüsü başına bir kez kurulan karo kaynağı."""
+    if network.tiles is None:
+        network.tiles = TileSource(network)
+    return network.tiles
+
+class TileCache:
+    """
+    Ağ sürümü başına diske yazılan karolar. Sürümler içerik özeti olduğundan dizin yalnızca aynı ağ
+    içeriğine ait karoları tutar; sürüm değişince önceki sürümlerin dizinleri silinir.
+    Diske yalnızca CACHE_MAX_ZOOM'a kadar, ağın sınır kutusundaki dolu karolar yazılır;
+    diğerleri her istekte üretilir. Sonraki istekler ve diğer süreçler yazılan dosyayı okur.
+    """
+    def __init__(self, data_path: str):
+        self.data_path = data_path
+        self._version: Optional[str] = None
+
+    def directory(self, version: str) -> str:
+        return f"{os.path.splitext(self.data_path)[0]}.{version}.tiles"
+
+    def path(self, version: str, z: int, x: int, y: int) -> str:
+        return os.path.join(self.directory(version), str(z), str(x), f"{y}.mvt")
+
+    def discard(self, keep: str) -> None:
+        """keep dışındaki sürümlerin karo dizinlerini siler."""
+        prefix, suffix = self.directory("*").split("*")
+        for path in glob.glob(f"{glob.escape(os.path.splitext(self.data_path)[0])}.*.tiles"):
+            # Adında nokta bulunan "sürümler" aynı önekli başka bir veri dosyasına aittir
+            version = path[len(prefix):-len(suffix)]
+            if version != keep and "." not in version:
+                shutil.rmtree(path, ignore_errors=True)
+
+    def get(self, network, z: int, x: int, y: int) -> bytes:
+        if network.version != self._version:
+            self._version = network.version
+            self.discard(network.version)
+        source = tile_source(network)
+        persist = z <= CACHE_MAX_ZOOM and source.covers(z, x, y)
+        path = self.path(network.version, z, x, y)
+        if persist:
+            try:
+                with open(path, "rb") as file:
+                    return file.read()
+            except FileNotFoundError:
+                pass
+        data = source.tile(z, x, y)
+        if persist and data:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Yarım yazılmış karo okunmasın diye önce geçici dosyaya yazılır
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as file:
+                file.write(data)
+            os.replace(tmp_path, path)
+        return data
+
+def covering_tiles(network, z: int) -> List[Tuple[int, int]]:
+    """Ağın sınır kutusunu kapsayan z düzeyindeki karolar."""
+    tiles = tile_source(network).tile_range(z)
+    if tiles is None:
+        return []
+    first_x, first_y, last_x, last_y = tiles
+    return [(x, y) for x in range(first_x, last_x + 1) for y in range(first_y, last_y + 1)]
+
+def main():
+    parser = argparse.ArgumentParser(description="Ağ görüntüsünün vektör karolarını önceden üretip diske yazar")
+    parser.add_argument("--data", default="data.txt", help="Ulaşım verisi dosyası")
+    parser.add_argument("--zoom", type=int, nargs=2, default=[10, 16], metavar=("EN_AZ", "EN_COK"),
+                        help="Üretilecek yakınlaştırma aralığı")
+    args = parser.parse_args()
+
+    network = NetworkSnapshot.load(args.data)
+    cache = TileCache(args.data)
+    for z in range(args.zoom[0], min(args.zoom[1], CACHE_MAX_ZOOM) + 1):
+        started = time.perf_counter()
+        tiles = covering_tiles(network, z)
+        size = sum(len(cache.get(network, z, x, y)) for x, y in tiles)
+        print(f"z{z}: {len(tiles)} karo, {size / 1024:.1f} KB, {time.perf_counter() - started:.1f} sn")
+
+if __name__ == "__main__":
+    main()